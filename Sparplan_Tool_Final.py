@@ -1,17 +1,87 @@
+import os
+import uuid
+from contextlib import nullcontext
+from functools import partial
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import re
-import random
-from collections import defaultdict
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from sparplan import (
+    DEFAULT_AKTIEN as default_aktien,
+    DEFAULT_ETFS as default_etfs,
+    DEFAULT_FAVORITEN as default_favoriten,
+    PROFILE_OPTIONS,
+    PROFILE_WANTED_TAGS,
+    STRENGTH_OPTIONS,
+    PlanCache,
+    PlanPipeline,
+    Profiler,
+    plan_cache_key,
+    explain_rotation,
+    rotation_vectors,
+)
+from sparplan.allocation import parse_minimums
+from sparplan.branding import branding_html, logo_png_bytes
+from sparplan.cache import is_cacheable
+from sparplan.charts import render_chart_pngs, render_heatmap_png, vega_chart_specs
+from sparplan.export import EXPORT_FORMATS, available_formats, schedule_bytes
+from sparplan.jobs import CANCELLED, DONE, FINISHED, QUEUED, JobQueue
+from sparplan.monthview import month_frame, months_with, page_bounds, plan_instruments
+from sparplan.profiling import stage
+from sparplan.sessions import SessionStore
+
+MC_ASSUMPTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "mc_assumptions.json")
+PRICE_STORE_PATH = os.environ.get("SPARPLAN_PRICE_STORE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "prices"
+)
+
+# Server-Betrieb (viele gleichzeitige Sessions): Ergebnisse je Session werden
+# nach Leerlauf bzw. bei zu vielen Sessions/zu viel Speicher freigegeben
+SERVER_MODE = os.environ.get("SPARPLAN_SERVER_MODE", "") not in ("", "0")
 
 st.set_page_config(page_title="Dynamischer Sparplan-Rechner", layout="wide")
 
 # -----------------------------
 # Helpers: Session State
 # -----------------------------
-if "result" not in st.session_state:
-    st.session_state.result = None
+# Kleine Werte (Flags, Hinweise, Parameter) im st.session_state; große Objekte
+# (Ergebnis, Pipeline, Monte-Carlo, Backtest, Sweep, Optimierung, Diagnose)
+# im begrenzten, prozessweiten SessionStore.
+@st.cache_resource(show_spinner=False)
+def session_store() -> SessionStore:
+    # Grenzen gelten in jedem Modus (0 schaltet sie per Umgebungsvariable ab)
+    env = os.environ.get
+    max_mb = float(env("SPARPLAN_SESSION_MEMORY_MB", 1024 if SERVER_MODE else 512))
+    return SessionStore(
+        max_sessions=int(env("SPARPLAN_SESSION_LIMIT", 200 if SERVER_MODE else 1_000)),
+        ttl=float(env("SPARPLAN_SESSION_TTL", 1800 if SERVER_MODE else 4 * 3600)) or None,
+        max_bytes=int(max_mb * 2**20) or None,
+    )
+
+# Getrennte Sessions werden nach kurzer Karenz freigegeben (Reconnect behält die Werte)
+SESSION_CLOSE_GRACE = 60.0
+
+def session_id() -> str:
+    # Streamlit-Session-ID, damit der Store beendete Verbindungen erkennt
+    if "sid" not in st.session_state:
+        ctx = get_script_run_ctx()
+        st.session_state.sid = ctx.session_id if ctx is not None else os.urandom(8).hex()
+    return st.session_state.sid
+
+def release_closed_sessions() -> None:
+    if st.runtime.exists():
+        session_store().retain(st.runtime.get_instance().is_active_session, grace=SESSION_CLOSE_GRACE)
+
+def session_value(key: str, default=None):
+    return session_store().get(session_id(), key, default)
+
+def set_session_value(key: str, value) -> None:
+    # None entfernt den Wert
+    session_store().set(session_id(), key, value)
+
+release_closed_sessions()
+
 if "last_info_limits" not in st.session_state:
     st.session_state.last_info_limits = []
 if "last_info_adjustments" not in st.session_state:
@@ -27,488 +97,18 @@ def request_compute():
 # -----------------------------
 # Logo und Branding
 # -----------------------------
-from PIL import Image  # noqa
-import base64
-
-file_path = "Traderise_Logo.PNG"
-with open(file_path, "rb") as image_file:
-    encoded_image = base64.b64encode(image_file.read()).decode()
+@st.cache_resource(show_spinner=False)
+def cached_branding_html() -> str:
+    # Einmal pro Prozess: Logo auf Anzeigegröße verkleinern und base64-kodieren
+    return branding_html(logo_png_bytes())
 
-branding_html = f"""
-<div style="display: flex; align-items: center; margin-top: 10px; margin-bottom: 30px;">
-    <img src="data:image/png;base64,{encoded_image}" alt="Logo" style="width: 50px; height: auto; margin-right: 10px;">
-    <span style="font-size: 14px;">Powered by <a href="https://traderise.net" target="_blank" style="color:#1E90FF; text-decoration: none;">Traderise.net</a></span>
-</div>
-"""
-st.markdown(branding_html, unsafe_allow_html=True)
+st.markdown(cached_branding_html(), unsafe_allow_html=True)
 
 st.title("Dynamischer Sparplan-Rechner")
 
 # -----------------------------
-# Defaults
-# -----------------------------
-default_favoriten = """ASML
-TSMC
-Micron
-Palantir
-Vertiv
-Siemens Energy
-Coinbase
-Alphabet
-NVIDIA
-Crowdstrike"""
-
-default_aktien = """Adyen
-Aker Carbon Capture
-Airbnb (A)
-Alibaba Group (ADR)
-AMD
-Amazon.com
-Apple
-AST SpaceMobile
-Axon Enterprise
-BAE Systems
-Berkshire Hathaway (B)
-BitMine Immersion Technology
-Block
-Bloom Energy
-BYD
-BMW
-Brookfield Asset Management
-Cameco
-Circle Internet Group
-Cloudflare (A)
-Coca-Cola
-Constellation Energy
-Covestro
-Critical Metals
-Cummins
-CSG Group / Czeschoslovak Group
-Datadog (A)
-Deutsche Telekom
-Diginex
-DroneShield
-D-Wave Quantum
-Elbit Systems
-Eli Lilly & Co
-Endeavour Silver
-Fortinet
-Galaxy Digital Inc. Reg. Shs. Cl…
-GE Aerospace
-GEA
-Hecla Mining
-Heidelberg Materials
-Hensoldt
-Ibiden
-Iberdrola
-Illumina
-Impala Platinum
-Infineon Technologies
-Intellia Therapeutics
-Intellistake Technologies
-Intel
-Iren
-Intuitive Surgical
-Johnson & Johnson
-JP Morgan Chase
-KLA
-Lam Research
-Leonardo-Finmeccanica
-LVMH Louis Vuitton Moet Hen…
-MercadoLibre
-Mercedes-Benz Group
-Meta Platforms (A)
-MicroStrategy (A)
-Microsoft
-Morgan Stanley
-MP Materials
-Netflix
-Newmont
-Nio
-Nordex
-Novo Nordisk (ADR)
-Ondas Holdings
-Oracle
-Palo Alto Networks
-Procter & Gamble
-Prysmian
-Qualcomm
-Quantum eMotion
-Realty Income
-Reddit
-RENK Group
-Rheinmetall
-Riot Platforms
-Rocket Lab Corp.
-Rolls Royce
-Saab (B)
-Safran
-Samsung
-SAP
-Schaeffler
-ServiceNow
-Shopify (A)
-Siemens
-SK Hynix
-Snowflake (A)
-Spotify Technology
-Synopsys
-Take-Two Interactive
-Tencent Holdings
-Tesla
-Thales
-The Trade Desk (A)
-ThyssenKrupp
-TKMS AG & Co. KGaA Inhaber-…
-Uranium Energy
-Visa
-Xiaomi
-"""
-
-default_etfs = """AI & Big Data USD (Acc)
-Automation & Robotics USD (Acc)
-BlackRock World Mining Trust
-Core MSCI World USD (Acc)
-Core Stoxx Europe 600 EUR (Acc)
-Defence USD (Acc)
-MSCI EM USD (Acc)
-MSCI World Small Cap USD (Acc)
-Physical Gold USD (Acc)
-Space Innovators USD (Acc)
-"""
-
-# -----------------------------
-# Helper
-# -----------------------------
-def clean_lines(text: str):
-    lines = []
-    for raw in text.splitlines():
-        x = raw.strip().replace("“", '"').replace("”", '"').replace("’", "'")
-        x = " ".join(x.split())
-        if x:
-            lines.append(x)
-    return lines
-
-def etf_weight_for(name: str) -> float:
-    n = name.lower()
-    if "core msci world" in n:
-        return 0.25
-    if "blackrock world mining" in n:
-        return 0.05
-    if "automation & robotics" in n:
-        return 0.05
-    if "msci world small cap" in n:
-        return 0.05
-    return 0.10
-
-def pick_etfs(etf_list, max_count: int):
-    if len(etf_list) <= max_count:
-        return etf_list
-    weights = {e: etf_weight_for(e) for e in etf_list}
-    order_index = {e: i for i, e in enumerate(etf_list)}
-    sorted_etfs = sorted(etf_list, key=lambda e: (-weights.get(e, 0.10), order_index.get(e, 10_000)))
-    return sorted_etfs[:max_count]
-
-def profile_seed(profile: str) -> int:
-    mapping = {
-        "Ausgewogen (Standard)": 420,
-        "Tech & AI": 1337,
-        "Wachstum": 2024,
-        "Dividenden & Value": 777,
-        "Konservativ & defensiv": 99
-    }
-    return mapping.get(profile, 420)
-
-# -----------------------------
-# Tagging
+# Helper (UI)
 # -----------------------------
-ALL_TAGS = {
-    "Semis": [
-        "ASML","TSMC","Micron","AMD","NVIDIA","Intel","Infineon Technologies","SK Hynix (GDR)","SK Hynix",
-        "KLA","Lam Research","Samsung","Qualcomm","Ibiden","Synopsys"
-    ],
-    "Software/Cloud": [
-        "Microsoft","Oracle","SAP","ServiceNow","Snowflake (A)","Cloudflare (A)","Datadog (A)",
-        "Meta Platforms (A)","Alphabet"
-    ],
-    "Cyber": ["Crowdstrike","Fortinet","Palo Alto Networks"],
-    "AI/Data": ["Palantir","The Trade Desk (A)","Reddit"],
-    "FinTech/Crypto": [
-        "Coinbase","MicroStrategy (A)","Block","Circle Internet Group",
-        "Digindex","Diginex","BitMine Immersion Technology","Riot Platforms","Iren","Visa"
-    ],
-    "Quantum": ["D-Wave Quantum","Quantum eMotion"],
-    "Space": ["AST SpaceMobile","Ondas Holdings","Rocket Lab Corp."],
-    "Robotics/Drone": ["DroneShield","Axon Enterprise"],
-    "Platform/Consumer": [
-        "Airbnb (A)","Netflix","Spotify Technology","Shopify (A)","MercadoLibre","Take-Two Interactive",
-        "Alibaba Group (ADR)","Amazon.com","Apple","Tencent Holdings","Xiaomi","Reddit"
-    ],
-    "Staples": ["Procter & Gamble","Coca-Cola"],
-    "EV/Auto": ["Tesla","BYD","Nio","BMW","Mercedes-Benz Group"],
-    "Financials": ["Morgan Stanley","JP Morgan Chase","JPMorgan Chase","JPMorgan"],
-    "Holding/Quality": ["Berkshire Hathaway (B)","Brookfield Asset Management"],
-    "Telecom": ["Deutsche Telekom"],
-    "Healthcare/Pharma": ["Johnson & Johnson","Novo Nordisk (ADR)","Eli Lilly & Co","Intuitive Surgical","Illumina"],
-    "Biotech": ["Intellia Therapeutics","Intellistake Technologies"],
-    "Industrials": [
-        "Siemens","Siemens Energy","Cummins","Schaeffler","ThyssenKrupp","TKMS AG & Co. KGaA Inhaber-…",
-        "Nordex","Constellation Energy","RENK Group","Renk","GEA","Prysmian"
-    ],
-    "Utilities/Energy": ["Iberdrola"],
-    "Clean Energy": ["Bloom Energy"],
-    "Materials/Chemicals": ["Heidelberg Materials","Covestro","Evonik Industries","Impala Platinum","Rio Tinto"],
-    "Mining/Metals": ["Cameco","Critical Metals","MP Materials","Endeavour Silver","Hecla Mining","Newmont"],
-    "Uranium/Nuclear": ["Cameco","Uranium Energy"],
-    "Defense/Aerospace": [
-        "Rheinmetall","Saab (B)","Thales","Hensoldt","Elbit Systems","Leonardo-Finmeccanica","BAE Systems",
-        "Safran","Airbus","Rolls Royce","GE Aerospace","CSG Group / Czeschoslovak Group"
-    ],
-    "REIT": ["Realty Income"],
-    "Carbon/ESG": ["Aker Carbon Capture"],
-    "Luxury": ["LVMH Louis Vuitton Moet Hen…"],
-    "Other": ["Adyen"],
-}
-
-RISK_TAGS = {
-    "High Volatility": ["Coinbase","MicroStrategy (A)","BitMine Immersion Technology","Digindex","Diginex","Nio","Riot Platforms","Iren"],
-    "Early/Speculative": ["Quantum eMotion","D-Wave Quantum","Ondas Holdings","DroneShield","AST SpaceMobile","Bloom Energy","Uranium Energy"],
-}
-
-PROFILE_WANTED_TAGS = {
-    "Ausgewogen (Standard)": [],
-    "Tech & AI": ["Semis","Software/Cloud","Cyber","AI/Data","Quantum","Robotics/Drone","FinTech/Crypto"],
-    "Wachstum": ["Platform/Consumer","EV/Auto","Biotech","Space","FinTech/Crypto","AI/Data","Clean Energy"],
-    "Dividenden & Value": [
-        "Holding/Quality","Staples","Telecom","Healthcare/Pharma","Industrials","Materials/Chemicals",
-        "Mining/Metals","Luxury","REIT","Financials","Utilities/Energy","Uranium/Nuclear","Defense/Aerospace"
-    ],
-    "Konservativ & defensiv": [
-        "Holding/Quality","Staples","Telecom","Healthcare/Pharma","Industrials","REIT",
-        "Materials/Chemicals","Financials","Utilities/Energy","Defense/Aerospace"
-    ],
-}
-
-def normalize_name(x: str) -> str:
-    x = x.strip().lower()
-    x = x.replace("…", "...")
-    x = re.sub(r"\(a\)|\(b\)", "", x)
-    x = x.replace("adr", "")
-    x = re.sub(r"[^a-z0-9\s\.\-&/]", "", x)
-    x = re.sub(r"\s+", " ", x).strip()
-    return x
-
-_TAG_LOOKUP = {}
-for tag, names in ALL_TAGS.items():
-    for n in names:
-        _TAG_LOOKUP.setdefault(normalize_name(n), set()).add(tag)
-
-_RISK_LOOKUP = {}
-for tag, names in RISK_TAGS.items():
-    for n in names:
-        _RISK_LOOKUP.setdefault(normalize_name(n), set()).add(tag)
-
-RISK_TAG_SET = {"High Volatility", "Early/Speculative"}
-
-def tags_for_rotation(name: str) -> list[str]:
-    n = normalize_name(name)
-    tags = set()
-
-    if n in _TAG_LOOKUP:
-        tags |= _TAG_LOOKUP[n]
-    else:
-        for key_norm, tset in _TAG_LOOKUP.items():
-            if key_norm and (key_norm in n or n in key_norm):
-                tags |= tset
-
-    risk = set()
-    if n in _RISK_LOOKUP:
-        risk |= _RISK_LOOKUP[n]
-    else:
-        for key_norm, tset in _RISK_LOOKUP.items():
-            if key_norm and (key_norm in n or n in key_norm):
-                risk |= tset
-
-    tags |= risk
-    if not tags:
-        tags = {"Unkategorisiert"}
-    return sorted(tags)
-
-def is_risky(name: str) -> bool:
-    return bool(set(tags_for_rotation(name)) & RISK_TAG_SET)
-
-def thematic_tags(name: str) -> list[str]:
-    t = [x for x in tags_for_rotation(name) if x not in RISK_TAG_SET and x != "Unkategorisiert"]
-    return t if t else ["Unkategorisiert"]
-
-def score_rotation(name: str, profile: str) -> int:
-    tags = tags_for_rotation(name)
-    wanted = set(PROFILE_WANTED_TAGS.get(profile, []))
-
-    if profile == "Ausgewogen (Standard)":
-        if "High Volatility" in tags or "Early/Speculative" in tags:
-            return -1
-        return 0
-
-    score = 0
-    for t in tags:
-        if t in wanted:
-            score += 3
-
-    if profile in ["Dividenden & Value", "Konservativ & defensiv"]:
-        if "High Volatility" in tags:
-            score -= 4
-        if "Early/Speculative" in tags:
-            score -= 3
-
-    if profile == "Konservativ & defensiv":
-        if "Semis" in tags or "Quantum" in tags or "FinTech/Crypto" in tags:
-            score -= 1
-
-    return score
-
-def explain_rotation(name: str, profile: str) -> list[str]:
-    tags = tags_for_rotation(name)
-    wanted = set(PROFILE_WANTED_TAGS.get(profile, []))
-    hits = [t for t in tags if t in wanted]
-    return hits[:3] if hits else tags[:2]
-
-def pick_rotation_by_profile(
-    rot_list: list[str],
-    profile: str,
-    strength: str,
-    repeatable: bool,
-    do_shuffle: bool,
-    desired_pool_size: int | None = None,
-    balanced_risk_cap_pct: float = 0.25,
-    balanced_min_per_tag: int = 1,
-) -> list[str]:
-    if not rot_list:
-        return []
-
-    seed = profile_seed(profile) if repeatable else None
-    random.seed(seed)
-
-    if profile == "Ausgewogen (Standard)":
-        pool = rot_list[:]
-        if do_shuffle:
-            random.shuffle(pool)
-
-        target = int(desired_pool_size) if desired_pool_size else len(pool)
-        target = max(0, min(target, len(pool)))
-        if target == 0:
-            return []
-
-        risk_cap = int(round(target * float(balanced_risk_cap_pct)))
-        if target >= 8 and risk_cap < 1:
-            risk_cap = 1
-
-        tag_to_candidates = defaultdict(list)
-        for s in pool:
-            for tg in thematic_tags(s):
-                tag_to_candidates[tg].append(s)
-
-        for tg in list(tag_to_candidates.keys()):
-            cand = tag_to_candidates[tg]
-            if do_shuffle:
-                random.shuffle(cand)
-            tag_to_candidates[tg] = cand
-
-        picked = []
-        picked_set = set()
-        picked_risk = 0
-
-        tags = list(tag_to_candidates.keys())
-        if do_shuffle:
-            random.shuffle(tags)
-
-        def can_add(sym: str) -> bool:
-            nonlocal picked_risk
-            if sym in picked_set:
-                return False
-            if is_risky(sym) and picked_risk >= risk_cap:
-                return False
-            return True
-
-        def add(sym: str):
-            nonlocal picked_risk
-            picked.append(sym)
-            picked_set.add(sym)
-            if is_risky(sym):
-                picked_risk += 1
-
-        for _ in range(balanced_min_per_tag):
-            if len(picked) >= target:
-                break
-            for tg in tags:
-                if len(picked) >= target:
-                    break
-                while tag_to_candidates[tg]:
-                    sym = tag_to_candidates[tg].pop(0)
-                    if can_add(sym):
-                        add(sym)
-                        break
-
-        if len(picked) < target:
-            made_progress = True
-            while len(picked) < target and made_progress:
-                made_progress = False
-                for tg in tags:
-                    if len(picked) >= target:
-                        break
-                    while tag_to_candidates[tg]:
-                        sym = tag_to_candidates[tg].pop(0)
-                        if can_add(sym):
-                            add(sym)
-                            made_progress = True
-                            break
-
-        if len(picked) < target:
-            remaining = [s for s in pool if s not in picked_set]
-            non_risk = [s for s in remaining if not is_risky(s)]
-            risk = [s for s in remaining if is_risky(s)]
-            if do_shuffle:
-                random.shuffle(non_risk)
-                random.shuffle(risk)
-
-            for s in non_risk:
-                if len(picked) >= target:
-                    break
-                if can_add(s):
-                    add(s)
-
-            if len(picked) < target:
-                for s in risk:
-                    if len(picked) >= target:
-                        break
-                    if s in picked_set:
-                        continue
-                    add(s)
-
-        return picked[:target]
-
-    scored = []
-    for s in rot_list:
-        sc = score_rotation(s, profile)
-        tie = random.random() if do_shuffle else 0.0
-        scored.append((sc, tie, s))
-
-    scored.sort(key=lambda t: (-t[0], t[1]))
-    positives = [t for t in scored if t[0] > 0]
-    rest = [t for t in scored if t[0] <= 0]
-
-    if strength in ["Mild", "Normal"]:
-        ordered = [t[2] for t in positives] + [t[2] for t in rest]
-    else:
-        ordered_pos = [t[2] for t in positives]
-        ordered_all = [t[2] for t in scored]
-        if len(ordered_pos) >= max(5, int(0.3 * len(rot_list))):
-            ordered = ordered_pos + [t[2] for t in rest]
-        else:
-            ordered = ordered_all
-
-    return ordered[:desired_pool_size] if desired_pool_size else ordered
-
 def render_two_col_grid(items: list[str]):
     if not items:
         st.caption("—")
@@ -573,13 +173,7 @@ begrenze_rotation = st.checkbox(
 
 profil = st.selectbox(
     "Anlage-Profil (steuert Rotation-Auswahl)",
-    options=[
-        "Ausgewogen (Standard)",
-        "Tech & AI",
-        "Wachstum",
-        "Dividenden & Value",
-        "Konservativ & defensiv",
-    ],
+    options=PROFILE_OPTIONS,
     index=0, key="profil"
 )
 
@@ -596,14 +190,23 @@ shuffle_rotation = st.checkbox(
 with st.expander("🔧 Optional (Advanced)", expanded=False):
     profil_staerke = st.selectbox(
         "Profil-Stärke (wie stark das Profil die Rotation beeinflusst)",
-        options=["Mild", "Normal", "Strong"],
+        options=STRENGTH_OPTIONS,
         index=2, key="profil_staerke"
     )
     show_tag_table = st.checkbox("Rotation-Kategorisierung anzeigen (Tabelle)", value=False, key="show_tag_table")
+    show_diagnostics = st.checkbox("Diagnose anzeigen (Laufzeiten je Stufe, Zähler, Speicher)", value=False, key="show_diagnostics")
+    st.checkbox(
+        "Live-Aktualisierung (bei jeder Änderung neu rechnen – nur geänderte Stufen laufen neu)",
+        value=False, key="live_update"
+    )
     st.caption("Mild = wenig Filter • Strong = harter Filter (Fallback wenn zu wenige Treffer)")
+    st.number_input("Max. Rate pro Name (€/Monat, 0 = keine Grenze)", min_value=0.0, value=0.0, step=5.0, key="max_rate_pro_name")
+    st.number_input("Mindestordergröße des Brokers (€)", min_value=0.0, value=0.0, step=1.0, key="min_order_betrag")
+    st.text_area("ETF-Mindestraten (eine Zeile pro ETF: Name=Betrag)", value="", height=80, key="etf_mindestraten")
 
 profil_staerke = st.session_state.get("profil_staerke", "Strong")
 show_tag_table = st.session_state.get("show_tag_table", False)
+show_diagnostics = st.session_state.get("show_diagnostics", False)
 
 favs_pro_monat = st.slider("Wie viele Favoriten pro Monat besparen?", 1, 3, 2, key="favs_pro_monat")
 
@@ -626,265 +229,209 @@ st.button("Sparplan berechnen", on_click=request_compute)
 # -----------------------------
 # Compute (only when triggered) -> store in session_state
 # -----------------------------
-def compute_plan(
-    zielsumme, monate, aktienanteil, anzahl_aktien_pro_monat,
-    favoriten_text, rotation_text, etfs_text,
-    max_aktien, max_etfs, begrenze_rotation,
-    profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
-    favs_pro_monat, fav_multiplier, min_rate_rotation, top_n_chart, show_tag_table
-):
-    info_limits = []
-    info_adjustments = []
-
-    fav_list_raw = clean_lines(favoriten_text)
-    rot_list_raw = clean_lines(rotation_text)
-    etf_list_raw = clean_lines(etfs_text)
-
-    if not monate or monate <= 0:
-        raise ValueError("Die Dauer (Monate) muss größer als 0 sein.")
-
-    etf_anteil_local = 100 - aktienanteil
-    if not etf_list_raw:
-        aktienanteil_local = 100
-        etf_anteil_local = 0
-    else:
-        aktienanteil_local = aktienanteil
-
-    monatlicher_betrag = zielsumme / monate
-    aktien_budget = monatlicher_betrag * aktienanteil_local / 100
-    etf_budget = monatlicher_betrag * etf_anteil_local / 100
-
-    # ETFs limitieren
-    etf_list = pick_etfs(etf_list_raw, int(max_etfs)) if etf_list_raw else []
-    if len(etf_list_raw) > len(etf_list):
-        info_limits.append(f"ETF-Limit aktiv: {len(etf_list_raw)} eingegeben → **{len(etf_list)}** werden verwendet.")
-
-    # Aktien-Limit: Rotation wird PROFIL-BASIERT gepickt
-    fav_list = fav_list_raw[:]
-    rot_list_all = rot_list_raw[:]
-    max_aktien_int = int(max_aktien)
-
-    if len(fav_list) > max_aktien_int:
-        fav_list = fav_list[:max_aktien_int]
-        rot_list = []
-        info_limits.append(
-            f"Aktien-Limit: Favoriten > Max. Aktien → Favoriten auf {max_aktien_int} gekürzt, Rotation deaktiviert."
-        )
-    else:
-        rot_slots = max_aktien_int - len(fav_list)
-
-        rot_list_picked = pick_rotation_by_profile(
-            rot_list_all,
-            profile=profil,
-            strength=profil_staerke,
-            repeatable=auswahl_wiederholbar,
-            do_shuffle=shuffle_rotation,
-            desired_pool_size=rot_slots,
-            balanced_risk_cap_pct=0.25,
-            balanced_min_per_tag=1
-        )
-        rot_list = rot_list_picked[:rot_slots]
-
-        if len(rot_list_all) > len(rot_list):
-            info_limits.append(
-                f"Aktien-Limit aktiv: Rotation wurde profil-basiert auf **{rot_slots}** Aktien gepickt (Max Aktien {max_aktien_int})."
-            )
-
-        if profil == "Ausgewogen (Standard)" and rot_list:
-            risk_cnt = sum(1 for s in rot_list if is_risky(s))
-            risk_pct = (risk_cnt / len(rot_list) * 100) if rot_list else 0.0
-            info_adjustments.append(
-                f"Ausgewogen: Diversifikation aktiv (1× je Tag soweit möglich) • Risk gedeckelt (~25%) • "
-                f"im Pool: **{risk_cnt}/{len(rot_list)}** riskige Werte (**{risk_pct:.0f}%**)."
-            )
-
-    # ETF-Raten
-    raw_weights = {etf: etf_weight_for(etf) for etf in etf_list}
-    total_w = sum(raw_weights.values())
-    etf_raten = {}
-    if etf_list:
-        if total_w > 0:
-            for etf, w in raw_weights.items():
-                etf_raten[etf] = etf_budget * (w / total_w)
-        else:
-            equal = etf_budget / len(etf_list)
-            for etf in etf_list:
-                etf_raten[etf] = equal
-
-    # Favoriten/Rotation: Anzahl pro Monat
-    favs_pro_monat_eff = min(favs_pro_monat, len(fav_list)) if fav_list else 0
-    rot_per_month_user = max(0, anzahl_aktien_pro_monat - favs_pro_monat_eff)
-    if not rot_list:
-        rot_per_month_user = 0
-    rot_per_month_eff = rot_per_month_user
-
-    # Multiplikatorverteilung
-    fav_count = favs_pro_monat_eff
-    rot_count = rot_per_month_eff
-
-    if rot_count == 0 and fav_count > 0:
-        rot_rate = 0.0
-        fav_rate_per_fav = aktien_budget / fav_count
-        info_adjustments.append("Keine Rotation möglich → gesamtes Aktienbudget geht in Favoriten.")
-    elif fav_count == 0 and rot_count > 0:
-        fav_rate_per_fav = 0.0
-        rot_rate = aktien_budget / rot_count
-    elif fav_count == 0 and rot_count == 0:
-        fav_rate_per_fav = 0.0
-        rot_rate = 0.0
-        info_adjustments.append("Keine Aktien ausgewählt (Favoriten/Rotation leer).")
-    else:
-        denom = (rot_count * 1.0) + (fav_count * float(fav_multiplier))
-        rot_rate = aktien_budget / denom if denom > 0 else 0.0
-        fav_rate_per_fav = rot_rate * float(fav_multiplier)
-
-    # Mindestbetrag Rotation prüfen
-    if rot_per_month_eff > 0 and min_rate_rotation > 0 and rot_rate < min_rate_rotation:
-        while rot_per_month_eff > 0:
-            denom = (rot_per_month_eff * 1.0) + (fav_count * float(fav_multiplier))
-            candidate_rot_rate = aktien_budget / denom if denom > 0 else 0.0
-            if candidate_rot_rate >= min_rate_rotation:
-                rot_rate = candidate_rot_rate
-                fav_rate_per_fav = rot_rate * float(fav_multiplier)
-                break
-            rot_per_month_eff -= 1
-
-        info_adjustments.append(
-            f"Rotation-Aktien/Monat reduziert, damit mind. {min_rate_rotation:.2f}€ pro Rotation-Aktie erreicht werden."
-        )
-
-        if rot_per_month_eff == 0 and fav_count > 0:
-            rot_rate = 0.0
-            fav_rate_per_fav = aktien_budget / fav_count
-            info_adjustments.append("Rotation fiel auf 0 → gesamtes Aktienbudget geht in Favoriten.")
-
-    # Rotation Pool Reihenfolge: Ausgewogen optional shuffle (nur Reihenfolge)
-    rot_list_effective = rot_list[:]
-    if profil == "Ausgewogen (Standard)" and shuffle_rotation and len(rot_list_effective) > 1:
-        seed = profile_seed(profil) if auswahl_wiederholbar else None
-        random.seed(seed)
-        random.shuffle(rot_list_effective)
-
-    # Trefferquote
-    if rot_list_effective:
-        scored_ui = [(score_rotation(s, profil), s) for s in rot_list_effective]
-        hits = sum(1 for sc, _ in scored_ui if sc > 0)
-        pct = (hits / len(rot_list_effective) * 100) if rot_list_effective else 0.0
-    else:
-        hits, pct = 0, 0.0
-
-    # Rotation Subset nach Slots (Zeitfenster)
-    slots_rot_total = int(monate) * int(rot_per_month_eff)
-    if begrenze_rotation and rot_per_month_eff > 0 and len(rot_list_effective) > slots_rot_total:
-        dropped = len(rot_list_effective) - slots_rot_total
-        rot_list_effective = rot_list_effective[:slots_rot_total]
-        info_adjustments.append(
-            f"Rotation gekürzt: {len(rot_list)} im Pool, aber nur {slots_rot_total} Rotation-Slots "
-            f"({monate}×{rot_per_month_eff}) → {dropped} Werte wurden nicht berücksichtigt."
-        )
-
-    # Roadmaps
-    fav_roadmap, rot_roadmap = [], []
-    monate_int = int(monate)
-
-    for i in range(monate_int):
-        if favs_pro_monat_eff > 0:
-            start_fav = i % len(fav_list)
-            favs = [fav_list[(start_fav + k) % len(fav_list)] for k in range(favs_pro_monat_eff)]
-        else:
-            favs = []
-        fav_roadmap.append(favs)
-
-        if rot_per_month_eff > 0 and rot_list_effective:
-            start_rot = (i * rot_per_month_eff) % len(rot_list_effective)
-            rot = rot_list_effective[start_rot:start_rot + rot_per_month_eff]
-            if len(rot) < rot_per_month_eff and len(rot_list_effective) > 0:
-                rot += rot_list_effective[0:rot_per_month_eff - len(rot)]
-            rot_roadmap.append(rot)
-        else:
-            rot_roadmap.append([])
-
-    # Summen aggregieren
-    aktien_sum = {}
-    for m in range(monate_int):
-        for a in fav_roadmap[m]:
-            aktien_sum[a] = aktien_sum.get(a, 0) + fav_rate_per_fav
-        for a in rot_roadmap[m]:
-            aktien_sum[a] = aktien_sum.get(a, 0) + rot_rate
+@st.cache_resource(show_spinner=False)
+def plan_cache() -> PlanCache:
+    # Ein Cache pro Prozess, geteilt von allen Sessions (optional auf Platte)
+    return PlanCache(
+        maxsize=int(os.environ.get("SPARPLAN_CACHE_SIZE", 256)),
+        ttl=float(os.environ.get("SPARPLAN_CACHE_TTL", 3600)),
+        directory=os.environ.get("SPARPLAN_CACHE_DIR") or None,
+    )
 
-    etf_sum = {etf: etf_raten.get(etf, 0) * monate_int for etf in etf_list}
+@st.cache_resource(show_spinner=False, max_entries=4)
+def price_store(directory: str, stamp):
+    # Einmal je Stand gemappt; alle Sessions/Backtests teilen die Spalten.
+    # stamp (Verzeichnis + Index) wechselt, wenn der Store neu gebaut oder ersetzt wird.
+    from sparplan.backtest import PriceStore
 
-    all_data = []
-    for name, betrag in aktien_sum.items():
-        typ = "Favorit" if name in fav_list else "Rotation"
-        all_data.append({"Name": name, "Typ": typ, "Gesamtbetrag (€)": round(betrag, 2)})
+    return PriceStore(directory)
 
-    for name, betrag in etf_sum.items():
-        all_data.append({"Name": name, "Typ": "ETF", "Gesamtbetrag (€)": round(betrag, 2)})
+def price_store_stamp(directory: str):
+    from sparplan.backtest import INDEX_FILE
 
-    df_export = pd.DataFrame(all_data)
+    try:
+        d, idx = os.stat(directory), os.stat(os.path.join(directory, INDEX_FILE))
+        return d.st_ino, d.st_mtime_ns, idx.st_ino, idx.st_mtime_ns
+    except OSError:
+        return None  # PriceStore meldet den Fehler
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_chart_pngs(token: str, top_n: int, _df_export) -> dict:
+    # Ein Satz PNGs pro (Ergebnis, top_n); Figuren werden nach dem Speichern freigegeben
+    return render_chart_pngs(_df_export, top_n)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_vega_specs(token: str, top_n: int, _df_export) -> dict:
+    # Nur die Spezifikation wird gecacht – gerendert wird im Browser
+    return vega_chart_specs(_df_export, top_n)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_totals_csv(token: str, _df_export) -> bytes:
+    return _df_export.to_csv(index=False).encode("utf-8")
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_schedule(token: str, fmt: str, _res) -> bytes:
+    # Orderliste Monat × Instrument; wird blockweise aus den Roadmaps geschrieben
+    return schedule_bytes(_res, fmt)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_rotation_view(token: str, profile: str, _names) -> dict:
+    # Tag-Tabelle + Top 5 einmal pro Ergebnis; Reruns durch andere Widgets
+    # lösen keine Namen mehr auf (token: Plan-Key inkl. Texte + Stammdaten)
+    vec = rotation_vectors(_names, profile)
+    table = pd.DataFrame({
+        "Name": list(_names),
+        "Tags": [", ".join(t) for t in vec.tags],
+        "Profil-Score": list(vec.scores),
+    })
+    top5 = sorted(zip(vec.scores, _names), key=lambda t: t[0], reverse=True)[:5]
+    return {
+        "table": table,
+        "top5": [(sc, name, ", ".join(explain_rotation(name, profile))) for sc, name in top5],
+    }
 
+def current_params() -> dict:
+    # Eingaben der Maske -> Parameter für compute_plan (auch Basis für den Sweep)
     return {
-        "monatlicher_betrag": monatlicher_betrag,
-        "etf_list": etf_list,
-        "etf_raten": etf_raten,
-        "fav_list": fav_list,
-        "rot_list_effective": rot_list_effective,
-        "fav_rate_per_fav": fav_rate_per_fav,
-        "rot_rate": rot_rate,
-        "monate_int": monate_int,
-        "fav_roadmap": fav_roadmap,
-        "rot_roadmap": rot_roadmap,
-        "df_export": df_export,
-        "hits": hits,
-        "pct": pct,
-        "profil": profil,
-        "profil_staerke": profil_staerke,
-        "auswahl_wiederholbar": auswahl_wiederholbar,
-        "info_limits": info_limits,
-        "info_adjustments": info_adjustments,
-        "top_n_chart": top_n_chart,
-        "show_tag_table": show_tag_table,
-        "fav_multiplier": float(fav_multiplier),
+        "zielsumme": st.session_state.zielsumme,
+        "monate": st.session_state.monate,
+        "aktienanteil": st.session_state.aktienanteil,
+        "anzahl_aktien_pro_monat": st.session_state.anzahl_aktien_pro_monat,
+        "favoriten_text": st.session_state.favoriten,
+        "rotation_text": st.session_state.rotation_aktien,
+        "etfs_text": st.session_state.etfs,
+        "max_aktien": st.session_state.max_aktien,
+        "max_etfs": st.session_state.max_etfs,
+        "begrenze_rotation": st.session_state.begrenze_rotation,
+        "profil": st.session_state.profil,
+        "profil_staerke": st.session_state.get("profil_staerke", "Strong"),
+        "auswahl_wiederholbar": st.session_state.auswahl_wiederholbar,
+        "shuffle_rotation": st.session_state.shuffle_rotation,
+        "favs_pro_monat": st.session_state.favs_pro_monat,
+        "fav_multiplier": st.session_state.fav_multiplier,
+        "min_rate_rotation": st.session_state.min_rate_rotation,
+        "max_rate_pro_name": st.session_state.get("max_rate_pro_name", 0.0) or None,
+        "min_order_betrag": st.session_state.get("min_order_betrag", 0.0),
+        "etf_mindestraten": parse_minimums(st.session_state.get("etf_mindestraten", "")) or None,
     }
 
-# ✅ NUR wenn Button gedrückt wurde, wird compute ausgeführt
-if st.session_state._do_compute:
+def session_pipeline() -> PlanPipeline:
+    # Pro Session: jede Stufe läuft nur neu, wenn sich ihre eigenen Eingaben ändern
+    pipeline = session_value("pipeline")
+    if pipeline is None:
+        pipeline = PlanPipeline()
+        set_session_value("pipeline", pipeline)
+    return pipeline
+
+@st.cache_resource(show_spinner=False)
+def job_queue() -> JobQueue:
+    # Ein Pool pro Prozess: begrenzt die gleichzeitig laufenden Rechnungen aller Sessions
+    return JobQueue(max_workers=int(os.environ.get("SPARPLAN_JOB_WORKERS", 2)))
+
+JOB_LABELS = {"plan": "Sparplan", "mc": "Monte-Carlo", "sweep": "Sweep"}
+
+def session_jobs() -> dict:
+    # Art -> {"id": Job-ID, ...Kontext für die Übernahme des Ergebnisses}
+    if "jobs" not in st.session_state:
+        st.session_state.jobs = {}
+    return st.session_state.jobs
+
+def submit_job(kind: str, fn, *args, context: dict | None = None, **kwargs) -> None:
+    # Höchstens ein Job je Art und Session: ein neuer ersetzt den alten
+    old = session_jobs().get(kind)
+    if old is not None:
+        job_queue().cancel(old["id"])
+    session_jobs()[kind] = {"id": job_queue().submit(kind, fn, *args, **kwargs), **(context or {})}
+
+def run_plan_job(pipeline: PlanPipeline, cache: PlanCache, params: dict, reshuffle: bool, profiler):
+    # Läuft im Worker-Thread: kein st.* hier, nur Kern-Objekte
+    with (profiler.activate() if profiler else nullcontext()):
+        return cache.compute(runner=partial(pipeline.run, reshuffle=reshuffle), **params)
+
+def collect_jobs() -> None:
+    # Fertige Jobs dieser Session übernehmen (vor dem Rendern der Ergebnisse)
+    for kind, entry in list(session_jobs().items()):
+        if job_queue().get(entry["id"]) is None:
+            del session_jobs()[kind]  # verworfen (z. B. Server-Neustart)
+            continue
+        job = job_queue().pop(entry["id"])
+        if job is None:
+            continue
+        del session_jobs()[kind]
+        if job.status == CANCELLED:
+            st.info(f"{JOB_LABELS[kind]}: abgebrochen.")
+        elif job.status != DONE:
+            st.error(f"{JOB_LABELS[kind]}: {job.error}" if kind != "plan" else job.error)
+            if kind == "plan":
+                st.session_state.last_params = entry["params"]  # live: nicht endlos neu versuchen
+        elif kind == "plan":
+            res, from_cache = job.result
+            params = entry["params"]
+            set_session_value("result", res)
+            set_session_value("pipeline", entry["pipeline"])  # Größe nach dem Lauf neu schätzen
+            # Schlüssel für die Chart-Caches: deterministische Pläne teilen ihn sessionübergreifend
+            st.session_state.result_token = plan_cache_key(params) if is_cacheable(params) else uuid.uuid4().hex
+            st.session_state.last_params = params
+            st.session_state.last_info_limits = res["info_limits"]
+            st.session_state.last_info_adjustments = res["info_adjustments"]
+            profiler = entry["profiler"]
+            set_session_value("last_diagnostics", profiler.report() if profiler else None)
+            if not entry["live"]:
+                st.success("Sparplan erfolgreich berechnet! ✅" + (" (aus Cache)" if from_cache else ""))
+        elif kind == "mc":
+            set_session_value("mc_result", dict(job.result, token=entry.get("token")))
+        elif kind == "sweep":
+            set_session_value("sweep_result", job.result)
+
+@st.fragment(run_every=0.5)
+def job_panel():
+    # Pollt nur den Fortschritt; ist ein Job fertig, läuft die ganze Seite neu
+    for kind, entry in list(session_jobs().items()):
+        snap = job_queue().status(entry["id"])
+        if snap is None or snap["status"] in FINISHED:
+            st.rerun()
+        jp_col1, jp_col2 = st.columns([5, 1], vertical_alignment="bottom")
+        if snap["status"] == QUEUED:
+            text = f"{JOB_LABELS[kind]}: wartet auf einen freien Worker …"
+        else:
+            text = f"{JOB_LABELS[kind]}: {snap['message'] or 'läuft'} … {snap['progress']:.0%} ({snap['run_s']:.1f} s)"
+        jp_col1.progress(snap["progress"], text=text)
+        jp_col2.button("Abbrechen", key=f"cancel_{kind}", on_click=job_queue().cancel, args=(entry["id"],))
+
+# ✅ Berechnet wird per Button-Klick – oder (opt-in) live, sobald sich eine Eingabe ändert.
+# Gerechnet wird im Hintergrund (Job-Queue); die Seite pollt nur den Fortschritt.
+params = current_params()
+pending_plan = session_jobs().get("plan")
+live_compute = (
+    st.session_state.get("live_update", False)
+    and not st.session_state._do_compute
+    and params != st.session_state.get("last_params")
+    and (pending_plan is None or params != pending_plan["params"])
+)
+if st.session_state._do_compute or live_compute:
     st.session_state._do_compute = False
-    try:
-        with st.spinner("Berechne Sparplan..."):
-            res = compute_plan(
-                zielsumme=st.session_state.zielsumme,
-                monate=st.session_state.monate,
-                aktienanteil=st.session_state.aktienanteil,
-                anzahl_aktien_pro_monat=st.session_state.anzahl_aktien_pro_monat,
-                favoriten_text=st.session_state.favoriten,
-                rotation_text=st.session_state.rotation_aktien,
-                etfs_text=st.session_state.etfs,
-                max_aktien=st.session_state.max_aktien,
-                max_etfs=st.session_state.max_etfs,
-                begrenze_rotation=st.session_state.begrenze_rotation,
-                profil=st.session_state.profil,
-                profil_staerke=st.session_state.get("profil_staerke", "Strong"),
-                auswahl_wiederholbar=st.session_state.auswahl_wiederholbar,
-                shuffle_rotation=st.session_state.shuffle_rotation,
-                favs_pro_monat=st.session_state.favs_pro_monat,
-                fav_multiplier=st.session_state.fav_multiplier,
-                min_rate_rotation=st.session_state.min_rate_rotation,
-                top_n_chart=st.session_state.top_n_chart,
-                show_tag_table=st.session_state.get("show_tag_table", False),
-            )
-        st.session_state.result = res
-        st.session_state.last_info_limits = res["info_limits"]
-        st.session_state.last_info_adjustments = res["info_adjustments"]
-        st.success("Sparplan erfolgreich berechnet! ✅")
-    except Exception as e:
-        st.error(str(e))
+    compute_prof = Profiler(track_allocations=True) if show_diagnostics else None
+    # Button: "jedes Mal neu" gemischte Pläne neu würfeln; live: Auswahl stehen lassen
+    pipeline = session_pipeline()
+    submit_job(
+        "plan", run_plan_job, pipeline, plan_cache(), params, not live_compute, compute_prof,
+        context={"params": params, "live": live_compute, "profiler": compute_prof, "pipeline": pipeline},
+    )
+
+collect_jobs()
+if session_jobs():
+    job_panel()
 
 # -----------------------------
 # Render result (no re-calc needed)
 # -----------------------------
-res = st.session_state.result
+res = session_value("result")
+if res is None and st.session_state.get("result_token"):
+    # vom SessionStore freigegeben (Leerlauf/Speichergrenze): Live-Modus rechnet neu
+    st.session_state.result_token = None
+    st.session_state.pop("last_params", None)
+    st.info("Das Ergebnis wurde freigegeben (Inaktivität bzw. Speichergrenze des Servers) – bitte neu berechnen.")
+render_prof = Profiler() if show_diagnostics else None
 if res is not None:
     st.divider()
 
@@ -903,92 +450,75 @@ if res is not None:
     with st.expander("🧩 Gepickter Rotation-Pool (2-Spalten)", expanded=False):
         render_two_col_grid(res["rot_list_effective"])
 
-    if res["show_tag_table"] and res["rot_list_effective"]:
-        rows = []
-        for s in res["rot_list_effective"]:
-            rows.append({
-                "Name": s,
-                "Tags": ", ".join(tags_for_rotation(s)),
-                "Profil-Score": score_rotation(s, res["profil"])
-            })
-        st.subheader("Rotation-Kategorisierung")
-        st.dataframe(pd.DataFrame(rows), use_container_width=True)
-
-    if res["rot_list_effective"]:
-        top5 = sorted(
-            [(score_rotation(s, res["profil"]), s) for s in res["rot_list_effective"]],
-            key=lambda t: t[0], reverse=True
-        )[:5]
-        with st.expander("🔍 Profil-Details (Top 5 Picks)", expanded=False):
-            show_reason = st.checkbox("Kurzbegründung anzeigen", value=True, key="show_reason_top5")
-            for i, (sc, name) in enumerate(top5, start=1):
-                if show_reason:
-                    reasons = ", ".join(explain_rotation(name, res["profil"]))
-                    st.markdown(f"{i}. **{name}** — Score **{sc:+d}** _(Tags: {reasons})_")
-                else:
-                    st.markdown(f"{i}. **{name}** — Score **{sc:+d}**")
-
-    st.subheader("Gesamtübersicht")
-    st.dataframe(res["df_export"], use_container_width=True)
-
-    csv = res["df_export"].to_csv(index=False).encode("utf-8")
-    st.download_button("CSV herunterladen", data=csv, file_name="sparplan_gesamtuebersicht.csv", mime="text/csv")
+    with stage("render_tags", profiler=render_prof):
+        rot_view = cached_rotation_view(
+            st.session_state.get("result_token") or "-", res["profil"], res["rot_list_effective"]
+        ) if res["rot_list_effective"] else None
+        if show_tag_table and rot_view:
+            st.subheader("Rotation-Kategorisierung")
+            st.dataframe(rot_view["table"], width="stretch")
+
+        if rot_view:
+            with st.expander("🔍 Profil-Details (Top 5 Picks)", expanded=False):
+                show_reason = st.checkbox("Kurzbegründung anzeigen", value=True, key="show_reason_top5")
+                for i, (sc, name, reasons) in enumerate(rot_view["top5"], start=1):
+                    if show_reason:
+                        st.markdown(f"{i}. **{name}** — Score **{sc:+d}** _(Tags: {reasons})_")
+                    else:
+                        st.markdown(f"{i}. **{name}** — Score **{sc:+d}**")
+
+    with stage("render_overview", profiler=render_prof):
+        st.subheader("Gesamtübersicht")
+        st.dataframe(res["df_export"], width="stretch")
+
+        # Downloads werden erst beim Klick gebaut (Callable) und pro Ergebnis gecacht
+        token = st.session_state.get("result_token") or "-"
+        st.download_button(
+            "CSV herunterladen", data=partial(cached_totals_csv, token, res["df_export"]),
+            file_name="sparplan_gesamtuebersicht.csv", mime="text/csv",
+        )
+        ex_col1, ex_col2 = st.columns([1, 3], vertical_alignment="bottom")
+        export_fmt = ex_col1.selectbox("Format", available_formats(), key="export_fmt")
+        ext, mime = EXPORT_FORMATS[export_fmt]
+        ex_col2.download_button(
+            "Monatsfahrplan (Orderliste) herunterladen", data=partial(cached_schedule, token, export_fmt, res),
+            file_name=f"sparplan_fahrplan.{ext}", mime=mime,
+        )
 
     # ✅ Charts optional (reduziert Hänger stark)
     show_charts = st.checkbox("Charts anzeigen (Performance)", value=False, key="show_charts")
     if show_charts:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        farben = {"Favorit": "tab:green", "Rotation": "tab:orange", "ETF": "tab:blue"}
-
-        df_sorted = res["df_export"].sort_values(by="Gesamtbetrag (€)", ascending=False)
-        top_n_chart = int(res["top_n_chart"])
+        chart_backend = st.radio(
+            "Darstellung", ["Interaktiv (Vega, schnell)", "Bild (matplotlib)"],
+            horizontal=True, key="chart_backend",
+        )
+        with stage("render_charts", profiler=render_prof):
+            top_n_chart = int(st.session_state.top_n_chart)
+            token = st.session_state.get("result_token") or "-"
+            if chart_backend.startswith("Interaktiv"):
+                charts = cached_vega_specs(token, top_n_chart, res["df_export"])
+                st.vega_lite_chart(spec=charts["verteilung"], width="stretch")
+            else:
+                charts = cached_chart_pngs(token, top_n_chart, res["df_export"])
+                st.image(charts["verteilung"], width="stretch")
+
+            if charts["rest_sum"] > 0:
+                st.caption(f"Others (Rest): {charts['rest_sum']:,.2f} €")
+
+            for key in ("typ", "etf"):
+                if charts[key] is None:
+                    continue
+                if chart_backend.startswith("Interaktiv"):
+                    st.vega_lite_chart(spec=charts[key], width="stretch")
+                else:
+                    st.image(charts[key])
 
-        rest_sum = 0.0
-        if len(df_sorted) > top_n_chart:
-            df_plot = df_sorted.head(top_n_chart).copy()
-            rest_sum = df_sorted.iloc[top_n_chart:]["Gesamtbetrag (€)"].sum()
-        else:
-            df_plot = df_sorted
-
-        farben_liste = [farben.get(t, "gray") for t in df_plot["Typ"]]
-        ax.barh(df_plot["Name"], df_plot["Gesamtbetrag (€)"], color=farben_liste)
-        ax.set_xlabel("Gesamtbetrag (€)")
-        ax.set_title("Verteilung nach Sparplan")
-        ax.invert_yaxis()
-
-        from matplotlib.patches import Patch
-        legende_farben = [
-            Patch(facecolor='tab:green', label='Favorit'),
-            Patch(facecolor='tab:orange', label='Rotation'),
-            Patch(facecolor='tab:blue', label='ETF')
-        ]
-        ax.legend(handles=legende_farben, loc='lower right')
-        ax.tick_params(axis='y', labelsize=8)
-        plt.tight_layout()
-        st.pyplot(fig)
-
-        if rest_sum > 0:
-            st.caption(f"Others (Rest): {rest_sum:,.2f} €")
-
-        gruppe = res["df_export"].groupby("Typ")["Gesamtbetrag (€)"].sum()
-        fig1, ax1 = plt.subplots()
-        ax1.bar(gruppe.index, gruppe.values, color=[farben.get(t, "gray") for t in gruppe.index])
-        ax1.set_title("Verteilung nach Typ")
-        ax1.set_ylabel("Gesamtbetrag (€)")
-        st.pyplot(fig1)
-
-        etf_df = res["df_export"][res["df_export"]["Typ"] == "ETF"]
-        if not etf_df.empty:
-            fig2, ax2 = plt.subplots()
-            ax2.pie(etf_df["Gesamtbetrag (€)"], labels=etf_df["Name"], autopct='%1.1f%%', startangle=140)
-            ax2.set_title("ETF-Allokation")
-            st.pyplot(fig2)
-
-    # ✅ Monatsansicht: Default = Einzelmonat, All-Months limitiert
+    # ✅ Monatsansicht: Default = Einzelmonat, alle Monate seitenweise in einer Tabelle
     st.subheader("Monatliche Raten")
-    show_all = st.checkbox("Alle Monate anzeigen (lang)", value=False, key="show_all_months")
+    show_all = st.checkbox("Alle Monate anzeigen (Tabelle, seitenweise)", value=False, key="show_all_months")
 
-    MAX_MONTH_EXPANDERS = 36  # Schutz gegen Freeze/Hänger
+    def reset_month_page():
+        st.session_state.month_page = 1
 
     def render_month(m_index: int):
         st.markdown(f"**Monat {m_index + 1} – Aktien**")
@@ -1001,24 +531,258 @@ if res is not None:
         for e in res["etf_list"]:
             st.markdown(f"**{e}**: {res['etf_raten'].get(e, 0):.2f} €")
 
-    if show_all:
-        st.caption(f"Performance-Schutz: Es werden max. {MAX_MONTH_EXPANDERS} Monate als Expander gerendert.")
-        max_show = min(res["monate_int"], MAX_MONTH_EXPANDERS)
-        for m in range(max_show):
-            with st.expander(f"Monat {m + 1} anzeigen", expanded=False):
-                render_month(m)
-
-        if res["monate_int"] > MAX_MONTH_EXPANDERS:
-            st.warning(
-                f"Nicht alle Monate gerendert ({MAX_MONTH_EXPANDERS}/{res['monate_int']}). "
-                "Nutze den Einzelmonat-Modus oder erhöhe MAX_MONTH_EXPANDERS."
+    with stage("render_months", profiler=render_prof):
+        if show_all:
+            mv_col1, mv_col2, mv_col3 = st.columns([3, 1, 1])
+            month_filter = mv_col1.multiselect(
+                "Instrumente filtern", plan_instruments(res), key="month_filter", on_change=reset_month_page
+            )
+            page_size = mv_col2.selectbox(
+                "Monate pro Seite", [12, 24, 60, 120], index=1, key="month_page_size", on_change=reset_month_page
+            )
+            page = mv_col3.number_input("Seite", min_value=1, step=1, key="month_page")
+
+            months = months_with(res, month_filter) if month_filter else range(res["monate_int"])
+            start, stop, pages = page_bounds(len(months), page, page_size)
+            if months:
+                st.caption(
+                    f"Seite {min(int(page), pages)}/{pages} • Monate {months[start] + 1}–{months[stop - 1] + 1} "
+                    f"• {len(months)} von {res['monate_int']} Monaten" + (" (gefiltert)" if month_filter else "")
+                )
+            else:
+                st.caption("Keine Monate mit den gewählten Instrumenten.")
+            st.dataframe(
+                month_frame(res, months[start:stop], month_filter),
+                hide_index=True,
+                width="stretch",
+                column_config={"Rate (€)": st.column_config.NumberColumn(format="%.2f €")},
+            )
+        else:
+            month_choice = st.selectbox(
+                "Monat auswählen",
+                options=list(range(1, res["monate_int"] + 1)),
+                index=0,
+                key="month_choice"
+            )
+            with st.expander("Details anzeigen", expanded=True):
+                render_month(month_choice - 1)
+
+    # ✅ Monte-Carlo: Endwert-Projektion nur auf Knopfdruck (numpy wird erst hier geladen)
+    with st.expander("📈 Monte-Carlo-Projektion (Endwert)", expanded=False):
+        st.caption(
+            "Rendite-/Volatilitätsannahmen (Jahreswerte) je Instrument, Tag oder Typ aus einer JSON-Datei; "
+            f"Standard: `{MC_ASSUMPTIONS_PATH}`."
+        )
+        mc_col1, mc_col2 = st.columns(2)
+        mc_paths = mc_col1.select_slider("Pfade", options=[1_000, 10_000, 25_000, 50_000, 100_000], value=10_000, key="mc_paths")
+        mc_seed = mc_col2.number_input("Seed", min_value=0, value=42, step=1, key="mc_seed")
+        mc_upload = st.file_uploader("Eigene Annahmen (JSON)", type=["json"], key="mc_upload")
+
+        if st.button("Simulation starten", key="mc_run"):
+            import json
+            from sparplan.montecarlo import load_assumptions, simulate_plan, validate_assumptions
+
+            try:
+                if mc_upload is not None:
+                    assumptions = json.loads(mc_upload.getvalue().decode("utf-8"))
+                    validate_assumptions(assumptions)
+                else:
+                    assumptions = load_assumptions(MC_ASSUMPTIONS_PATH)
+            except (OSError, ValueError) as e:
+                set_session_value("mc_result", None)
+                st.error(f"Annahmen konnten nicht geladen werden: {e}")
+            else:
+                submit_job(
+                    "mc", simulate_plan, res, assumptions, n_paths=int(mc_paths), seed=int(mc_seed),
+                    context={"token": st.session_state.get("result_token")},
+                )
+                st.rerun()
+
+        # nur zum aktuellen Plan anzeigen (gleiche Laufzeit reicht nicht)
+        mc = session_value("mc_result")
+        if mc is not None and mc.get("token") == st.session_state.get("result_token"):
+            st.markdown(
+                f"Eingezahlt: **{mc['invested']:,.2f} €** • Mittelwert: **{mc['mean']:,.2f} €** • "
+                f"Median: **{mc['percentiles'][50]:,.2f} €** • Verlustwahrscheinlichkeit: **{mc['prob_loss']:.1%}**"
+            )
+            st.dataframe(
+                pd.DataFrame([{"Perzentil": f"P{q}", "Endwert (€)": round(v, 2)} for q, v in mc["percentiles"].items()]),
+                width="stretch",
+            )
+            if mc["fan"] is not None:
+                fan_df = pd.DataFrame(mc["fan"], columns=[f"P{q}" for q in mc["fan_percentiles"]])
+                fan_df.index = fan_df.index + 1
+                fan_df.index.name = "Monat"
+                st.line_chart(fan_df)
+            st.dataframe(pd.DataFrame(mc["buckets"]), width="stretch")
+
+    # ✅ Backtest gegen lokale Monatskurse (Store: python -m sparplan.backtest build …)
+    with st.expander("📉 Backtest (historische Kurse)", expanded=False):
+        bt_dir = st.text_input("Kurs-Store (Verzeichnis)", value=PRICE_STORE_PATH, key="bt_dir")
+        bt_start = st.text_input("Startmonat (JJJJ-MM, leer = jüngste Monate)", value="", key="bt_start")
+
+        if st.button("Backtest starten", key="bt_run"):
+            from sparplan.backtest import backtest_plan
+
+            try:
+                bt = backtest_plan(res, price_store(bt_dir, price_store_stamp(bt_dir)), start=bt_start.strip() or None)
+                set_session_value("bt_result", dict(bt, token=st.session_state.get("result_token")))
+            except (OSError, ValueError) as e:
+                set_session_value("bt_result", None)
+                st.error(f"Backtest nicht möglich: {e}")
+
+        bt = session_value("bt_result")
+        if bt is not None and bt.get("token") == st.session_state.get("result_token"):
+            st.markdown(
+                f"{bt['start']} – {bt['end']} • Eingezahlt: **{bt['invested']:,.2f} €** • "
+                f"Endwert: **{bt['final_value']:,.2f} €** • Max. Drawdown: **{bt['max_drawdown']:.1%}**"
             )
-    else:
-        month_choice = st.selectbox(
-            "Monat auswählen",
-            options=list(range(1, res["monate_int"] + 1)),
-            index=0,
-            key="month_choice"
+            if bt["missing"]:
+                st.warning(f"Keine Kurse für {len(bt['missing'])} Instrument(e) – Raten bleiben als Cash: "
+                           + ", ".join(bt["missing"][:10]) + (" …" if len(bt["missing"]) > 10 else ""))
+            bt_df = pd.DataFrame({"Depotwert (€)": bt["value"], "Einzahlungen (€)": bt["cost_basis"]}, index=bt["dates"])
+            bt_df.index.name = "Monat"
+            st.line_chart(bt_df)
+            st.dataframe(pd.DataFrame(bt["instruments"]), width="stretch")
+
+    # ✅ Optimierung: feste Rate je Instrument (Ziel-Tags, Risiko-Deckel, Mindestrate, Stückelung)
+    with st.expander("🎯 Optimierung (Rate je Instrument)", expanded=False):
+        from sparplan.optimizer import optimize_plan
+
+        st.caption(
+            "Jedes Instrument bekommt eine feste Monatsrate in ganzen Stückelungen; Aktien- und ETF-Budget bleiben "
+            "wie im Plan. Ziel-Anteile kommen aus dem Profil (Ausgewogen: gleich über alle Tags), riskante Werte "
+            "werden gedeckelt. Favoriten bleiben drin, solange Budget und Risiko-Deckel es zulassen – sonst erscheint "
+            "ein Hinweis. Nach einer Änderung startet der Löser beim letzten Ergebnis."
+        )
+        op_col1, op_col2, op_col3 = st.columns(3)
+        opt_target = op_col1.slider(
+            "Ziel-Anteil Profil-Tags (%)", 0, 100, 60, step=5, key="opt_target_share",
+            disabled=not PROFILE_WANTED_TAGS.get(res["profil"]),
+        )
+        opt_risk = op_col2.slider("Risiko-Deckel (%)", 0, 100, 25, key="opt_risk_cap")
+        opt_fidelity = op_col3.slider("Nähe zum Regelplan", 0.0, 2.0, 0.5, step=0.1, key="opt_fidelity")
+        op_col4, op_col5 = st.columns(2)
+        opt_min = op_col4.number_input("Mindestrate je Name (€)", min_value=0.0, value=25.0, step=1.0, key="opt_min_rate")
+        opt_step = op_col5.selectbox("Stückelung (€)", [1.0, 5.0, 10.0, 25.0, 50.0], key="opt_step")
+
+        if st.toggle("Optimierung aktiv (rechnet bei jeder Änderung neu)", key="opt_active"):
+            opt_settings = {
+                "target_share": opt_target / 100,
+                "risk_cap": opt_risk / 100,
+                "fidelity": opt_fidelity,
+                # Mindestorder des Brokers gilt auch hier; max. Rate pro Name aus den Advanced-Einstellungen
+                "min_rate": max(opt_min, st.session_state.get("min_order_betrag", 0.0)),
+                "step": opt_step,
+                "max_rate": st.session_state.get("max_rate_pro_name", 0.0) or None,
+            }
+            opt_key = (st.session_state.get("result_token") or "-", tuple(sorted(opt_settings.items())))
+            opt = session_value("opt_result")
+            if opt is None or opt["key"] != opt_key:
+                try:
+                    opt = dict(optimize_plan(res, warm=opt, **opt_settings), key=opt_key)
+                except ValueError as e:
+                    opt = None
+                    st.error(f"Optimierung nicht möglich: {e}")
+                set_session_value("opt_result", opt)
+
+            if opt is not None:
+                st.markdown(
+                    f"**{opt['positions']}** Positionen • Abstand zu den Ziel-Anteilen: "
+                    f"**{opt['tracking'][0]:.1f} → {opt['tracking'][1]:.1f}** Prozentpunkte • "
+                    f"Risiko-Anteil: **{opt['risk_share'][0]:.0%} → {opt['risk_share'][1]:.0%}**"
+                    + (f" • unverteilt: **{opt['unallocated']:.2f} €**/Monat" if opt["unallocated"] > 0 else "")
+                )
+                st.caption(
+                    f"{opt['ms']:.0f} ms • {'Warmstart' if opt['warm'] else 'Kaltstart'} • {opt['moves']} Züge"
+                )
+                for conflict in opt["conflicts"]:
+                    st.warning(conflict)
+                opt_df = pd.DataFrame(opt["rows"])
+                st.dataframe(
+                    opt_df, hide_index=True, width="stretch",
+                    column_config={c: st.column_config.NumberColumn(format="%.2f €") for c in ("Rate (€)", "Planrate (€)")},
+                )
+                st.download_button(
+                    "Optimierte Raten herunterladen (CSV)", data=opt_df.to_csv(index=False).encode("utf-8"),
+                    file_name="sparplan_optimiert.csv", mime="text/csv",
+                )
+                st.dataframe(pd.DataFrame(opt["exposures"]), hide_index=True, width="stretch")
+
+# -----------------------------
+# Parameter-Sweep (Heatmap)
+# -----------------------------
+with st.expander("🗺️ Parameter-Sweep (Heatmap)", expanded=False):
+    from sparplan.sweep import METRICS, SWEEPABLE, grid_values, sweep
+
+    st.caption("Listen (Parsen, Tags, Profil-Pick) werden einmal berechnet; pro Zelle nur Raten und Kennzahlen.")
+    sweep_names = list(SWEEPABLE)
+    sweep_axes = {}
+    for axis, default in (("x", 0), ("y", 1)):
+        c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+        param = c1.selectbox(f"{axis}-Achse", sweep_names, index=default, format_func=lambda k: SWEEPABLE[k][0], key=f"sweep_{axis}")
+        lo, hi, steps = SWEEPABLE[param][1]
+        v_from = c2.number_input("von", value=float(lo), key=f"sweep_{axis}_{param}_from")
+        v_to = c3.number_input("bis", value=float(hi), key=f"sweep_{axis}_{param}_to")
+        v_steps = c4.number_input("Schritte", min_value=1, max_value=50, value=int(steps), key=f"sweep_{axis}_{param}_steps")
+        sweep_axes[axis] = (param, grid_values(param, v_from, v_to, v_steps))
+    sweep_metric = st.selectbox("Kennzahl", list(METRICS), format_func=METRICS.get, key="sweep_metric")
+
+    if st.button("Sweep berechnen", key="sweep_run"):
+        submit_job("sweep", sweep, current_params(), *sweep_axes["x"], *sweep_axes["y"])
+        st.rerun()
+
+    sw = session_value("sweep_result")
+    if sw is not None:
+        # Figure ohne pyplot-Registry: nach dem Rendern sofort frei
+        st.image(render_heatmap_png(
+            sw["metrics"][sweep_metric], sw["x_values"], sw["y_values"],
+            SWEEPABLE[sw["x"]][0], SWEEPABLE[sw["y"]][0], METRICS[sweep_metric],
+        ), width="stretch")
+        st.caption(f"{sw['cells']} Zellen in {sw['ms']:.0f} ms" + (f" • {sw['errors']} ungültig" if sw["errors"] else ""))
+
+# -----------------------------
+# Diagnose (opt-in)
+# -----------------------------
+if show_diagnostics:
+    with st.expander("🩺 Diagnostics", expanded=False):
+        diag = session_value("last_diagnostics")
+        if diag:
+            st.markdown(f"**Letzte Berechnung** – {diag['total_ms']:.1f} ms gesamt")
+            st.dataframe(pd.DataFrame(diag["stages"]), width="stretch")
+            st.json(diag["counters"])
+            reran = session_pipeline().last_run
+            if reran:
+                st.caption(
+                    "Pipeline (letzter Lauf dieser Session): "
+                    + " • ".join(f"{name}: {'neu' if fresh else 'wiederverwendet'}" for name, fresh in reran.items())
+                )
+        else:
+            st.caption("Noch keine Berechnung mit aktivierter Diagnose.")
+        if render_prof is not None and render_prof.stages:
+            st.markdown("**Rendering (dieser Rerun)**")
+            st.dataframe(pd.DataFrame(render_prof.report()["stages"]), width="stretch")
+
+    with st.expander("🧠 Speicher (alle Sessions)", expanded=False):
+        mem = session_store().report(current=session_id())
+        limits = [f"max. {mem['max_sessions']} Sessions"]
+        if mem["ttl"]:
+            limits.append(f"Leerlauf {mem['ttl'] / 60:.0f} min")
+        if mem["max_bytes"]:
+            limits.append(f"{mem['max_bytes'] / 2**20:,.0f} MiB")
+        st.caption(
+            f"{'Server-Betrieb' if SERVER_MODE else 'Einzelbetrieb'} • Sessions: {len(mem['sessions'])} • "
+            f"{mem['total_bytes'] / 2**20:,.2f} MiB geschätzt • Prozess (RSS): {mem['rss_bytes'] / 2**20:,.0f} MiB • "
+            f"Grenzen: {', '.join(limits)} • verdrängt: {mem['evicted']} • abgelaufen: {mem['expired']} • "
+            f"geschlossen: {mem['closed']}"
         )
-        with st.expander("Details anzeigen", expanded=True):
-            render_month(month_choice - 1)
\ No newline at end of file
+        if mem["sessions"]:
+            st.dataframe(pd.DataFrame([
+                {
+                    "Session": s["session"][:8] + (" (diese)" if s["current"] else ""),
+                    "Objekte": ", ".join(s["keys"]),
+                    "MiB": round(s["bytes"] / 2**20, 3),
+                    "Leerlauf (s)": round(s["idle_s"]),
+                }
+                for s in mem["sessions"]
+            ]), hide_index=True, width="stretch")
@@ -0,0 +1,496 @@
+"""Unveränderte Referenz-Implementierung (Stand vor den Optimierungen).
+
+Die Benchmarks vergleichen die optimierten Pfade in ``sparplan`` gegen diese
+linearen Originalfunktionen und prüfen, dass die Ausgaben identisch bleiben.
+Die Tag-Daten kommen aus ``sparplan.tagging``, verglichen wird nur der Algorithmus.
+"""
+import os
+import random
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sparplan.planner import clean_lines, etf_weight_for, pick_etfs, profile_seed  # noqa: E402
+from sparplan.tagging import ALL_TAGS, PROFILE_WANTED_TAGS, RISK_TAGS, normalize_name  # noqa: E402
+
+_TAG_LOOKUP = {}
+for tag, names in ALL_TAGS.items():
+    for n in names:
+        _TAG_LOOKUP.setdefault(normalize_name(n), set()).add(tag)
+
+_RISK_LOOKUP = {}
+for tag, names in RISK_TAGS.items():
+    for n in names:
+        _RISK_LOOKUP.setdefault(normalize_name(n), set()).add(tag)
+
+RISK_TAG_SET = {"High Volatility", "Early/Speculative"}
+
+def tags_for_rotation(name: str) -> list[str]:
+    n = normalize_name(name)
+    tags = set()
+
+    if n in _TAG_LOOKUP:
+        tags |= _TAG_LOOKUP[n]
+    else:
+        for key_norm, tset in _TAG_LOOKUP.items():
+            if key_norm and (key_norm in n or n in key_norm):
+                tags |= tset
+
+    risk = set()
+    if n in _RISK_LOOKUP:
+        risk |= _RISK_LOOKUP[n]
+    else:
+        for key_norm, tset in _RISK_LOOKUP.items():
+            if key_norm and (key_norm in n or n in key_norm):
+                risk |= tset
+
+    tags |= risk
+    if not tags:
+        tags = {"Unkategorisiert"}
+    return sorted(tags)
+
+def is_risky(name: str) -> bool:
+    return bool(set(tags_for_rotation(name)) & RISK_TAG_SET)
+
+def thematic_tags(name: str) -> list[str]:
+    t = [x for x in tags_for_rotation(name) if x not in RISK_TAG_SET and x != "Unkategorisiert"]
+    return t if t else ["Unkategorisiert"]
+
+def score_rotation(name: str, profile: str) -> int:
+    tags = tags_for_rotation(name)
+    wanted = set(PROFILE_WANTED_TAGS.get(profile, []))
+
+    if profile == "Ausgewogen (Standard)":
+        if "High Volatility" in tags or "Early/Speculative" in tags:
+            return -1
+        return 0
+
+    score = 0
+    for t in tags:
+        if t in wanted:
+            score += 3
+
+    if profile in ["Dividenden & Value", "Konservativ & defensiv"]:
+        if "High Volatility" in tags:
+            score -= 4
+        if "Early/Speculative" in tags:
+            score -= 3
+
+    if profile == "Konservativ & defensiv":
+        if "Semis" in tags or "Quantum" in tags or "FinTech/Crypto" in tags:
+            score -= 1
+
+    return score
+
+def explain_rotation(name: str, profile: str) -> list[str]:
+    tags = tags_for_rotation(name)
+    wanted = set(PROFILE_WANTED_TAGS.get(profile, []))
+    hits = [t for t in tags if t in wanted]
+    return hits[:3] if hits else tags[:2]
+
+
+def pick_rotation_by_profile(
+    rot_list: list[str],
+    profile: str,
+    strength: str,
+    repeatable: bool,
+    do_shuffle: bool,
+    desired_pool_size: int | None = None,
+    balanced_risk_cap_pct: float = 0.25,
+    balanced_min_per_tag: int = 1,
+) -> list[str]:
+    if not rot_list:
+        return []
+
+    seed = profile_seed(profile) if repeatable else None
+    random.seed(seed)
+
+    if profile == "Ausgewogen (Standard)":
+        pool = rot_list[:]
+        if do_shuffle:
+            random.shuffle(pool)
+
+        target = int(desired_pool_size) if desired_pool_size else len(pool)
+        target = max(0, min(target, len(pool)))
+        if target == 0:
+            return []
+
+        risk_cap = int(round(target * float(balanced_risk_cap_pct)))
+        if target >= 8 and risk_cap < 1:
+            risk_cap = 1
+
+        tag_to_candidates = defaultdict(list)
+        for s in pool:
+            for tg in thematic_tags(s):
+                tag_to_candidates[tg].append(s)
+
+        for tg in list(tag_to_candidates.keys()):
+            cand = tag_to_candidates[tg]
+            if do_shuffle:
+                random.shuffle(cand)
+            tag_to_candidates[tg] = cand
+
+        picked = []
+        picked_set = set()
+        picked_risk = 0
+
+        tags = list(tag_to_candidates.keys())
+        if do_shuffle:
+            random.shuffle(tags)
+
+        def can_add(sym: str) -> bool:
+            nonlocal picked_risk
+            if sym in picked_set:
+                return False
+            if is_risky(sym) and picked_risk >= risk_cap:
+                return False
+            return True
+
+        def add(sym: str):
+            nonlocal picked_risk
+            picked.append(sym)
+            picked_set.add(sym)
+            if is_risky(sym):
+                picked_risk += 1
+
+        for _ in range(balanced_min_per_tag):
+            if len(picked) >= target:
+                break
+            for tg in tags:
+                if len(picked) >= target:
+                    break
+                while tag_to_candidates[tg]:
+                    sym = tag_to_candidates[tg].pop(0)
+                    if can_add(sym):
+                        add(sym)
+                        break
+
+        if len(picked) < target:
+            made_progress = True
+            while len(picked) < target and made_progress:
+                made_progress = False
+                for tg in tags:
+                    if len(picked) >= target:
+                        break
+                    while tag_to_candidates[tg]:
+                        sym = tag_to_candidates[tg].pop(0)
+                        if can_add(sym):
+                            add(sym)
+                            made_progress = True
+                            break
+
+        if len(picked) < target:
+            remaining = [s for s in pool if s not in picked_set]
+            non_risk = [s for s in remaining if not is_risky(s)]
+            risk = [s for s in remaining if is_risky(s)]
+            if do_shuffle:
+                random.shuffle(non_risk)
+                random.shuffle(risk)
+
+            for s in non_risk:
+                if len(picked) >= target:
+                    break
+                if can_add(s):
+                    add(s)
+
+            if len(picked) < target:
+                for s in risk:
+                    if len(picked) >= target:
+                        break
+                    if s in picked_set:
+                        continue
+                    add(s)
+
+        return picked[:target]
+
+    scored = []
+    for s in rot_list:
+        sc = score_rotation(s, profile)
+        tie = random.random() if do_shuffle else 0.0
+        scored.append((sc, tie, s))
+
+    scored.sort(key=lambda t: (-t[0], t[1]))
+    positives = [t for t in scored if t[0] > 0]
+    rest = [t for t in scored if t[0] <= 0]
+
+    if strength in ["Mild", "Normal"]:
+        ordered = [t[2] for t in positives] + [t[2] for t in rest]
+    else:
+        ordered_pos = [t[2] for t in positives]
+        ordered_all = [t[2] for t in scored]
+        if len(ordered_pos) >= max(5, int(0.3 * len(rot_list))):
+            ordered = ordered_pos + [t[2] for t in rest]
+        else:
+            ordered = ordered_all
+
+    return ordered[:desired_pool_size] if desired_pool_size else ordered
+
+
+def solve_rates(aktien_budget, fav_count, rot_count, fav_multiplier, min_rate_rotation):
+    # Ratenaufteilung wie in compute_plan, Mindestbetrag per Schleife (r -= 1)
+    info_adjustments = []
+    rot_per_month_eff = rot_count
+
+    if rot_count == 0 and fav_count > 0:
+        rot_rate = 0.0
+        fav_rate_per_fav = aktien_budget / fav_count
+        info_adjustments.append("Keine Rotation möglich → gesamtes Aktienbudget geht in Favoriten.")
+    elif fav_count == 0 and rot_count > 0:
+        fav_rate_per_fav = 0.0
+        rot_rate = aktien_budget / rot_count
+    elif fav_count == 0 and rot_count == 0:
+        fav_rate_per_fav = 0.0
+        rot_rate = 0.0
+        info_adjustments.append("Keine Aktien ausgewählt (Favoriten/Rotation leer).")
+    else:
+        denom = (rot_count * 1.0) + (fav_count * float(fav_multiplier))
+        rot_rate = aktien_budget / denom if denom > 0 else 0.0
+        fav_rate_per_fav = rot_rate * float(fav_multiplier)
+
+    if rot_per_month_eff > 0 and min_rate_rotation > 0 and rot_rate < min_rate_rotation:
+        while rot_per_month_eff > 0:
+            denom = (rot_per_month_eff * 1.0) + (fav_count * float(fav_multiplier))
+            candidate_rot_rate = aktien_budget / denom if denom > 0 else 0.0
+            if candidate_rot_rate >= min_rate_rotation:
+                rot_rate = candidate_rot_rate
+                fav_rate_per_fav = rot_rate * float(fav_multiplier)
+                break
+            rot_per_month_eff -= 1
+
+        info_adjustments.append(
+            f"Rotation-Aktien/Monat reduziert, damit mind. {min_rate_rotation:.2f}€ pro Rotation-Aktie erreicht werden."
+        )
+
+        if rot_per_month_eff == 0 and fav_count > 0:
+            rot_rate = 0.0
+            fav_rate_per_fav = aktien_budget / fav_count
+            info_adjustments.append("Rotation fiel auf 0 → gesamtes Aktienbudget geht in Favoriten.")
+
+    return fav_rate_per_fav, rot_rate, rot_per_month_eff, info_adjustments
+
+
+def compute_plan(
+    zielsumme, monate, aktienanteil, anzahl_aktien_pro_monat,
+    favoriten_text, rotation_text, etfs_text,
+    max_aktien, max_etfs, begrenze_rotation,
+    profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
+    favs_pro_monat, fav_multiplier, min_rate_rotation, top_n_chart, show_tag_table
+):
+    info_limits = []
+    info_adjustments = []
+
+    fav_list_raw = clean_lines(favoriten_text)
+    rot_list_raw = clean_lines(rotation_text)
+    etf_list_raw = clean_lines(etfs_text)
+
+    if not monate or monate <= 0:
+        raise ValueError("Die Dauer (Monate) muss größer als 0 sein.")
+
+    etf_anteil_local = 100 - aktienanteil
+    if not etf_list_raw:
+        aktienanteil_local = 100
+        etf_anteil_local = 0
+    else:
+        aktienanteil_local = aktienanteil
+
+    monatlicher_betrag = zielsumme / monate
+    aktien_budget = monatlicher_betrag * aktienanteil_local / 100
+    etf_budget = monatlicher_betrag * etf_anteil_local / 100
+
+    # ETFs limitieren
+    etf_list = pick_etfs(etf_list_raw, int(max_etfs)) if etf_list_raw else []
+    if len(etf_list_raw) > len(etf_list):
+        info_limits.append(f"ETF-Limit aktiv: {len(etf_list_raw)} eingegeben → **{len(etf_list)}** werden verwendet.")
+
+    # Aktien-Limit: Rotation wird PROFIL-BASIERT gepickt
+    fav_list = fav_list_raw[:]
+    rot_list_all = rot_list_raw[:]
+    max_aktien_int = int(max_aktien)
+
+    if len(fav_list) > max_aktien_int:
+        fav_list = fav_list[:max_aktien_int]
+        rot_list = []
+        info_limits.append(
+            f"Aktien-Limit: Favoriten > Max. Aktien → Favoriten auf {max_aktien_int} gekürzt, Rotation deaktiviert."
+        )
+    else:
+        rot_slots = max_aktien_int - len(fav_list)
+
+        rot_list_picked = pick_rotation_by_profile(
+            rot_list_all,
+            profile=profil,
+            strength=profil_staerke,
+            repeatable=auswahl_wiederholbar,
+            do_shuffle=shuffle_rotation,
+            desired_pool_size=rot_slots,
+            balanced_risk_cap_pct=0.25,
+            balanced_min_per_tag=1
+        )
+        rot_list = rot_list_picked[:rot_slots]
+
+        if len(rot_list_all) > len(rot_list):
+            info_limits.append(
+                f"Aktien-Limit aktiv: Rotation wurde profil-basiert auf **{rot_slots}** Aktien gepickt (Max Aktien {max_aktien_int})."
+            )
+
+        if profil == "Ausgewogen (Standard)" and rot_list:
+            risk_cnt = sum(1 for s in rot_list if is_risky(s))
+            risk_pct = (risk_cnt / len(rot_list) * 100) if rot_list else 0.0
+            info_adjustments.append(
+                f"Ausgewogen: Diversifikation aktiv (1× je Tag soweit möglich) • Risk gedeckelt (~25%) • "
+                f"im Pool: **{risk_cnt}/{len(rot_list)}** riskige Werte (**{risk_pct:.0f}%**)."
+            )
+
+    # ETF-Raten
+    raw_weights = {etf: etf_weight_for(etf) for etf in etf_list}
+    total_w = sum(raw_weights.values())
+    etf_raten = {}
+    if etf_list:
+        if total_w > 0:
+            for etf, w in raw_weights.items():
+                etf_raten[etf] = etf_budget * (w / total_w)
+        else:
+            equal = etf_budget / len(etf_list)
+            for etf in etf_list:
+                etf_raten[etf] = equal
+
+    # Favoriten/Rotation: Anzahl pro Monat
+    favs_pro_monat_eff = min(favs_pro_monat, len(fav_list)) if fav_list else 0
+    rot_per_month_user = max(0, anzahl_aktien_pro_monat - favs_pro_monat_eff)
+    if not rot_list:
+        rot_per_month_user = 0
+    rot_per_month_eff = rot_per_month_user
+
+    # Multiplikatorverteilung
+    fav_count = favs_pro_monat_eff
+    rot_count = rot_per_month_eff
+
+    if rot_count == 0 and fav_count > 0:
+        rot_rate = 0.0
+        fav_rate_per_fav = aktien_budget / fav_count
+        info_adjustments.append("Keine Rotation möglich → gesamtes Aktienbudget geht in Favoriten.")
+    elif fav_count == 0 and rot_count > 0:
+        fav_rate_per_fav = 0.0
+        rot_rate = aktien_budget / rot_count
+    elif fav_count == 0 and rot_count == 0:
+        fav_rate_per_fav = 0.0
+        rot_rate = 0.0
+        info_adjustments.append("Keine Aktien ausgewählt (Favoriten/Rotation leer).")
+    else:
+        denom = (rot_count * 1.0) + (fav_count * float(fav_multiplier))
+        rot_rate = aktien_budget / denom if denom > 0 else 0.0
+        fav_rate_per_fav = rot_rate * float(fav_multiplier)
+
+    # Mindestbetrag Rotation prüfen
+    if rot_per_month_eff > 0 and min_rate_rotation > 0 and rot_rate < min_rate_rotation:
+        while rot_per_month_eff > 0:
+            denom = (rot_per_month_eff * 1.0) + (fav_count * float(fav_multiplier))
+            candidate_rot_rate = aktien_budget / denom if denom > 0 else 0.0
+            if candidate_rot_rate >= min_rate_rotation:
+                rot_rate = candidate_rot_rate
+                fav_rate_per_fav = rot_rate * float(fav_multiplier)
+                break
+            rot_per_month_eff -= 1
+
+        info_adjustments.append(
+            f"Rotation-Aktien/Monat reduziert, damit mind. {min_rate_rotation:.2f}€ pro Rotation-Aktie erreicht werden."
+        )
+
+        if rot_per_month_eff == 0 and fav_count > 0:
+            rot_rate = 0.0
+            fav_rate_per_fav = aktien_budget / fav_count
+            info_adjustments.append("Rotation fiel auf 0 → gesamtes Aktienbudget geht in Favoriten.")
+
+    # Rotation Pool Reihenfolge: Ausgewogen optional shuffle (nur Reihenfolge)
+    rot_list_effective = rot_list[:]
+    if profil == "Ausgewogen (Standard)" and shuffle_rotation and len(rot_list_effective) > 1:
+        seed = profile_seed(profil) if auswahl_wiederholbar else None
+        random.seed(seed)
+        random.shuffle(rot_list_effective)
+
+    # Trefferquote
+    if rot_list_effective:
+        scored_ui = [(score_rotation(s, profil), s) for s in rot_list_effective]
+        hits = sum(1 for sc, _ in scored_ui if sc > 0)
+        pct = (hits / len(rot_list_effective) * 100) if rot_list_effective else 0.0
+    else:
+        hits, pct = 0, 0.0
+
+    # Rotation Subset nach Slots (Zeitfenster)
+    slots_rot_total = int(monate) * int(rot_per_month_eff)
+    if begrenze_rotation and rot_per_month_eff > 0 and len(rot_list_effective) > slots_rot_total:
+        dropped = len(rot_list_effective) - slots_rot_total
+        rot_list_effective = rot_list_effective[:slots_rot_total]
+        info_adjustments.append(
+            f"Rotation gekürzt: {len(rot_list)} im Pool, aber nur {slots_rot_total} Rotation-Slots "
+            f"({monate}×{rot_per_month_eff}) → {dropped} Werte wurden nicht berücksichtigt."
+        )
+
+    # Roadmaps
+    fav_roadmap, rot_roadmap = [], []
+    monate_int = int(monate)
+
+    for i in range(monate_int):
+        if favs_pro_monat_eff > 0:
+            start_fav = i % len(fav_list)
+            favs = [fav_list[(start_fav + k) % len(fav_list)] for k in range(favs_pro_monat_eff)]
+        else:
+            favs = []
+        fav_roadmap.append(favs)
+
+        if rot_per_month_eff > 0 and rot_list_effective:
+            start_rot = (i * rot_per_month_eff) % len(rot_list_effective)
+            rot = rot_list_effective[start_rot:start_rot + rot_per_month_eff]
+            if len(rot) < rot_per_month_eff and len(rot_list_effective) > 0:
+                rot += rot_list_effective[0:rot_per_month_eff - len(rot)]
+            rot_roadmap.append(rot)
+        else:
+            rot_roadmap.append([])
+
+    # Summen aggregieren
+    aktien_sum = {}
+    for m in range(monate_int):
+        for a in fav_roadmap[m]:
+            aktien_sum[a] = aktien_sum.get(a, 0) + fav_rate_per_fav
+        for a in rot_roadmap[m]:
+            aktien_sum[a] = aktien_sum.get(a, 0) + rot_rate
+
+    etf_sum = {etf: etf_raten.get(etf, 0) * monate_int for etf in etf_list}
+
+    all_data = []
+    for name, betrag in aktien_sum.items():
+        typ = "Favorit" if name in fav_list else "Rotation"
+        all_data.append({"Name": name, "Typ": typ, "Gesamtbetrag (€)": round(betrag, 2)})
+
+    for name, betrag in etf_sum.items():
+        all_data.append({"Name": name, "Typ": "ETF", "Gesamtbetrag (€)": round(betrag, 2)})
+
+    import pandas as pd
+
+    df_export = pd.DataFrame(all_data)
+
+    return {
+        "monatlicher_betrag": monatlicher_betrag,
+        "etf_list": etf_list,
+        "etf_raten": etf_raten,
+        "fav_list": fav_list,
+        "rot_list_effective": rot_list_effective,
+        "fav_rate_per_fav": fav_rate_per_fav,
+        "rot_rate": rot_rate,
+        "monate_int": monate_int,
+        "fav_roadmap": fav_roadmap,
+        "rot_roadmap": rot_roadmap,
+        "df_export": df_export,
+        "hits": hits,
+        "pct": pct,
+        "profil": profil,
+        "profil_staerke": profil_staerke,
+        "auswahl_wiederholbar": auswahl_wiederholbar,
+        "info_limits": info_limits,
+        "info_adjustments": info_adjustments,
+        "top_n_chart": top_n_chart,
+        "show_tag_table": show_tag_table,
+        "fav_multiplier": float(fav_multiplier),
+    }
+
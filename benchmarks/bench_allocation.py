@@ -0,0 +1,65 @@
+"""Benchmark + Gleichheitsprüfung des Allokations-Lösers.
+
+Vergleicht ``solve_rates`` (geschlossene Form mit ±1-Prüfung) gegen die
+ursprüngliche Schleife aus ``_reference`` auf zufälligen und auf
+Randfällen (exakte Grenzwerte, sehr große Rotationszahlen) und misst beide.
+
+    python benchmarks/bench_allocation.py --cases 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _reference as ref  # noqa: E402
+from sparplan import solve_rates  # noqa: E402
+from sparplan.allocation import solve_allocation  # noqa: E402
+
+
+def random_cases(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        budget = rng.choice([0.0, rng.uniform(0, 5000), float(rng.randint(1, 5000))])
+        fav = rng.randint(0, 5)
+        rot = rng.choice([0, rng.randint(0, 30), rng.randint(0, 5000)])
+        mult = rng.choice([1.0, 1.5, rng.uniform(1, 3), round(rng.uniform(1, 3), 1)])
+        min_rate = rng.choice([0.0, 20.0, rng.uniform(0, 200), float(rng.randint(1, 100))])
+        if rng.random() < 0.3 and rot:
+            # Grenzfall: Budget genau so, dass r Aktien exakt den Mindestbetrag treffen
+            r = rng.randint(1, rot)
+            budget = min_rate * (r + fav * mult)
+        yield budget, fav, rot, mult, min_rate
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--cases", type=int, default=100_000)
+    args = ap.parse_args(argv)
+
+    cases = list(random_cases(args.cases))
+    mismatches = sum(1 for c in cases if solve_rates(*c) != ref.solve_rates(*c))
+    print(f"{len(cases)} Fälle • Abweichungen zur Schleife: {mismatches}")
+
+    for label, fn in (("Schleife (alt)", ref.solve_rates), ("geschlossen", solve_rates)):
+        t0 = time.perf_counter()
+        for c in cases:
+            fn(*c)
+        dt = time.perf_counter() - t0
+        print(f"{label:<16}{dt * 1e9 / len(cases):>10.0f} ns/Aufruf")
+
+    etfs = [f"ETF {i}" for i in range(10)]
+    weights = {e: 0.05 + 0.02 * i for i, e in enumerate(etfs)}
+    t0 = time.perf_counter()
+    for budget, fav, rot, mult, min_rate in cases:
+        solve_allocation(budget, budget / 2, fav, rot, mult, min_rate, etf_list=etfs, etf_weights=weights,
+                         max_rate_per_name=250.0, min_order=25.0, etf_minimums={"ETF 0": 50.0})
+    dt = time.perf_counter() - t0
+    print(f"{'mit Grenzen':<16}{dt * 1e9 / len(cases):>10.0f} ns/Aufruf (inkl. 10 ETFs)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Benchmark: Backtest vieler Pläne gegen einen memory-mapped Kurs-Store.
+
+Erzeugt ein synthetisches Universum (Standard 5 000 Namen × 40 Jahre
+Monatskurse), baut daraus einmal den Store und backtestet dann viele Pläne
+gegen denselben Store. Zum Vergleich: jedes Mal die komplette CSV lesen.
+
+    python benchmarks/bench_backtest.py --names 5000 --years 40 --plans 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, PROFILE_OPTIONS, clean_lines, compute_plan  # noqa: E402
+from sparplan.backtest import PriceStore, backtest_plan, build_store  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--names", type=int, default=5_000)
+    ap.add_argument("--years", type=int, default=40)
+    ap.add_argument("--plans", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    months = args.years * 12
+    universe = synthetic_universe(args.names)
+    etfs = clean_lines(DEFAULT_PARAMS["etfs_text"])
+    cols = list(dict.fromkeys(universe + clean_lines(DEFAULT_PARAMS["favoriten_text"]) + etfs))
+    rng = np.random.default_rng(0)
+    px = np.exp(np.cumsum(rng.normal(0.005, 0.06, (months, len(cols))), axis=0)) * 100
+    dates = pd.period_range("1985-01", periods=months, freq="M").to_timestamp("M")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "kurse.csv")
+        pd.DataFrame(px, columns=cols, index=pd.Index(dates, name="Datum")).to_csv(src)
+
+        t0 = time.perf_counter()
+        build_store(src, os.path.join(tmp, "store"))
+        print(f"Store bauen ({len(cols)} Spalten × {months} Monate): {time.perf_counter() - t0:.2f} s")
+
+        rot_text = "\n".join(universe)
+        plans = [
+            compute_plan(**dict(DEFAULT_PARAMS, rotation_text=rot_text, monate=months, zielsumme=500.0 * months,
+                                max_aktien=300, profil=PROFILE_OPTIONS[i % len(PROFILE_OPTIONS)],
+                                auswahl_wiederholbar=False))
+            for i in range(args.plans)
+        ]
+
+        store = PriceStore(os.path.join(tmp, "store"))
+        t0 = time.perf_counter()
+        for res in plans:
+            backtest_plan(res, store)
+        dt = time.perf_counter() - t0
+        print(f"{args.plans} Backtests (mmap, ein Store): {dt:.2f} s • {dt / args.plans * 1000:.1f} ms/Plan "
+              f"• {store.mapped_columns()} von {len(store.names)} Spalten gemappt")
+
+        n = min(args.plans, 3)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            pd.read_csv(src, index_col=0)
+        print(f"Vergleich: komplette CSV lesen: {(time.perf_counter() - t0) / n * 1000:.1f} ms/Plan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Benchmark: Chart-Ausgabe pro Rerun – pyplot wie bisher vs. PNG-Cache vs. Vega.
+
+"pyplot" entspricht dem alten UI-Block (drei plt-Figuren, PNG mit dpi=200,
+ohne plt.close); "png" ist render_chart_pngs (ein Mal pro Ergebnis, danach
+Cache-Treffer); "vega" baut nur die Spezifikation, gerastert wird im Browser.
+Zusätzlich: offene pyplot-Figuren nach allen Wiederholungen.
+
+    python benchmarks/bench_charts.py --top-n 120 --repeat 5
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+from sparplan import DEFAULT_PARAMS, compute_plan  # noqa: E402
+from sparplan.charts import TYPE_COLORS, chart_frames, render_chart_pngs, vega_chart_specs  # noqa: E402
+
+
+def pyplot_like_before(df_export, top_n: int) -> None:
+    frames = chart_frames(df_export, top_n)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.barh(frames.top["Name"], frames.top["Gesamtbetrag (€)"], color=[TYPE_COLORS[t] for t in frames.top["Typ"]])
+    ax.invert_yaxis()
+    plt.tight_layout()
+    fig.savefig(io.BytesIO(), format="png", dpi=200, bbox_inches="tight")
+    fig1, ax1 = plt.subplots()
+    ax1.bar(frames.by_type.index, frames.by_type.values)
+    fig1.savefig(io.BytesIO(), format="png", dpi=200, bbox_inches="tight")
+    if not frames.etfs.empty:
+        fig2, ax2 = plt.subplots()
+        ax2.pie(frames.etfs["Gesamtbetrag (€)"], labels=frames.etfs["Name"])
+        fig2.savefig(io.BytesIO(), format="png", dpi=200, bbox_inches="tight")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--top-n", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    df = compute_plan(**dict(DEFAULT_PARAMS, monate=240))["df_export"]
+    cache = {}
+
+    def png_cached():
+        key = ("token", args.top_n)
+        if key not in cache:
+            cache[key] = render_chart_pngs(df, args.top_n)
+        return cache[key]
+
+    print(f"{'Weg':<10}{'erster ms':>11}{'Rerun ms':>11}")
+    for label, fn in (
+        ("pyplot", lambda: pyplot_like_before(df, args.top_n)),
+        ("png", png_cached),
+        ("vega", lambda: vega_chart_specs(df, args.top_n)),
+    ):
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) * 1000)
+        rerun = sum(times[1:]) / max(1, len(times) - 1)
+        print(f"{label:<10}{times[0]:>11.1f}{rerun:>11.2f}")
+    print(f"offene pyplot-Figuren: {len(plt.get_fignums())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Aggregation: Monatsschleife (Referenz) vs. vektorisierte Engine.
+
+Prüft, dass ``df_export`` bitgenau identisch bleibt, und misst die reine
+Aggregation bei langen Laufzeiten und vielen Slots.
+
+    python benchmarks/bench_engine.py [--months 600] [--plans 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _reference as ref  # noqa: E402
+from sparplan import DEFAULT_AKTIEN, DEFAULT_ETFS, DEFAULT_FAVORITEN, PROFILE_OPTIONS, compute_plan  # noqa: E402
+from sparplan.engine import aggregate_totals  # noqa: E402
+
+
+def legacy_aggregate(fav_list, rot_list, fe, rpm, fav_rate, rot_rate, months):
+    fav_roadmap, rot_roadmap = [], []
+    for i in range(months):
+        favs = [fav_list[(i % len(fav_list) + k) % len(fav_list)] for k in range(fe)] if fe > 0 else []
+        fav_roadmap.append(favs)
+        if rpm > 0 and rot_list:
+            start = (i * rpm) % len(rot_list)
+            rot = rot_list[start:start + rpm]
+            if len(rot) < rpm:
+                rot += rot_list[0:rpm - len(rot)]
+            rot_roadmap.append(rot)
+        else:
+            rot_roadmap.append([])
+    aktien_sum = {}
+    for m in range(months):
+        for a in fav_roadmap[m]:
+            aktien_sum[a] = aktien_sum.get(a, 0) + fav_rate
+        for a in rot_roadmap[m]:
+            aktien_sum[a] = aktien_sum.get(a, 0) + rot_rate
+    return aktien_sum
+
+
+def random_params(rng: random.Random) -> dict:
+    aktien = DEFAULT_AKTIEN.splitlines()
+    return dict(
+        zielsumme=rng.choice([5_000, 50_000, 123_456.78]), monate=rng.choice([1, 12, 100, 600]),
+        aktienanteil=rng.randint(0, 100), anzahl_aktien_pro_monat=rng.randint(3, 15),
+        favoriten_text=rng.choice([DEFAULT_FAVORITEN, "", "NVIDIA\nTesla"]),
+        rotation_text="\n".join(rng.sample(aktien, rng.randint(0, len(aktien)))),
+        etfs_text=rng.choice([DEFAULT_ETFS, ""]), max_aktien=rng.choice([5, 40, 200]), max_etfs=10,
+        begrenze_rotation=rng.random() < 0.5, profil=rng.choice(PROFILE_OPTIONS),
+        profil_staerke=rng.choice(["Mild", "Normal", "Strong"]), auswahl_wiederholbar=True,
+        shuffle_rotation=True, favs_pro_monat=rng.randint(1, 3), fav_multiplier=rng.choice([1.0, 1.5, 2.3]),
+        min_rate_rotation=rng.choice([0.0, 20.0, 80.0]), top_n_chart=40, show_tag_table=False,
+    )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--months", type=int, default=600)
+    ap.add_argument("--plans", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(11)
+    for _ in range(args.plans):
+        kw = random_params(rng)
+        if not ref.compute_plan(**kw)["df_export"].equals(compute_plan(**kw)["df_export"]):
+            print(f"FEHLER: df_export weicht ab für {kw}")
+            return 1
+    print(f"{args.plans} zufällige Pläne: df_export bitgenau identisch")
+
+    favs = [f"Fav {i}" for i in range(10)]
+    rot = [f"Rot {i}" for i in range(190)]
+    case = (favs, rot, 3, 12, 37.123456789, 24.7491358, args.months)
+
+    reps = 50
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        a = legacy_aggregate(*case)
+    t_ref = (time.perf_counter() - t0) / reps
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        b = aggregate_totals(*case)
+    t_new = (time.perf_counter() - t0) / reps
+    assert list(a.items()) == list(b.items())
+
+    print(f"{args.months} Monate × 15 Slots: Schleife {t_ref * 1000:.2f} ms • Engine {t_new * 1000:.2f} ms • {t_ref / t_new:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Benchmark: Orderliste exportieren – ganze Tabelle im Speicher vs. gestreamt.
+
+"frame" baut die komplette Tabelle Monat × Instrument als DataFrame und ruft
+to_csv/to_parquet; "stream" schreibt dieselben Zeilen blockweise über den
+ScheduleWriter. Gemessen werden Laufzeit und Spitzen-Speicher (tracemalloc).
+
+    python benchmarks/bench_export.py --months 600 --per-month 30 --format csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, compute_plan  # noqa: E402
+from sparplan.export import available_formats, export_schedule, iter_schedule_rows  # noqa: E402
+from sparplan.monthview import COLUMNS  # noqa: E402
+
+
+def via_frame(res, path, fmt):
+    import pandas as pd
+
+    df = pd.DataFrame(list(iter_schedule_rows(res)), columns=list(COLUMNS))
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "jsonl":
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    ms = (time.perf_counter() - t0) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return ms, peak
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--months", type=int, default=600)
+    ap.add_argument("--per-month", type=int, default=30)
+    ap.add_argument("--format", choices=available_formats(), default="csv")
+    args = ap.parse_args(argv)
+
+    res = compute_plan(**dict(
+        DEFAULT_PARAMS, rotation_text="\n".join(synthetic_universe(2_000)), max_aktien=1_000,
+        monate=args.months, anzahl_aktien_pro_monat=args.per_month, zielsumme=args.months * 2_000.0,
+        min_rate_rotation=0.0,
+    ))
+    import pandas  # noqa: F401  – Import-Zeit nicht mitmessen
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out")
+        rows = export_schedule(res, path, args.format)
+        print(f"{rows:,} Zeilen, {os.path.getsize(path) / 2**20:.1f} MiB ({args.format})")
+        print(f"{'Weg':<8}{'ms':>10}{'Peak MiB':>10}")
+        for label, fn in (
+            ("frame", lambda: via_frame(res, path, args.format)),
+            ("stream", lambda: export_schedule(res, path, args.format)),
+        ):
+            ms, peak = measure(fn)
+            print(f"{label:<8}{ms:>10.1f}{peak:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Import-Zeit des Planungskerns messen.
+
+Startet pro Durchlauf einen frischen Interpreter, importiert ``sparplan`` und
+prüft, dass dabei weder Streamlit noch matplotlib/PIL/pandas geladen werden.
+
+    python benchmarks/bench_import.py [--runs 20] [--budget-ms 150]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN = ["streamlit", "matplotlib", "PIL", "pandas"]
+
+PROBE = f"""
+import sys, time, json
+t0 = time.perf_counter()
+import sparplan
+dt = time.perf_counter() - t0
+heavy = [m for m in {FORBIDDEN!r} if m in sys.modules]
+print(json.dumps({{"ms": dt * 1000, "heavy": heavy}}))
+"""
+
+
+def run_once() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--budget-ms", type=float, default=150.0)
+    args = ap.parse_args(argv)
+
+    samples = []
+    for _ in range(args.runs):
+        r = run_once()
+        if r["heavy"]:
+            print(f"FEHLER: 'import sparplan' lädt {', '.join(r['heavy'])}")
+            return 1
+        samples.append(r["ms"])
+
+    med = statistics.median(samples)
+    print(
+        f"import sparplan: median {med:.2f} ms • min {min(samples):.2f} ms • "
+        f"max {max(samples):.2f} ms ({args.runs} Läufe)"
+    )
+    if med > args.budget_ms:
+        print(f"FEHLER: Median über Budget ({args.budget_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Benchmark: inkrementelle Pipeline vs. compute_plan bei Einzeländerungen.
+
+Eine PlanPipeline wird einmal warm gerechnet; danach wird je Zeile genau ein
+Parameter geändert (wie ein Slider in der UI) und die Laufzeit mit einem
+vollen compute_plan verglichen. Die Spalte "neu" zeigt, welche Stufen
+tatsächlich gelaufen sind.
+
+    python benchmarks/bench_incremental.py --universe 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, PlanPipeline, compute_plan  # noqa: E402
+
+CHANGES = [
+    ("fav_multiplier", 2.0),
+    ("min_rate_rotation", 35.0),
+    ("anzahl_aktien_pro_monat", 12),
+    ("aktienanteil", 80),
+    ("monate", 360),
+    ("max_etfs", 3),
+    ("begrenze_rotation", False),
+    ("profil", "Tech & AI"),
+]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--universe", type=int, default=10_000)
+    args = ap.parse_args(argv)
+
+    params = dict(
+        DEFAULT_PARAMS, rotation_text="\n".join(synthetic_universe(args.universe)),
+        max_aktien=2_000, monate=600, zielsumme=600_000,
+    )
+    pipe = PlanPipeline()
+    pipe.run(**params)
+
+    print(f"{'Änderung':<28}{'Pipeline ms':>12}{'compute ms':>12}  neu")
+    for key, value in CHANGES:
+        params[key] = value
+        t0 = time.perf_counter()
+        pipe.run(**params)
+        inc = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        compute_plan(**params)
+        full = (time.perf_counter() - t0) * 1000
+        fresh = ", ".join(name for name, ran in pipe.last_run.items() if ran) or "–"
+        print(f"{key + '=' + str(value):<28}{inc:>12.1f}{full:>12.1f}  {fresh}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Benchmark: viele gleichzeitige Plan-Jobs über die begrenzte Job-Queue.
+
+Simuliert --sessions Nutzer, die gleichzeitig einen Plan abschicken, und
+misst je Worker-Anzahl Wartezeit (Queue) und Laufzeit pro Job sowie die
+Gesamtdauer. Zusätzlich: Reaktionszeit eines Abbruchs während einer
+laufenden Monte-Carlo-Simulation.
+
+    python benchmarks/bench_jobs.py --sessions 16 --workers 1 2 4
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, PlanPipeline, compute_plan  # noqa: E402
+from sparplan.jobs import JobQueue  # noqa: E402
+from sparplan.montecarlo import DEFAULT_ASSUMPTIONS, simulate_plan  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=16)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--universe", type=int, default=20_000)
+    args = ap.parse_args(argv)
+
+    params = dict(DEFAULT_PARAMS, rotation_text="\n".join(synthetic_universe(args.universe)), max_aktien=2_000)
+
+    print(f"{'Worker':>6}{'gesamt s':>10}{'Warten Ø s':>12}{'Laufen Ø s':>12}")
+    for workers in args.workers:
+        queue = JobQueue(max_workers=workers)
+        t0 = time.perf_counter()
+        ids = [queue.submit("plan", PlanPipeline().run, **params) for _ in range(args.sessions)]
+        for job_id in ids:
+            queue.result(job_id)
+        total = time.perf_counter() - t0
+        snaps = [queue.status(j) for j in ids]
+        print(f"{workers:>6}{total:>10.2f}{statistics.mean(s['wait_s'] for s in snaps):>12.2f}"
+              f"{statistics.mean(s['run_s'] for s in snaps):>12.2f}")
+        queue.shutdown()
+
+    queue = JobQueue(max_workers=1)
+    res = compute_plan(**dict(DEFAULT_PARAMS, monate=600))
+    job_id = queue.submit("mc", simulate_plan, res, DEFAULT_ASSUMPTIONS, n_paths=100_000)
+    while queue.status(job_id)["progress"] < 0.05:
+        time.sleep(0.01)
+    t0 = time.perf_counter()
+    queue.cancel(job_id)
+    while queue.status(job_id)["status"] != "cancelled":
+        time.sleep(0.001)
+    print(f"Abbruch Monte-Carlo (100k Pfade × 600 Monate): {(time.perf_counter() - t0) * 1000:.0f} ms")
+    queue.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Branding-Payload pro Rerun: Original-Logo vs. verkleinertes, gecachtes Logo.
+
+    python benchmarks/bench_logo_payload.py [--reruns 200]
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sparplan.branding import LOGO_PATH, BRANDING_TEMPLATE, branding_html, logo_png_bytes  # noqa: E402
+
+
+def before_html() -> str:
+    # Verhalten vor dem Cache: Originaldatei bei jedem Rerun lesen und kodieren
+    with open(LOGO_PATH, "rb") as fh:
+        encoded = base64.b64encode(fh.read()).decode()
+    return BRANDING_TEMPLATE.format(encoded_image=encoded, width=50)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--reruns", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    for _ in range(args.reruns):
+        html_before = before_html()
+    t_before = (time.perf_counter() - t0) / args.reruns
+
+    t0 = time.perf_counter()
+    html_after = branding_html(logo_png_bytes())  # einmal pro Prozess
+    t_once = time.perf_counter() - t0
+
+    print(f"vorher:  {len(html_before.encode()):>10,} Bytes/Rerun • {t_before * 1000:8.2f} ms/Rerun")
+    print(f"nachher: {len(html_after.encode()):>10,} Bytes/Rerun • {t_once * 1000:8.2f} ms einmalig, danach Cache-Treffer")
+    print(f"Faktor:  {len(html_before) / len(html_after):.0f}x kleiner")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Benchmark der Monte-Carlo-Projektion (vektorisiert über Pfade).
+
+Misst simulate_plan für verschiedene Pfadzahlen × Laufzeiten und den
+Spitzen-Speicher (tracemalloc) bei gegebenem Speicherbudget – im schnellen
+Modus (ein Aggregat je Bucket) und optional exakt je Instrument.
+
+    python benchmarks/bench_montecarlo.py
+    python benchmarks/bench_montecarlo.py --paths 100000 --months 600 --budget-mb 64
+    python benchmarks/bench_montecarlo.py --paths 10000 --months 120 600 --per-instrument
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sparplan import DEFAULT_PARAMS, compute_plan  # noqa: E402
+from sparplan.montecarlo import load_assumptions, simulate_plan  # noqa: E402
+
+ASSUMPTIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "mc_assumptions.json")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--paths", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--months", type=int, nargs="+", default=[120, 600])
+    ap.add_argument("--budget-mb", type=float, default=256)
+    ap.add_argument("--per-instrument", action="store_true", help="zusätzlich exakt je Instrument messen")
+    args = ap.parse_args(argv)
+
+    assumptions = load_assumptions(ASSUMPTIONS)
+    modes = (False, True) if args.per_instrument else (False,)
+    print(f"{'Pfade':>8}{'Monate':>8}{'Modus':>8}{'Buckets':>9}{'Block':>9}{'Zeit s':>9}{'Peak MiB':>10}{'P50 €':>16}")
+    for months in args.months:
+        res = compute_plan(**dict(DEFAULT_PARAMS, monate=months, zielsumme=1000.0 * months))
+        for n in args.paths:
+            for per_instrument in modes:
+                tracemalloc.start()
+                t0 = time.perf_counter()
+                mc = simulate_plan(
+                    res, assumptions, n_paths=n, memory_budget_mb=args.budget_mb, per_instrument=per_instrument,
+                )
+                dt = time.perf_counter() - t0
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{n:>8}{months:>8}{'Name' if per_instrument else 'Bucket':>8}{len(mc['buckets']):>9}"
+                    f"{mc['chunk_size']:>9}{dt:>9.2f}{peak / 2**20:>10.1f}{mc['percentiles'][50]:>16,.0f}",
+                    flush=True,
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Benchmark: Optimierung (Rate je Instrument) kalt vs. warm.
+
+Baut Pläne mit vielen Instrumenten (synthetisches Universum), optimiert sie
+einmal kalt und stellt dann wie in der UI einzelne Regler ein Stück weiter –
+jeweils kalt und mit Warmstart aus dem vorigen Ergebnis. Gemessen werden Zeit,
+Züge des Lösers und der Abstand zu den Ziel-Anteilen.
+
+    python benchmarks/bench_optimizer.py --sizes 1000 2000 5000 --min-rate 5
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, compute_plan  # noqa: E402
+from sparplan.optimizer import optimize_plan  # noqa: E402
+
+NUDGES = (
+    ("risk_cap", 0.01),
+    ("target_share", 0.05),
+    ("fidelity", 0.1),
+    ("min_rate", 1.0),
+)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 2_000, 5_000], help="max. Aktien im Plan")
+    ap.add_argument("--profile", default="Tech & AI")
+    ap.add_argument("--monthly", type=float, default=5_000.0, help="Sparbetrag pro Monat (€)")
+    ap.add_argument("--min-rate", type=float, default=5.0)
+    ap.add_argument("--step", type=float, default=1.0)
+    args = ap.parse_args(argv)
+
+    print(f"{'Instrumente':>11}  {'Regler':<14}{'kalt ms':>9}{'Züge':>7}{'warm ms':>9}{'Züge':>7}{'Abstand kalt/warm (pp)':>25}")
+    for size in args.sizes:
+        res = compute_plan(**dict(
+            DEFAULT_PARAMS, rotation_text="\n".join(synthetic_universe(2 * size)), max_aktien=size,
+            monate=600, anzahl_aktien_pro_monat=30, zielsumme=600 * args.monthly, min_rate_rotation=0.0,
+            profil=args.profile,
+        ))
+        settings = {"min_rate": args.min_rate, "step": args.step}
+        base = optimize_plan(res, **settings)
+        print(f"{len(res['arrays']):>11,}  {'(Start)':<14}{base['ms']:>9.1f}{base['moves']:>7}{'':>16}"
+              f"{base['tracking'][1]:>25.2f}")
+        for key, delta in NUDGES:
+            nudged = dict(settings, **{key: base["settings"][key] + delta})
+            cold = optimize_plan(res, **nudged)
+            warm = optimize_plan(res, warm=base, **nudged)
+            print(f"{'':>11}  {key:<14}{cold['ms']:>9.1f}{cold['moves']:>7}{warm['ms']:>9.1f}{warm['moves']:>7}"
+                  f"{cold['tracking'][1]:>17.2f} / {warm['tracking'][1]:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Skalierung des "Ausgewogen"-Pickers: 100 → 50.000 Kandidaten, 1 → 40 Tags.
+
+Ein synthetisches Tag-Universum ersetzt für die Dauer des Laufs die
+eingebauten Lookups (sowohl im Index als auch in der Referenz), damit sich
+die Tag-Anzahl frei wählen lässt. Bis ``--ref-max`` Kandidaten wird die
+Ausgabe gegen die Referenz-Implementierung geprüft (fester Seed).
+
+    python benchmarks/bench_picker.py [--ref-max 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _reference as ref  # noqa: E402
+from sparplan import pick_rotation_by_profile, tagging  # noqa: E402
+
+SIZES = [100, 1_000, 10_000, 50_000]
+TAG_COUNTS = [1, 5, 10, 20, 40]
+
+
+def synthetic(n_names: int, n_tags: int, seed: int = 3):
+    rng = random.Random(seed)
+    tag_lookup = {f"tg{t:02d}": {f"Tag {t:02d}"} for t in range(n_tags)}
+    risk_lookup = {"rk": {"High Volatility"}}
+    names = []
+    for i in range(n_names):
+        parts = [f"s{i}"] + [f"tg{t:02d}" for t in rng.sample(range(n_tags), rng.randint(1, min(3, n_tags)))]
+        if rng.random() < 0.2:
+            parts.append("rk")
+        names.append(" ".join(parts))
+    return names, tag_lookup, risk_lookup
+
+
+def use_universe(tag_lookup: dict, risk_lookup: dict):
+    tagging._INDEX = tagging.TagIndex(tag_lookup, risk_lookup)
+    ref._TAG_LOOKUP = {k: set(v) for k, v in tag_lookup.items()}
+    ref._RISK_LOOKUP = {k: set(v) for k, v in risk_lookup.items()}
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--ref-max", type=int, default=10_000)
+    args = ap.parse_args(argv)
+
+    kw = dict(profile="Ausgewogen (Standard)", strength="Strong", repeatable=True, do_shuffle=True)
+    # "kalt" = inkl. erstmaliger Tag-Auflösung, "warm" = Tag-Cache gefüllt
+    print(f"{'Kandidaten':>10} {'Tags':>5} {'kalt ms':>9} {'warm ms':>9} {'µs/Kand.':>9} {'Referenz ms':>12}")
+    for n_tags in TAG_COUNTS:
+        for n in SIZES:
+            names, tag_lookup, risk_lookup = synthetic(n, n_tags)
+            use_universe(tag_lookup, risk_lookup)
+            target = n // 2
+
+            new, t_cold = timed(pick_rotation_by_profile, names, desired_pool_size=target, **kw)
+            _, t_new = timed(pick_rotation_by_profile, names, desired_pool_size=target, **kw)
+            ref_col = "-"
+            if n <= args.ref_max:
+                old, t_ref = timed(ref.pick_rotation_by_profile, names, desired_pool_size=target, **kw)
+                if old != new:
+                    print(f"FEHLER: Ausgabe weicht ab (n={n}, tags={n_tags})")
+                    return 1
+                ref_col = f"{t_ref * 1000:.1f}"
+            print(f"{n:>10} {n_tags:>5} {t_cold * 1000:>9.1f} {t_new * 1000:>9.1f} {t_new / n * 1e6:>9.2f} {ref_col:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Benchmark-Suite für die Planungs-Pipeline.
+
+Synthetische Universen (100 / 1k / 10k / 100k Rotation-Namen) × Laufzeiten
+(12 / 120 / 1200 Monate) × alle fünf Profile × drei Stärken. Pro Kombination
+werden die Stufen einzeln gemessen (clean_lines, tagging, picking,
+rate_solving, roadmap, aggregation, dataframe), dazu compute_plan am Stück
+und dessen Spitzen-Speicher (tracemalloc). Tag-Caches werden vor jeder
+Messung geleert, damit die Läufe vergleichbar bleiben.
+
+    python benchmarks/bench_pipeline.py --out bench.json
+    python benchmarks/bench_pipeline.py --quick --out neu.json --compare bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import (  # noqa: E402
+    DEFAULT_ETFS,
+    DEFAULT_FAVORITEN,
+    PROFILE_OPTIONS,
+    STRENGTH_OPTIONS,
+    Roadmap,
+    clean_lines,
+    compute_plan,
+    pick_etfs,
+    pick_rotation_by_profile,
+    solve_rates,
+    tagging,
+    tags_for_rotation,
+)
+from sparplan.engine import aggregate_totals, fav_index_matrix, rot_index_matrix  # noqa: E402
+from sparplan.planner import _clean_lines_cached  # noqa: E402
+
+UNIVERSES = [100, 1_000, 10_000, 100_000]
+HORIZONS = [12, 120, 1200]
+STAGES = ["clean_lines", "tagging", "picking", "rate_solving", "roadmap", "aggregation", "dataframe"]
+
+MONTHLY = 500.0
+SHARE = 65
+PER_MONTH = 15
+FAVS_PER_MONTH = 2
+MAX_AKTIEN = 200
+MAX_ETFS = 10
+MULTIPLIER = 1.5
+MIN_RATE = 20.0
+
+
+def clear_tag_caches() -> None:
+    # inkl. Parse-Cache: sonst misst clean_lines ab dem zweiten Lauf nur Treffer
+    _clean_lines_cached.cache_clear()
+    tagging.normalize_name.cache_clear()
+    tagging._index().tags_for_normalized.cache_clear()
+
+
+def params_for(rot_text: str, months: int, profile: str, strength: str) -> dict:
+    return dict(
+        zielsumme=MONTHLY * months, monate=months, aktienanteil=SHARE, anzahl_aktien_pro_monat=PER_MONTH,
+        favoriten_text=DEFAULT_FAVORITEN, rotation_text=rot_text, etfs_text=DEFAULT_ETFS,
+        max_aktien=MAX_AKTIEN, max_etfs=MAX_ETFS, begrenze_rotation=True, profil=profile,
+        profil_staerke=strength, auswahl_wiederholbar=True, shuffle_rotation=True,
+        favs_pro_monat=FAVS_PER_MONTH, fav_multiplier=MULTIPLIER, min_rate_rotation=MIN_RATE,
+        top_n_chart=40, show_tag_table=False,
+    )
+
+
+def run_stages(p: dict) -> dict:
+    t = {}
+
+    @contextmanager
+    def stage(name):
+        t0 = time.perf_counter()
+        yield
+        t[name] = (time.perf_counter() - t0) * 1000
+
+    clear_tag_caches()
+    with stage("clean_lines"):
+        favs = clean_lines(p["favoriten_text"])
+        rots = clean_lines(p["rotation_text"])
+        etfs = clean_lines(p["etfs_text"])
+
+    with stage("tagging"):
+        for s in rots:
+            tags_for_rotation(s)
+
+    with stage("picking"):
+        pick_etfs(etfs, MAX_ETFS)
+        rot = pick_rotation_by_profile(
+            rots, profile=p["profil"], strength=p["profil_staerke"], repeatable=True,
+            do_shuffle=True, desired_pool_size=MAX_AKTIEN - len(favs),
+        )
+
+    budget = MONTHLY * SHARE / 100
+    fe = min(FAVS_PER_MONTH, len(favs))
+    with stage("rate_solving"):
+        fav_rate, rot_rate, rpm, _ = solve_rates(budget, fe, max(0, PER_MONTH - fe), MULTIPLIER, MIN_RATE)
+
+    months = p["monate"]
+    rot = rot[:months * rpm] if rpm else rot
+    with stage("roadmap"):
+        fav_rm = Roadmap.favorites(favs, fe, months)
+        rot_rm = Roadmap.rotation(rot, rpm, months)
+        fav_index_matrix(len(fav_rm.pool), fav_rm.per_month, months)
+        rot_index_matrix(len(rot_rm.pool), rot_rm.per_month, months)
+
+    with stage("aggregation"):
+        totals = aggregate_totals(favs, rot, fav_rm.per_month, rot_rm.per_month, fav_rate, rot_rate, months)
+
+    with stage("dataframe"):
+        pd.DataFrame([{"Name": k, "Typ": "Rotation", "Gesamtbetrag (€)": round(v, 2)} for k, v in totals.items()])
+    return t
+
+
+def run_end_to_end(p: dict) -> tuple[float, float]:
+    clear_tag_caches()
+    t0 = time.perf_counter()
+    compute_plan(**p)
+    wall = (time.perf_counter() - t0) * 1000
+
+    clear_tag_caches()
+    tracemalloc.start()
+    compute_plan(**p)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return wall, peak / 1024
+
+
+def case_key(r: dict) -> str:
+    return f"{r['universe']}|{r['months']}|{r['profile']}|{r['strength']}"
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as fh:
+        base = {case_key(r): r for r in json.load(fh)["results"]}
+    print(f"\nVergleich mit {baseline_path} (Faktor neu/alt, >1 = langsamer)")
+    cols = STAGES + ["compute_plan", "peak_kib"]
+    print(f"{'Fall':<52}" + "".join(f"{c[:11]:>12}" for c in cols))
+    for r in results:
+        b = base.get(case_key(r))
+        if not b:
+            continue
+        row = []
+        for c in cols:
+            new = r["stages_ms"].get(c, r.get(c))
+            old = b["stages_ms"].get(c, b.get(c))
+            row.append(f"{new / old:>12.2f}" if new is not None and old else f"{'-':>12}")
+        print(f"{case_key(r):<52}" + "".join(row))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--universes", type=int, nargs="+", default=UNIVERSES)
+    ap.add_argument("--horizons", type=int, nargs="+", default=HORIZONS)
+    ap.add_argument("--profiles", nargs="+", default=PROFILE_OPTIONS)
+    ap.add_argument("--strengths", nargs="+", default=STRENGTH_OPTIONS)
+    ap.add_argument("--repeat", type=int, default=3, help="Wiederholungen je Fall (Minimum zählt)")
+    ap.add_argument("--quick", action="store_true", help="nur 100/1k Namen, 12/120 Monate, 1 Wiederholung")
+    ap.add_argument("--out", help="Ergebnisse als JSON speichern")
+    ap.add_argument("--compare", help="mit früherem JSON-Ergebnis vergleichen")
+    args = ap.parse_args(argv)
+
+    if args.quick:
+        args.universes, args.horizons, args.repeat = [100, 1_000], [12, 120], 1
+
+    results = []
+    print(f"{'Fall':<52}" + "".join(f"{s[:11]:>12}" for s in STAGES) + f"{'compute':>10}{'peak KiB':>10}")
+    for n in args.universes:
+        rot_text = "\n".join(synthetic_universe(n))
+        for months in args.horizons:
+            for profile in args.profiles:
+                for strength in args.strengths:
+                    p = params_for(rot_text, months, profile, strength)
+                    runs = [run_stages(p) for _ in range(args.repeat)]
+                    stages = {s: min(r[s] for r in runs) for s in STAGES}
+                    walls, peaks = zip(*(run_end_to_end(p) for _ in range(args.repeat)))
+                    stages["compute_plan"] = min(walls)
+                    r = {
+                        "universe": n, "months": months, "profile": profile, "strength": strength,
+                        "stages_ms": stages, "peak_kib": max(peaks),
+                    }
+                    results.append(r)
+                    print(
+                        f"{case_key(r):<52}" + "".join(f"{stages[s]:>12.2f}" for s in STAGES)
+                        + f"{stages['compute_plan']:>10.1f}{r['peak_kib']:>10.0f}",
+                        flush=True,
+                    )
+
+    if args.out:
+        meta = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+            "repeat": args.repeat,
+        }
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"meta": meta, "results": results}, fh, indent=1, ensure_ascii=False)
+        print(f"\n{len(results)} Fälle gespeichert in {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
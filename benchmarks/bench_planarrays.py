@@ -0,0 +1,69 @@
+"""Benchmark: Plan-Ergebnis als typisierte Arrays.
+
+Vergleicht für einen großen Plan die bisherige Übergabe (Roadmaps + Raten-Dict
++ DataFrame per pickle) mit dem PlanArrays-Puffer: Größe, Serialisieren,
+Laden (from_bytes liest ohne Kopie), df_export ableiten und die Orderliste
+aus den lazy Roadmaps vs. aus der Slot-Matrix erzeugen.
+
+    python benchmarks/bench_planarrays.py --months 600 --per-month 30
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, compute_plan  # noqa: E402
+from sparplan.monthview import month_rows  # noqa: E402
+from sparplan.planarrays import PlanArrays  # noqa: E402
+
+LEGACY_KEYS = ("fav_roadmap", "rot_roadmap", "etf_list", "etf_raten", "df_export")
+
+
+def timed_ms(fn, repeat: int = 5):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return out, best
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--months", type=int, default=600)
+    ap.add_argument("--per-month", type=int, default=30)
+    args = ap.parse_args(argv)
+
+    res = compute_plan(**dict(
+        DEFAULT_PARAMS, rotation_text="\n".join(synthetic_universe(2_000)), max_aktien=1_000,
+        monate=args.months, anzahl_aktien_pro_monat=args.per_month, zielsumme=args.months * 2_000.0,
+        min_rate_rotation=0.0,
+    ))
+    arrays = res["arrays"]
+    print(arrays, f"• {arrays.nbytes / 1024:.0f} KiB in Arrays")
+
+    legacy = {k: res[k] for k in LEGACY_KEYS}
+    blob, pickle_ms = timed_ms(lambda: pickle.dumps(legacy, protocol=pickle.HIGHEST_PROTOCOL))
+    _, unpickle_ms = timed_ms(lambda: pickle.loads(blob))
+    buf, to_ms = timed_ms(arrays.to_bytes)
+    _, from_ms = timed_ms(lambda: PlanArrays.from_bytes(buf))
+    _, frame_ms = timed_ms(arrays.totals_frame)
+    print(f"{'':24}{'KiB':>8}{'schreiben ms':>14}{'lesen ms':>10}")
+    print(f"{'pickle (Roadmaps + df)':24}{len(blob) / 1024:>8.0f}{pickle_ms:>14.2f}{unpickle_ms:>10.2f}")
+    print(f"{'PlanArrays.to_bytes':24}{len(buf) / 1024:>8.0f}{to_ms:>14.2f}{from_ms:>10.3f}")
+    print(f"df_export aus Arrays ableiten: {frame_ms:.2f} ms")
+
+    months = res["monate_int"]
+    rows_old, old_ms = timed_ms(lambda: sum(1 for m in range(months) for r in month_rows(res, m) if r[3] > 0), 3)
+    rows_new, new_ms = timed_ms(lambda: sum(1 for _ in arrays.iter_orders()), 3)
+    assert rows_old == rows_new
+    print(f"Orderliste ({rows_new:,} Zeilen): Roadmaps {old_ms:.1f} ms • Slot-Matrix {new_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
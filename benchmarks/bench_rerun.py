@@ -0,0 +1,56 @@
+"""Benchmark: Rerun-Kosten bei großen Watchlists (Parsen + Tag-Tabelle).
+
+Simuliert einen Streamlit-Rerun mit unveränderten Textfeldern: erst kalt
+(Texte neu, Namen noch nicht aufgelöst), dann warm (gleiche Texte, Tags im
+LRU). Verglichen wird die Tag-Tabelle Name für Name (score_rotation und
+tags_for_rotation je Name) mit rotation_vectors.
+
+    python benchmarks/bench_rerun.py --lines 1000 5000 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import clean_lines, rotation_vectors, score_rotation, tagging, tags_for_rotation  # noqa: E402
+from sparplan.planner import _clean_lines_cached  # noqa: E402
+
+PROFILE = "Tech & AI"
+
+
+def timed_ms(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def per_name(names):
+    return [(tags_for_rotation(s), score_rotation(s, PROFILE)) for s in names]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--lines", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    args = ap.parse_args(argv)
+
+    print(f"{'Zeilen':>7}{'parse kalt':>12}{'parse warm':>12}{'je Name ms':>12}{'Vektor ms':>11}")
+    for n in args.lines:
+        text = "\n".join(f"  {s}  " for s in synthetic_universe(n, seed=n))
+        _clean_lines_cached.cache_clear()
+        tagging._index().tags_for_normalized.cache_clear()
+        cold = timed_ms(lambda: clean_lines(text))
+        warm = timed_ms(lambda: clean_lines(text))
+        names = clean_lines(text)
+        per_name(names)  # Tags im LRU, wie nach dem Compute
+        loop_ms = timed_ms(lambda: per_name(names))
+        vec_ms = timed_ms(lambda: rotation_vectors(names, PROFILE))
+        print(f"{n:>7}{cold:>12.2f}{warm:>12.2f}{loop_ms:>12.2f}{vec_ms:>11.2f}")
+    print("UI: Tag-Tabelle/Top 5 sind pro Ergebnis gecacht – Reruns ohne neue Eingaben lösen nichts auf.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
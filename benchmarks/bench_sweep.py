@@ -0,0 +1,49 @@
+"""Benchmark: Parameter-Sweep gegen compute_plan pro Gitterzelle.
+
+    python benchmarks/bench_sweep.py --universe 10000 --x anzahl_aktien_pro_monat --y aktienanteil
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, compute_plan  # noqa: E402
+from sparplan.sweep import SWEEPABLE, grid_values, sweep  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--universe", type=int, default=1_000, help="Rotation-Kandidaten (synthetisch)")
+    ap.add_argument("--x", default="anzahl_aktien_pro_monat", choices=list(SWEEPABLE))
+    ap.add_argument("--y", default="aktienanteil", choices=list(SWEEPABLE))
+    ap.add_argument("--steps", type=int, default=20)
+    ap.add_argument("--naive-cells", type=int, default=20, help="so viele Zellen mit compute_plan messen")
+    args = ap.parse_args(argv)
+
+    base = dict(DEFAULT_PARAMS, rotation_text="\n".join(synthetic_universe(args.universe)), max_aktien=200)
+    xs = grid_values(args.x, *SWEEPABLE[args.x][1][:2], args.steps)
+    ys = grid_values(args.y, *SWEEPABLE[args.y][1][:2], args.steps)
+
+    t0 = time.perf_counter()
+    res = sweep(base, args.x, xs, args.y, ys)
+    dt = time.perf_counter() - t0
+    print(f"Sweep: {res['cells']} Zellen in {dt * 1000:.1f} ms • {dt * 1e6 / res['cells']:.0f} µs/Zelle")
+
+    cells = [(x, y) for y in ys for x in xs][: args.naive_cells]
+    t0 = time.perf_counter()
+    for x, y in cells:
+        try:
+            compute_plan(**dict(base, **{args.x: x, args.y: y}))
+        except ValueError:
+            pass
+    per_cell = (time.perf_counter() - t0) / len(cells)
+    print(f"compute_plan je Zelle: {per_cell * 1e6:.0f} µs → hochgerechnet {per_cell * res['cells'] * 1000:.0f} ms "
+          f"(Faktor {per_cell * res['cells'] / dt:.0f}×)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
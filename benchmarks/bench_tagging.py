@@ -0,0 +1,83 @@
+"""Tag-Index vs. linearer Scan: identische Ausgabe und Laufzeit.
+
+Erzeugt ein synthetisches Universum (bekannte Namen, Varianten mit Zusätzen,
+Teilstrings und unbekannte Namen) und löst jeden Namen so oft auf, wie es der
+Compute- und Render-Pfad tut (is_risky, thematic_tags, score, explain, ...).
+
+    python benchmarks/bench_tagging.py [--names 5000] [--calls-per-name 6]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _reference as ref  # noqa: E402
+from sparplan import tagging  # noqa: E402
+from sparplan.tagging import ALL_TAGS, RISK_TAGS, TagIndex  # noqa: E402
+
+
+def synthetic_universe(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    known = sorted({x for names in list(ALL_TAGS.values()) + list(RISK_TAGS.values()) for x in names})
+    suffixes = ["", " Inc.", " AG", " Corp. (A)", " Holdings", " (ADR)", " SE Reg. Shs"]
+    out = []
+    for i in range(n):
+        kind = rng.random()
+        base = rng.choice(known)
+        if kind < 0.4:
+            out.append(base + rng.choice(suffixes))
+        elif kind < 0.55:
+            a = rng.randrange(len(base))
+            out.append(base[a:a + rng.randint(2, 8)])
+        else:
+            letters = "abcdefghijklmnopqrstuvwxyz"
+            out.append("".join(rng.choice(letters) for _ in range(rng.randint(4, 14))).title() + f" {i}")
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--names", type=int, default=5000)
+    ap.add_argument("--calls-per-name", type=int, default=6)
+    args = ap.parse_args(argv)
+
+    names = synthetic_universe(args.names)
+
+    t0 = time.perf_counter()
+    index = TagIndex(ref._TAG_LOOKUP, ref._RISK_LOOKUP)
+    t_build = time.perf_counter() - t0
+
+    # Korrektheit: jede Ausgabe muss exakt der Referenz entsprechen
+    mismatches = [x for x in names if ref.tags_for_rotation(x) != list(index.tags_for_normalized(tagging.normalize_name(x)))]
+    if mismatches:
+        print(f"FEHLER: {len(mismatches)} Abweichungen, z.B. {mismatches[:5]}")
+        return 1
+
+    t0 = time.perf_counter()
+    for _ in range(args.calls_per_name):
+        for x in names:
+            ref.tags_for_rotation(x)
+    t_ref = time.perf_counter() - t0
+
+    tagging.normalize_name.cache_clear()
+    tagging._index().tags_for_normalized.cache_clear()
+    t0 = time.perf_counter()
+    for _ in range(args.calls_per_name):
+        for x in names:
+            tagging.tags_for_rotation(x)
+    t_new = time.perf_counter() - t0
+
+    calls = args.calls_per_name * len(names)
+    print(f"{len(names)} Namen • {calls} Aufrufe • Ausgabe identisch")
+    print(f"Index-Aufbau:   {t_build * 1000:8.2f} ms")
+    print(f"linearer Scan:  {t_ref * 1000:8.2f} ms ({t_ref / calls * 1e6:.1f} µs/Aufruf)")
+    print(f"Tag-Index+LRU:  {t_new * 1000:8.2f} ms ({t_new / calls * 1e6:.1f} µs/Aufruf) • {t_ref / t_new:.0f}x")
+    print(f"Cache: {tagging._index().cache_info()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Benchmark: Instrument-Stammdaten mit 1k → 50k Instrumenten.
+
+Erzeugt synthetische Stammdaten (je Instrument 0–2 Aliase, 1–2 Tags, 10 %
+mit Risikoklasse) und misst: CSV prüfen + SQLite-Index schreiben, Laden aus
+dem Index (= Start eines weiteren Prozesses), Tag-Index aufbauen und
+Auflösung bekannter Namen (exakter Alias, ohne Teilstring-Automat).
+
+    python benchmarks/bench_universe.py --sizes 1000 10000 50000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sparplan.tagging import TagIndex, normalize_name  # noqa: E402
+from sparplan.universe import RISK_CLASSES, Universe, compile_index  # noqa: E402
+
+
+def write_master(path: str, n: int, seed: int = 5) -> list[str]:
+    rng = random.Random(seed)
+    tags = [f"Tag {t:02d}" for t in range(30)]
+    names = []
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["name", "aliases", "isin", "tags", "risk"])
+        for i in range(n):
+            name = f"Company {i:05d} Holdings"
+            aliases = [f"Company {i:05d}", f"CMP{i:05d}"][:rng.randint(0, 2)]
+            risk = rng.choice(RISK_CLASSES) if rng.random() < 0.1 else ""
+            w.writerow([name, "|".join(aliases), "", "|".join(rng.sample(tags, rng.randint(1, 2))), risk])
+            names.append(rng.choice([name] + aliases))
+    return names
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    args = ap.parse_args(argv)
+
+    print(f"{'Instrumente':>11}{'build ms':>10}{'load ms':>9}{'Index ms':>10}{'µs/Name':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            src, db = os.path.join(tmp, f"m{n}.csv"), os.path.join(tmp, f"m{n}.sqlite")
+            names = write_master(src, n)
+            _, build_ms = timed(compile_index, src, db, normalize_name)
+            universe, load_ms = timed(Universe.load, db)
+            index, index_ms = timed(
+                lambda: TagIndex(universe.alias_lookup("tags"), universe.alias_lookup("risk"), exact=universe.resolved_tags())
+            )
+            t0 = time.perf_counter()
+            for name in names:
+                index.tags_for_normalized(normalize_name(name))
+            per_name = (time.perf_counter() - t0) * 1e6 / len(names)
+            print(f"{n:>11}{build_ms:>10.1f}{load_ms:>9.1f}{index_ms:>10.1f}{per_name:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
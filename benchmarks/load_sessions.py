@@ -0,0 +1,145 @@
+"""Lasttest: viele gleichzeitige Berater-Sessions im Server-Betrieb.
+
+Simuliert --sessions gleichzeitige Nutzer mit denselben Bausteinen wie die
+App: geteilte Job-Queue und Plan-Cache, pro Session eine PlanPipeline, das
+Ergebnis + die Pipeline im SessionStore. Jeder Nutzer öffnet --visits Mal
+eine neue Session (neuer Tab/Reload – die alte bleibt liegen, bis der Store
+sie verdrängt) und rechnet darin --actions Pläne mit eigener Watchlist.
+
+Je Modus läuft ein eigener Prozess (vergleichbarer RSS):
+  bounded    Grenzen wie SPARPLAN_SERVER_MODE (--limit, --ttl, --memory-mb)
+  unbounded  keine Grenzen (wie früher: alles bleibt im session_state)
+
+    python benchmarks/load_sessions.py --sessions 100 --visits 3 --mode bounded unbounded
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tagging import synthetic_universe  # noqa: E402
+from sparplan import DEFAULT_PARAMS, PROFILE_OPTIONS, PlanCache, PlanPipeline  # noqa: E402
+from sparplan.jobs import JobQueue  # noqa: E402
+from sparplan.sessions import SessionStore, process_rss  # noqa: E402
+
+
+def make_store(args, mode: str) -> SessionStore:
+    if mode == "unbounded":
+        return SessionStore(max_sessions=10**9)
+    return SessionStore(
+        max_sessions=args.limit, ttl=args.ttl or None, max_bytes=int(args.memory_mb * 2**20) or None,
+    )
+
+
+def run_user(user: int, args, universe, queue: JobQueue, cache: PlanCache, store: SessionStore) -> list[float]:
+    rng = random.Random(user)
+    latencies = []
+    for _ in range(args.visits):
+        sid = os.urandom(8).hex()
+        pipeline = PlanPipeline()
+        store.set(sid, "pipeline", pipeline)
+        watchlist = "\n".join(rng.sample(universe, args.watchlist))
+        for _ in range(args.actions):
+            params = dict(
+                DEFAULT_PARAMS, rotation_text=watchlist, profil=rng.choice(PROFILE_OPTIONS),
+                monate=rng.choice([60, 120, 240, 600]), fav_multiplier=rng.choice([1.0, 1.5, 2.0]),
+            )
+            t0 = time.perf_counter()
+            job_id = queue.submit("plan", cache.compute, runner=pipeline.run, **params)
+            res, _ = queue.result(job_id)
+            queue.pop(job_id)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            store.set(sid, "result", res)
+            store.set(sid, "pipeline", pipeline)
+            if args.think:
+                time.sleep(rng.uniform(0, 2 * args.think))
+    return latencies
+
+
+def run_mode(args, mode: str) -> dict:
+    universe = synthetic_universe(args.universe)
+    queue = JobQueue(max_workers=args.workers)
+    cache = PlanCache(maxsize=args.cache_size)
+    store = make_store(args, mode)
+    gc.collect()
+    rss0 = process_rss()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [pool.submit(run_user, u, args, universe, queue, cache, store) for u in range(args.sessions)]
+        latencies = [ms for f in futures for ms in f.result()]
+    wall = time.perf_counter() - t0
+    queue.shutdown()
+    gc.collect()
+    rep = store.report()
+    return {
+        "mode": mode,
+        "opened": args.sessions * args.visits,
+        "kept": len(rep["sessions"]),
+        "evicted": rep["evicted"],
+        "expired": rep["expired"],
+        "store_mib": rep["total_bytes"] / 2**20,
+        "rss_mib": (process_rss() - rss0) / 2**20,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0],
+        "wall_s": wall,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=100, help="gleichzeitige Nutzer")
+    ap.add_argument("--visits", type=int, default=3, help="Sessions pro Nutzer (nacheinander)")
+    ap.add_argument("--actions", type=int, default=3, help="Berechnungen pro Session")
+    ap.add_argument("--universe", type=int, default=20_000)
+    ap.add_argument("--watchlist", type=int, default=2_000, help="Zeilen der Watchlist je Session")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--cache-size", type=int, default=256)
+    ap.add_argument("--think", type=float, default=0.0, help="mittlere Denkpause zwischen Aktionen (s)")
+    ap.add_argument("--limit", type=int, default=200, help="bounded: max. Sessions")
+    ap.add_argument("--ttl", type=float, default=1800, help="bounded: Leerlauf in s (0 = aus)")
+    ap.add_argument("--memory-mb", type=float, default=64, help="bounded: Speicherbudget (0 = aus)")
+    ap.add_argument("--mode", nargs="+", choices=["bounded", "unbounded"], default=["bounded", "unbounded"])
+    ap.add_argument("--json", action="store_true", help=argparse.SUPPRESS)  # Kindprozess
+    args = ap.parse_args(argv)
+
+    if args.json:
+        print(json.dumps(run_mode(args, args.mode[0])))
+        return 0
+
+    print(f"{'Modus':<10}{'Sessions':>9}{'gehalten':>9}{'verdrängt':>10}{'abgel.':>7}"
+          f"{'Store MiB':>10}{'ΔRSS MiB':>9}{'p50 ms':>8}{'p95 ms':>8}{'Dauer s':>8}")
+    base = [a for a in (argv if argv is not None else sys.argv[1:])]
+    for mode in args.mode:
+        child_argv = _without_mode(base) + ["--mode", mode, "--json"]
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *child_argv], capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['mode']:<10}{r['opened']:>9}{r['kept']:>9}{r['evicted']:>10}{r['expired']:>7}"
+              f"{r['store_mib']:>10.1f}{r['rss_mib']:>9.0f}{r['p50_ms']:>8.0f}{r['p95_ms']:>8.0f}{r['wall_s']:>8.1f}")
+    return 0
+
+
+def _without_mode(argv: list[str]) -> list[str]:
+    out, skip = [], False
+    for a in argv:
+        if a == "--mode":
+            skip = True
+            continue
+        if skip and not a.startswith("--"):
+            continue
+        skip = False
+        out.append(a)
+    return out
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Reproduzierbarkeit unter Nebenläufigkeit.
+
+Berechnet einen Satz Pläne (alle Profile, wiederholbar) zuerst seriell und
+dann mehrfach parallel in einem Thread-Pool, während ein Störthread das
+globale ``random`` ständig neu seedet. Jede parallele Ausgabe muss exakt der
+seriellen entsprechen.
+
+    python benchmarks/stress_rng_threads.py [--threads 16] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sparplan import (  # noqa: E402
+    DEFAULT_AKTIEN,
+    DEFAULT_ETFS,
+    DEFAULT_FAVORITEN,
+    PROFILE_OPTIONS,
+    STRENGTH_OPTIONS,
+    compute_plan,
+)
+
+
+def param_sets() -> list[dict]:
+    out = []
+    for profil in PROFILE_OPTIONS:
+        for staerke in STRENGTH_OPTIONS:
+            for max_aktien in (15, 40):
+                out.append(dict(
+                    zielsumme=50_000, monate=100, aktienanteil=65, anzahl_aktien_pro_monat=7,
+                    favoriten_text=DEFAULT_FAVORITEN, rotation_text=DEFAULT_AKTIEN, etfs_text=DEFAULT_ETFS,
+                    max_aktien=max_aktien, max_etfs=10, begrenze_rotation=True, profil=profil,
+                    profil_staerke=staerke, auswahl_wiederholbar=True, shuffle_rotation=True,
+                    favs_pro_monat=2, fav_multiplier=1.5, min_rate_rotation=20.0,
+                    top_n_chart=40, show_tag_table=False,
+                ))
+    return out
+
+
+def fingerprint(res: dict) -> tuple:
+    return (
+        tuple(res["rot_list_effective"]),
+        tuple(map(tuple, res["df_export"].itertuples(index=False))),
+    )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    # häufige Thread-Wechsel, damit Wettläufe auf globalem Zustand auch auftreten
+    sys.setswitchinterval(1e-6)
+
+    params = param_sets()
+    expected = [fingerprint(compute_plan(**p)) for p in params]
+
+    stop = threading.Event()
+
+    def saboteur():
+        while not stop.is_set():
+            random.seed(random.getrandbits(32))
+            random.random()
+
+    noise = threading.Thread(target=saboteur, daemon=True)
+    noise.start()
+    failures = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for r in range(args.rounds):
+                order = list(range(len(params)))
+                random.Random(r).shuffle(order)
+                got = dict(zip(order, pool.map(lambda i: fingerprint(compute_plan(**params[i])), order)))
+                failures += sum(1 for i, fp in got.items() if fp != expected[i])
+    finally:
+        stop.set()
+        noise.join()
+
+    total = args.rounds * len(params)
+    print(f"{total} parallele Pläne ({args.threads} Threads, Stör-Seeding aktiv): {failures} Abweichungen")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
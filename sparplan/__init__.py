@@ -0,0 +1,44 @@
+# Planungskern des Sparplan-Rechners – bewusst ohne Streamlit/matplotlib,
+# damit Batch-Jobs und Worker ihn billig importieren können.
+from .allocation import Allocation, solve_allocation, solve_rates
+from .cache import PlanCache, plan_cache_key
+from .defaults import (
+    DEFAULT_ETFS,
+    DEFAULT_FAVORITEN,
+    DEFAULT_PARAMS,
+    DEFAULT_AKTIEN,
+    PROFILE_OPTIONS,
+    STRENGTH_OPTIONS,
+)
+from .planner import (
+    PlanLists,
+    PlanNumbers,
+    clean_lines,
+    compute_plan,
+    etf_weight_for,
+    make_rng,
+    pick_etfs,
+    pick_rotation_by_profile,
+    prepare_lists,
+    profile_seed,
+    solve_numbers,
+)
+from .pipeline import PlanPipeline
+from .profiling import Profiler
+from .roadmap import Roadmap
+from .tagging import (
+    ALL_TAGS,
+    PROFILE_WANTED_TAGS,
+    RISK_TAG_SET,
+    RISK_TAGS,
+    explain_rotation,
+    is_risky,
+    lookup_instrument,
+    normalize_name,
+    refresh_universe,
+    rotation_vectors,
+    score_rotation,
+    tags_for_rotation,
+    thematic_tags,
+    universe_version,
+)
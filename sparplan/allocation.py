@@ -0,0 +1,220 @@
+import math
+from typing import NamedTuple
+
+# -----------------------------
+# Allokation: Budget -> Raten pro Monat
+# -----------------------------
+# Ein Löser für alles, was vorher über mehrere Zweige in compute_plan verteilt
+# war: Favoriten/Rotation-Split mit Multiplikator, Mindestbetrag Rotation
+# (geschlossen statt Schleife), dazu optionale Grenzen – max. Rate pro Name,
+# Mindestordergröße des Brokers und Mindestraten pro ETF. Ohne diese Grenzen
+# sind alle Ergebnisse bitgleich zur bisherigen Rechnung.
+
+
+class Allocation(NamedTuple):
+    fav_rate: float
+    rot_rate: float
+    fav_per_month: int
+    rot_per_month: int
+    etf_rates: dict
+    unallocated: float  # € pro Monat, die wegen Obergrenzen nicht verteilt werden
+    info: list
+
+
+def parse_minimums(value) -> dict:
+    # {"Name": Betrag} direkt oder Text mit einer Zeile "Name=Betrag" pro ETF
+    if isinstance(value, dict):
+        return {str(k): float(v) for k, v in value.items()}
+    out = {}
+    for line in str(value or "").splitlines():
+        if "=" in line:
+            name, amount = line.rsplit("=", 1)
+            name = " ".join(name.split())
+            if name and amount.strip():
+                out[name] = float(amount.strip().replace(",", "."))
+    return out
+
+
+def _rot_rate_for(aktien_budget, r, fav_weight):
+    # exakt derselbe Ausdruck wie in der früheren Schleife (bitgleiche Raten)
+    denom = (r * 1.0) + fav_weight
+    return aktien_budget / denom if denom > 0 else 0.0
+
+
+def max_rotation_count(aktien_budget, fav_count, rot_count, fav_multiplier, min_rate) -> int:
+    # Größtes r ≤ rot_count mit aktien_budget / (r + F·m) ≥ min_rate, sonst 0.
+    # Schätzung in geschlossener Form, danach ±1 mit dem exakten Ausdruck
+    # prüfen – identisch zur früheren Schleife, die r schrittweise verringerte.
+    fav_weight = fav_count * float(fav_multiplier)
+    if min_rate <= 0:
+        return rot_count
+    r = aktien_budget / min_rate - fav_weight
+    r = min(rot_count, max(0, math.floor(r))) if math.isfinite(r) else (rot_count if r > 0 else 0)
+    while r < rot_count and _rot_rate_for(aktien_budget, r + 1, fav_weight) >= min_rate:
+        r += 1
+    while r > 0 and _rot_rate_for(aktien_budget, r, fav_weight) < min_rate:
+        r -= 1
+    return r
+
+
+def solve_rates(aktien_budget, fav_count, rot_count, fav_multiplier, min_rate_rotation):
+    # -> (fav_rate_per_fav, rot_rate, rot_per_month_eff, info_adjustments)
+    info_adjustments = []
+    rot_per_month_eff = rot_count
+
+    if rot_count == 0 and fav_count > 0:
+        rot_rate = 0.0
+        fav_rate_per_fav = aktien_budget / fav_count
+        info_adjustments.append("Keine Rotation möglich → gesamtes Aktienbudget geht in Favoriten.")
+    elif fav_count == 0 and rot_count > 0:
+        fav_rate_per_fav = 0.0
+        rot_rate = aktien_budget / rot_count
+    elif fav_count == 0 and rot_count == 0:
+        fav_rate_per_fav = 0.0
+        rot_rate = 0.0
+        info_adjustments.append("Keine Aktien ausgewählt (Favoriten/Rotation leer).")
+    else:
+        rot_rate = _rot_rate_for(aktien_budget, rot_count, fav_count * float(fav_multiplier))
+        fav_rate_per_fav = rot_rate * float(fav_multiplier)
+
+    # Mindestbetrag Rotation
+    if rot_per_month_eff > 0 and min_rate_rotation > 0 and rot_rate < min_rate_rotation:
+        rot_per_month_eff = max_rotation_count(aktien_budget, fav_count, rot_count, fav_multiplier, min_rate_rotation)
+        if rot_per_month_eff > 0:
+            rot_rate = _rot_rate_for(aktien_budget, rot_per_month_eff, fav_count * float(fav_multiplier))
+            fav_rate_per_fav = rot_rate * float(fav_multiplier)
+
+        info_adjustments.append(
+            f"Rotation-Aktien/Monat reduziert, damit mind. {min_rate_rotation:.2f}€ pro Rotation-Aktie erreicht werden."
+        )
+
+        if rot_per_month_eff == 0 and fav_count > 0:
+            rot_rate = 0.0
+            fav_rate_per_fav = aktien_budget / fav_count
+            info_adjustments.append("Rotation fiel auf 0 → gesamtes Aktienbudget geht in Favoriten.")
+
+    return fav_rate_per_fav, rot_rate, rot_per_month_eff, info_adjustments
+
+
+def solve_etf_rates(etf_budget, etf_list, weights, max_rate=None, min_order=0.0, minimums=None):
+    # -> (etf_raten, nicht verteilt, Hinweise). Ohne Grenzen: Budget nach Gewicht
+    # (bzw. gleich verteilt, wenn alle Gewichte 0 sind) – wie bisher.
+    info = []
+    if not etf_list:
+        return {}, 0.0, info
+    total_w = sum(weights[e] for e in etf_list)
+    constrained = max_rate is not None or min_order > 0 or any((minimums or {}).get(e, 0) > 0 for e in etf_list)
+    if not constrained:
+        if total_w > 0:
+            return {e: etf_budget * (weights[e] / total_w) for e in etf_list}, 0.0, info
+        equal = etf_budget / len(etf_list)
+        return {e: equal for e in etf_list}, 0.0, info
+
+    w = {e: (weights[e] if total_w > 0 else 1.0) for e in etf_list}
+    lo = {e: max(float(min_order), float((minimums or {}).get(e, 0.0))) for e in etf_list}
+    hi = {e: (math.inf if max_rate is None else float(max_rate)) for e in etf_list}
+    for e in etf_list:
+        if hi[e] < lo[e]:
+            raise ValueError(f"ETF {e}: Mindestrate {lo[e]:.2f}€ liegt über der max. Rate pro Name {hi[e]:.2f}€.")
+
+    # Unbezahlbare Mindestraten: kleinste Gewichte (bei Gleichstand die hinteren) fallen raus
+    active = list(etf_list)
+    dropped = []
+    while active and sum(lo[e] for e in active) > etf_budget:
+        worst = min(reversed(active), key=lambda e: w[e])
+        active.remove(worst)
+        dropped.append(worst)
+    if dropped:
+        info.append(
+            f"ETF-Mindestraten nicht finanzierbar → pausiert: {', '.join(dropped)}."
+        )
+
+    rates = {e: 0.0 for e in active}  # pausierte ETFs fehlen im Ergebnis
+    if active:
+        level = _water_level(etf_budget, [(w[e], lo[e], hi[e]) for e in active])
+        for e in active:
+            rates[e] = min(hi[e], max(lo[e], level * w[e])) if w[e] > 0 else lo[e]
+    unallocated = max(0.0, etf_budget - sum(rates.values()))
+    if unallocated > 1e-9:
+        info.append(f"ETF-Obergrenze aktiv: {unallocated:.2f}€/Monat bleiben unverteilt.")
+    return rates, unallocated, info
+
+
+def _water_level(budget, items):
+    # λ mit Σ clip(λ·w, lo, hi) = budget; die Summe ist stückweise linear in λ,
+    # daher genügt ein Durchlauf über die sortierten Knickstellen.
+    points = sorted({b / w for w, lo, hi in items if w > 0 for b in (lo, hi) if math.isfinite(b)})
+    prev = 0.0
+    for p in points + [math.inf]:
+        # Segment [prev, p]: fest sind alle mit hi/w ≤ prev oder lo/w ≥ p
+        fixed, slope = 0.0, 0.0
+        for w, lo, hi in items:
+            if w <= 0:
+                fixed += lo
+            elif hi / w <= prev:
+                fixed += hi
+            elif lo / w >= p:
+                fixed += lo
+            else:
+                slope += w
+        if slope > 0:
+            level = (budget - fixed) / slope
+            if level <= p:
+                return max(level, prev)
+        elif fixed >= budget:
+            return prev
+        prev = p
+    return prev
+
+
+def solve_allocation(
+    aktien_budget, etf_budget, fav_count, rot_count, fav_multiplier, min_rate_rotation,
+    etf_list=(), etf_weights=None, max_rate_per_name=None, min_order=0.0, etf_minimums=None,
+) -> Allocation:
+    # Für Schleifen (Parameter-Sweeps) gedacht: nur Skalar-Arithmetik, keine Imports
+    min_order = float(min_order or 0.0)
+    if max_rate_per_name is not None and max_rate_per_name <= 0:
+        max_rate_per_name = None  # 0 = keine Grenze (wie in der UI)
+    if max_rate_per_name is not None and max_rate_per_name < min_order:
+        raise ValueError("Die max. Rate pro Name ist kleiner als die Mindestordergröße.")
+
+    # Mindestorder gilt auch für Rotation; bei Multiplikator < 1 auch über die Favoriten
+    min_rot = float(min_rate_rotation)
+    if min_order > 0 and fav_count > 0 and rot_count > 0:
+        min_rot = max(min_rot, min_order, min_order / float(fav_multiplier) if 0 < fav_multiplier < 1 else 0.0)
+    elif min_order > 0:
+        min_rot = max(min_rot, min_order)
+    fav_rate, rot_rate, rot_eff, info = solve_rates(aktien_budget, fav_count, rot_count, fav_multiplier, min_rot)
+
+    # Favoriten unter Mindestorder (nur noch Favoriten übrig): weniger pro Monat
+    fav_eff = fav_count
+    if min_order > 0 and rot_eff == 0 and fav_count > 0 and fav_rate < min_order:
+        fav_eff = min(fav_count, max(0, math.floor(aktien_budget / min_order)))
+        while fav_eff < fav_count and aktien_budget / (fav_eff + 1) >= min_order:
+            fav_eff += 1
+        while fav_eff > 0 and aktien_budget / fav_eff < min_order:
+            fav_eff -= 1
+        fav_rate = aktien_budget / fav_eff if fav_eff else 0.0
+        info.append(f"Favoriten/Monat auf {fav_eff} reduziert (Mindestorder {min_order:.2f}€).")
+
+    unallocated = 0.0
+    if max_rate_per_name is not None:
+        cap = float(max_rate_per_name)
+        if fav_rate > cap or rot_rate > cap:
+            # gedeckelte Favoriten geben ihren Überschuss an die Rotation ab (ebenfalls gedeckelt)
+            fav_rate = min(fav_rate, cap)
+            if rot_eff > 0:
+                rot_rate = min(cap, max(rot_rate, (aktien_budget - fav_rate * fav_eff) / rot_eff))
+            used = fav_rate * fav_eff + rot_rate * rot_eff
+            unallocated = max(0.0, aktien_budget - used)
+            if unallocated > 1e-9:
+                info.append(f"Max. Rate pro Name ({cap:.2f}€) aktiv: {unallocated:.2f}€/Monat bleiben unverteilt.")
+            else:
+                info.append(f"Max. Rate pro Name ({cap:.2f}€) aktiv: Überschuss der Favoriten geht in die Rotation.")
+
+    weights = etf_weights if etf_weights is not None else {e: 1.0 for e in etf_list}
+    etf_rates, etf_rest, etf_info = solve_etf_rates(
+        etf_budget, list(etf_list), weights, max_rate=max_rate_per_name, min_order=min_order, minimums=etf_minimums,
+    )
+    info.extend(etf_info)
+    return Allocation(fav_rate, rot_rate, fav_eff, rot_eff, etf_rates, unallocated + etf_rest, info)
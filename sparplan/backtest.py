@@ -0,0 +1,225 @@
+"""Historischer Backtest eines Sparplans gegen lokale Monatskurse.
+
+Kurse werden einmalig aus CSV/Parquet in einen spaltenweisen Store
+umgewandelt (eine ``.npy``-Datei pro Instrument + ``index.json``) und danach
+nur noch per ``np.load(..., mmap_mode="r")`` gelesen:
+
+    python -m sparplan.backtest build kurse.csv data/prices/
+
+Eingabe: breit (``Datum`` + eine Spalte je Instrument) oder lang
+(``Datum, Name, Kurs``). Tageskurse werden auf Monatsende verdichtet.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+from .engine import contribution_schedule
+from .profiling import count, stage
+from .tagging import normalize_name
+
+STORE_VERSION = 1
+INDEX_FILE = "index.json"
+
+
+# -----------------------------
+# Kurs-Store (memory-mapped)
+# -----------------------------
+def _column_file(name: str) -> str:
+    # Dateiname unabhängig von Sonderzeichen im Instrumentnamen
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:16] + ".npy"
+
+
+def build_store(source: str, directory: str, fmt: str | None = None) -> "PriceStore":
+    import pandas as pd
+
+    fmt = fmt or ("parquet" if source.lower().endswith((".parquet", ".pq")) else "csv")
+    df = pd.read_parquet(source) if fmt == "parquet" else pd.read_csv(source)
+    date_col = next((c for c in df.columns if str(c).lower() in ("datum", "date")), df.columns[0])
+    if {"Name", "Kurs"} <= set(df.columns):
+        df = df.pivot_table(index=date_col, columns="Name", values="Kurs", aggfunc="last")
+    else:
+        df = df.set_index(date_col)
+    df.index = pd.to_datetime(df.index)
+    df = df.sort_index().apply(pd.to_numeric, errors="coerce")
+    # Monatsende-Kurs; fehlende Monate bleiben NaN (= nicht handelbar), damit
+    # Plan-Monat k immer Kalendermonat k ab Start ist
+    monthly = df.groupby(df.index.to_period("M")).last()
+    if len(monthly):
+        monthly = monthly.reindex(pd.period_range(monthly.index[0], monthly.index[-1], freq="M"))
+
+    os.makedirs(directory, exist_ok=True)
+    columns = {}
+    for name in monthly.columns:
+        fn = _column_file(str(name))
+        np.save(os.path.join(directory, fn), monthly[name].to_numpy(dtype=np.float64))
+        columns[str(name)] = fn
+    index = {
+        "version": STORE_VERSION,
+        "dates": [str(p) for p in monthly.index],
+        "columns": columns,
+    }
+    tmp = os.path.join(directory, INDEX_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, ensure_ascii=False)
+    os.replace(tmp, os.path.join(directory, INDEX_FILE))
+    return PriceStore(directory)
+
+
+class PriceStore:
+    # Liest nur die Spalten, die ein Plan wirklich berührt; jede Spalte wird
+    # einmal gemappt und dann von allen Backtests geteilt (read-only, thread-sicher).
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as fh:
+            index = json.load(fh)
+        if index.get("version") != STORE_VERSION:
+            raise ValueError(f"Kurs-Store {directory}: Version {index.get('version')} wird nicht unterstützt.")
+        self.dates = list(index["dates"])
+        self._files = dict(index["columns"])
+        self._by_norm = {}
+        for name in self._files:
+            self._by_norm.setdefault(normalize_name(name), name)
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._files)
+
+    def resolve(self, name: str) -> str | None:
+        if name in self._files:
+            return name
+        return self._by_norm.get(normalize_name(name))
+
+    def column(self, name: str) -> np.ndarray | None:
+        key = self.resolve(name)
+        if key is None:
+            return None
+        arr = self._maps.get(key)
+        if arr is None:
+            with self._lock:
+                arr = self._maps.get(key)
+                if arr is None:
+                    arr = np.load(os.path.join(self.directory, self._files[key]), mmap_mode="r")
+                    self._maps[key] = arr
+                    count("price_columns_mapped")
+        return arr
+
+    def date_index(self, date: str) -> int:
+        # "2015-01" oder "2015-01-31" -> Zeile
+        ym = str(date)[:7]
+        try:
+            return self.dates.index(ym)
+        except ValueError:
+            raise ValueError(f"Datum {date} liegt nicht im Kurs-Store ({self.dates[0]} … {self.dates[-1]}).")
+
+    def window(self, names: list[str], start: int, months: int) -> tuple[np.ndarray, list[str]]:
+        # -> (Kurse[Monat, Instrument], fehlende Namen); fehlende Spalten = NaN
+        out = np.full((months, len(names)), np.nan, dtype=np.float64)
+        missing = []
+        for j, name in enumerate(names):
+            col = self.column(name)
+            if col is None:
+                missing.append(name)
+            else:
+                out[:, j] = col[start:start + months]  # Slice des Mappings, kein Komplett-Read
+        return out, missing
+
+    def mapped_columns(self) -> int:
+        return len(self._maps)
+
+
+# -----------------------------
+# Backtest
+# -----------------------------
+def _ffill(a: np.ndarray) -> np.ndarray:
+    # Vorwärts auffüllen entlang der Monate (für die Bewertung)
+    idx = np.where(np.isnan(a), 0, np.arange(a.shape[0])[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = a[idx, np.arange(a.shape[1])[None, :]]
+    return filled
+
+
+def backtest_plan(res: dict, store: PriceStore, start: str | int | None = None) -> dict:
+    with stage("bt_schedule"):
+        names, types, sched = contribution_schedule(res)
+        months = sched.shape[0]
+
+    if months > len(store):
+        raise ValueError(f"Plan läuft {months} Monate, der Kurs-Store hat nur {len(store)}.")
+    if start is None:
+        s = len(store) - months  # Standard: die jüngsten `monate` Monate
+    elif isinstance(start, int):
+        s = start
+    else:
+        s = store.date_index(start)
+    if s < 0 or s + months > len(store):
+        raise ValueError(f"Zeitraum ab {store.dates[max(s, 0)]} passt nicht in den Kurs-Store.")
+
+    with stage("bt_prices"):
+        prices, missing = store.window(names, s, months)
+
+    with stage("bt_replay"):
+        # Ohne Kurs im Kaufmonat bleibt die Rate als Cash liegen
+        tradable = ~np.isnan(prices)
+        units = np.where(tradable, sched / np.where(tradable, prices, 1.0), 0.0)
+        cash = np.where(tradable, 0.0, sched).sum(axis=1).cumsum()
+        held = units.cumsum(axis=0)
+        mark = np.nan_to_num(_ffill(prices))
+        value = (held * mark).sum(axis=1) + cash
+        cost = sched.sum(axis=1).cumsum()
+        peak = np.maximum.accumulate(value)
+        drawdown = np.where(peak > 0, value / np.where(peak > 0, peak, 1.0) - 1.0, 0.0)
+
+    final_value = held[-1] * mark[-1] if months else np.zeros(len(names))
+    return {
+        "start": store.dates[s],
+        "end": store.dates[s + months - 1],
+        "months": months,
+        "dates": store.dates[s:s + months],
+        "value": value,
+        "cost_basis": cost,
+        "drawdown": drawdown,
+        "final_value": float(value[-1]) if months else 0.0,
+        "invested": float(cost[-1]) if months else 0.0,
+        "uninvested_cash": float(cash[-1]) if months else 0.0,
+        "max_drawdown": float(drawdown.min()) if months else 0.0,
+        "missing": missing,
+        "instruments": [
+            {"Name": n, "Typ": t, "Einzahlung (€)": float(sched[:, j].sum()), "Anteile": float(held[-1, j]),
+             "Endwert (€)": float(final_value[j])}
+            for j, (n, t) in enumerate(zip(names, types))
+        ],
+    }
+
+
+def backtest_many(results, store: PriceStore, start: str | int | None = None):
+    # Viele Pläne gegen denselben Store; bereits gemappte Spalten werden wiederverwendet
+    for res in results:
+        yield backtest_plan(res, store, start=start)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sparplan.backtest", description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="CSV/Parquet in einen Kurs-Store umwandeln")
+    b.add_argument("source", help="Kursdatei (.csv oder .parquet)")
+    b.add_argument("directory", help="Zielverzeichnis des Stores")
+    b.add_argument("--format", choices=["csv", "parquet"], help="Eingabeformat (Standard: nach Endung)")
+    args = ap.parse_args(argv)
+
+    store = build_store(args.source, args.directory, fmt=args.format)
+    print(f"{len(store.names)} Instrumente × {len(store)} Monate ({store.dates[0]} … {store.dates[-1]}) -> {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""Headless Batch-Modus: viele Sparpläne aus CSV/JSONL berechnen.
+
+    python -m sparplan.batch params.jsonl -o out/ [--workers 8] [--roadmaps]
+
+Jede Zeile der Eingabe ist ein Parametersatz für ``compute_plan``; fehlende
+Felder werden mit den Standardwerten der Eingabemaske aufgefüllt. Ausgabe
+(gestreamt, Reihenfolge wie Eingabe):
+
+    out/totals.csv       plan_id, Name, Typ, Gesamtbetrag (€)
+    out/plans.jsonl      Kennzahlen + Hinweise pro Plan (mit --diagnostics inkl. Profiling)
+    out/roadmaps.jsonl   ein Eintrag pro Plan und Monat (nur mit --roadmaps)
+    out/schedule.<fmt>   Orderliste plan_id, Monat, Name, Typ, Rate (nur mit --schedule csv|jsonl|parquet)
+    out/errors.jsonl     Parametersätze, die nicht berechnet werden konnten
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .allocation import parse_minimums
+from .defaults import DEFAULT_PARAMS
+from .export import EXPORT_FORMATS, ScheduleWriter
+from .planarrays import FAVORIT, ROTATION, PlanArrays
+from .planner import compute_plan
+from .profiling import Profiler
+
+# -----------------------------
+# Eingabe
+# -----------------------------
+# Spaltennamen der UI bzw. Kurzformen -> Parameter von compute_plan
+FIELD_ALIASES = {
+    "favoriten": "favoriten_text",
+    "rotation": "rotation_text",
+    "rotation_aktien": "rotation_text",
+    "aktien": "rotation_text",
+    "etfs": "etfs_text",
+}
+TEXT_FIELDS = ("favoriten_text", "rotation_text", "etfs_text")
+BOOL_FIELDS = ("begrenze_rotation", "auswahl_wiederholbar", "shuffle_rotation")
+INT_FIELDS = ("monate", "aktienanteil", "anzahl_aktien_pro_monat", "max_aktien", "max_etfs", "favs_pro_monat")
+FLOAT_FIELDS = ("zielsumme", "fav_multiplier", "min_rate_rotation", "max_rate_pro_name", "min_order_betrag")
+MAPPING_FIELDS = ("etf_mindestraten",)
+
+
+def _as_text(value) -> str:
+    # JSON-Listen direkt, in CSV-Zellen sind Zeilenumbruch, ";" oder "|" erlaubt
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(v) for v in value)
+    text = str(value)
+    if "\n" not in text:
+        for sep in (";", "|"):
+            if sep in text:
+                return "\n".join(text.split(sep))
+    return text
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "ja", "yes", "y", "x")
+    return bool(value)
+
+
+def normalize_params(raw: dict) -> tuple[str | None, dict]:
+    params = dict(DEFAULT_PARAMS)
+    plan_id = None
+    for key, value in raw.items():
+        key = FIELD_ALIASES.get(key, key)
+        if key in ("id", "plan_id"):
+            plan_id = str(value)
+            continue
+        if key not in params or value is None:
+            continue
+        if key in TEXT_FIELDS:
+            params[key] = _as_text(value)  # leer = bewusst keine Einträge (wie in der UI)
+        elif value == "":
+            continue
+        elif key in BOOL_FIELDS:
+            params[key] = _as_bool(value)
+        elif key in INT_FIELDS:
+            params[key] = int(float(value))
+        elif key in FLOAT_FIELDS:
+            params[key] = float(value)
+            if key == "max_rate_pro_name" and params[key] <= 0:
+                params[key] = None  # 0 = keine Grenze (wie in der UI)
+        elif key in MAPPING_FIELDS:
+            params[key] = parse_minimums(value if isinstance(value, dict) else _as_text(value))
+        else:
+            params[key] = value
+    return plan_id, params
+
+
+def iter_param_sets(path: str, fmt: str | None = None):
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, encoding="utf-8", newline="") as fh:
+        if fmt == "csv":
+            for row in csv.DictReader(fh):
+                yield row
+        else:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+# -----------------------------
+# Worker
+# -----------------------------
+def run_one(job: tuple) -> dict:
+    # Läuft im Worker-Prozess; gibt nur einfache Datentypen zurück (billig zu picklen)
+    seq, raw, with_roadmaps, with_diagnostics, with_schedule = job
+    try:
+        plan_id, params = normalize_params(raw)
+        plan_id = plan_id or str(seq)
+        res = compute_plan(**params, profiler=Profiler() if with_diagnostics else None)
+    except Exception as e:  # ein kaputter Parametersatz darf den Lauf nicht abbrechen
+        return {"seq": seq, "error": f"{type(e).__name__}: {e}", "raw": raw}
+
+    out = {
+        "seq": seq,
+        "plan_id": plan_id,
+        "totals": [tuple(r) for r in res["df_export"].itertuples(index=False)],
+        "summary": {
+            "plan_id": plan_id,
+            "monatlicher_betrag": res["monatlicher_betrag"],
+            "fav_rate_per_fav": res["fav_rate_per_fav"],
+            "rot_rate": res["rot_rate"],
+            "monate": res["monate_int"],
+            "anzahl_instrumente": len(res["df_export"]),
+            "hits": res["hits"],
+            "pct": res["pct"],
+            "info_limits": res["info_limits"],
+            "info_adjustments": res["info_adjustments"],
+        },
+    }
+    if with_diagnostics:
+        out["summary"]["diagnostics"] = res["diagnostics"]
+    if with_roadmaps or with_schedule:
+        # Plan-Arrays als ein Puffer: ein memcpy beim Picklen, im Hauptprozess
+        # werden die Arrays ohne weitere Kopie direkt daraus gelesen
+        out["arrays"] = res["arrays"].to_bytes()
+        out["etf_raten"] = res["etf_raten"]
+    return out
+
+
+# -----------------------------
+# Ausgabe
+# -----------------------------
+class BatchWriter:
+    def __init__(self, out_dir: str, with_roadmaps: bool, schedule_fmt: str | None = None):
+        os.makedirs(out_dir, exist_ok=True)
+        self._totals_fh = open(os.path.join(out_dir, "totals.csv"), "w", encoding="utf-8", newline="")
+        self._totals = csv.writer(self._totals_fh)
+        self._totals.writerow(["plan_id", "Name", "Typ", "Gesamtbetrag (€)"])
+        self._plans = open(os.path.join(out_dir, "plans.jsonl"), "w", encoding="utf-8")
+        self._errors = open(os.path.join(out_dir, "errors.jsonl"), "w", encoding="utf-8")
+        self._roadmaps = open(os.path.join(out_dir, "roadmaps.jsonl"), "w", encoding="utf-8") if with_roadmaps else None
+        self._schedule = None
+        if schedule_fmt:
+            ext = EXPORT_FORMATS[schedule_fmt][0]
+            self._schedule = ScheduleWriter(os.path.join(out_dir, f"schedule.{ext}"), schedule_fmt, with_plan_id=True)
+        self.ok = 0
+        self.failed = 0
+
+    def write(self, item: dict) -> None:
+        if "error" in item:
+            self.failed += 1
+            self._errors.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+            return
+        self.ok += 1
+        pid = item["plan_id"]
+        self._totals.writerows((pid, *row) for row in item["totals"])
+        self._plans.write(json.dumps(item["summary"], ensure_ascii=False) + "\n")
+        arrays = PlanArrays.from_bytes(item["arrays"]) if "arrays" in item else None
+        if self._roadmaps is not None:
+            names, summary = arrays.names, item["summary"]
+            fav_cols, rot_cols = arrays.slot_columns(FAVORIT), arrays.slot_columns(ROTATION)
+            for m, row in enumerate(arrays.schedule.tolist(), start=1):
+                rec = {
+                    "plan_id": pid,
+                    "monat": m,
+                    "favoriten": {names[row[j]]: summary["fav_rate_per_fav"] for j in fav_cols if row[j] >= 0},
+                    "rotation": {names[row[j]]: summary["rot_rate"] for j in rot_cols if row[j] >= 0},
+                    "etfs": item["etf_raten"],
+                }
+                self._roadmaps.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        if self._schedule is not None:
+            self._schedule.write(arrays, plan_id=pid)
+
+    def close(self) -> None:
+        for fh in (self._totals_fh, self._plans, self._errors, self._roadmaps, self._schedule):
+            if fh is not None:
+                fh.close()
+
+
+class Progress:
+    def __init__(self, stream=sys.stderr, every: float = 1.0):
+        self.stream = stream
+        self.every = every
+        self.t0 = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, done: int, failed: int, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._last < self.every:
+            return
+        self._last = now
+        dt = max(now - self.t0, 1e-9)
+        self.stream.write(f"\r{done} Pläne ({failed} Fehler) • {done / dt:,.0f} Pläne/s • {dt:,.1f} s")
+        if force:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+# -----------------------------
+# Lauf
+# -----------------------------
+def run_batch(
+    input_path: str,
+    out_dir: str,
+    workers: int | None = None,
+    with_roadmaps: bool = False,
+    with_diagnostics: bool = False,
+    fmt: str | None = None,
+    schedule_fmt: str | None = None,
+    max_in_flight: int | None = None,
+    chunksize: int = 16,
+    progress: Progress | None = None,
+) -> tuple[int, int]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    writer = BatchWriter(out_dir, with_roadmaps, schedule_fmt)
+    jobs = (
+        (i, raw, with_roadmaps, with_diagnostics, bool(schedule_fmt))
+        for i, raw in enumerate(iter_param_sets(input_path, fmt))
+    )
+    try:
+        if workers <= 0:
+            for job in jobs:
+                writer.write(run_one(job))
+                if progress:
+                    progress.update(writer.ok + writer.failed, writer.failed)
+        else:
+            # Begrenztes Fenster an offenen Paketen: konstanter Speicher, Ausgabe
+            # in Eingabe-Reihenfolge, Eingabe wird nur so weit gelesen wie nötig.
+            window = max_in_flight or workers * 4
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                chunk = []
+                for job in jobs:
+                    chunk.append(job)
+                    if len(chunk) >= chunksize:
+                        pending.append(pool.submit(_run_chunk, chunk))
+                        chunk = []
+                    while len(pending) >= window:
+                        _drain(pending.popleft(), writer, progress)
+                if chunk:
+                    pending.append(pool.submit(_run_chunk, chunk))
+                while pending:
+                    _drain(pending.popleft(), writer, progress)
+    finally:
+        writer.close()
+    if progress:
+        progress.update(writer.ok + writer.failed, writer.failed, force=True)
+    return writer.ok, writer.failed
+
+
+def _run_chunk(chunk: list) -> list:
+    return [run_one(job) for job in chunk]
+
+
+def _drain(future, writer: BatchWriter, progress: Progress | None) -> None:
+    for item in future.result():
+        writer.write(item)
+    if progress:
+        progress.update(writer.ok + writer.failed, writer.failed)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sparplan.batch", description=__doc__.splitlines()[0])
+    ap.add_argument("input", help="Parametersätze als .csv oder .jsonl")
+    ap.add_argument("-o", "--out", required=True, help="Ausgabeverzeichnis")
+    ap.add_argument("--format", choices=["csv", "jsonl"], help="Eingabeformat (Standard: nach Endung)")
+    ap.add_argument("--workers", type=int, default=None, help="Prozesse (0 = im Hauptprozess; Standard: CPU-Anzahl)")
+    ap.add_argument("--chunksize", type=int, default=16, help="Parametersätze pro Worker-Paket")
+    ap.add_argument("--max-in-flight", type=int, default=None, help="max. offene Pakete (Standard: 4 × Worker)")
+    ap.add_argument("--roadmaps", action="store_true", help="Monatsfahrplan je Plan mit ausgeben")
+    ap.add_argument(
+        "--schedule", choices=list(EXPORT_FORMATS), help="Orderliste (Monat × Instrument) je Plan mit ausgeben",
+    )
+    ap.add_argument("--diagnostics", action="store_true", help="Stufen-Zeiten/Zähler je Plan in plans.jsonl")
+    ap.add_argument("--quiet", action="store_true", help="keine Fortschrittsanzeige")
+    args = ap.parse_args(argv)
+
+    ok, failed = run_batch(
+        args.input, args.out,
+        workers=args.workers, with_roadmaps=args.roadmaps, with_diagnostics=args.diagnostics, fmt=args.format,
+        schedule_fmt=args.schedule,
+        max_in_flight=args.max_in_flight, chunksize=args.chunksize,
+        progress=None if args.quiet else Progress(),
+    )
+    return 0 if ok or not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
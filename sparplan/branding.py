@@ -0,0 +1,36 @@
+import base64
+import io
+import os
+
+# -----------------------------
+# Logo und Branding
+# -----------------------------
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Traderise_Logo.PNG")
+LOGO_DISPLAY_WIDTH = 50  # px im Layout
+LOGO_PIXEL_RATIO = 2     # HiDPI: doppelte Auflösung, Anzeige bleibt 50px
+
+BRANDING_TEMPLATE = """
+<div style="display: flex; align-items: center; margin-top: 10px; margin-bottom: 30px;">
+    <img src="data:image/png;base64,{encoded_image}" alt="Logo" style="width: {width}px; height: auto; margin-right: 10px;">
+    <span style="font-size: 14px;">Powered by <a href="https://traderise.net" target="_blank" style="color:#1E90FF; text-decoration: none;">Traderise.net</a></span>
+</div>
+"""
+
+
+def logo_png_bytes(path: str = LOGO_PATH, width: int = LOGO_DISPLAY_WIDTH * LOGO_PIXEL_RATIO) -> bytes:
+    # PIL nur hier laden – der Planungskern bleibt davon unberührt
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+        if im.width > width:
+            height = max(1, round(im.height * width / im.width))
+            im = im.resize((width, height), Image.LANCZOS)
+        buf = io.BytesIO()
+        im.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def branding_html(png_bytes: bytes, width: int = LOGO_DISPLAY_WIDTH) -> str:
+    encoded_image = base64.b64encode(png_bytes).decode()
+    return BRANDING_TEMPLATE.format(encoded_image=encoded_image, width=width)
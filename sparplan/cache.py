@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from .planner import clean_lines, compute_plan
+from .profiling import count, stage
+from .tagging import universe_version
+
+# -----------------------------
+# Ergebnis-Cache für compute_plan
+# -----------------------------
+TEXT_PARAMS = ("favoriten_text", "rotation_text", "etfs_text")
+VIEW_PARAMS = ("top_n_chart", "show_tag_table")  # nur Darstellung, nicht Teil des Keys
+CACHE_VERSION = 3  # erhöhen, wenn sich das Ergebnisformat ändert
+
+
+def plan_cache_key(params: dict) -> str:
+    # Texte werden wie in compute_plan bereinigt – Leerzeilen, doppelte
+    # Leerzeichen oder typografische Anführungszeichen ergeben denselben Key.
+    norm = {"_v": CACHE_VERSION, "_u": universe_version()}  # neue Stammdaten -> neue Keys
+    for k, v in sorted(params.items()):
+        if k not in VIEW_PARAMS:
+            norm[k] = clean_lines(v or "") if k in TEXT_PARAMS else v
+    blob = json.dumps(norm, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(params: dict) -> bool:
+    # "jedes Mal neu" gemischte Pläne sind absichtlich nicht reproduzierbar
+    return bool(params.get("auswahl_wiederholbar", True)) or not params.get("shuffle_rotation", False)
+
+
+class PlanCache:
+    # LRU mit Größen- und TTL-Limit, thread-sicher; optional zusätzlich als
+    # Pickle-Dateien auf der Platte (überlebt Neustarts). Gecachte Ergebnisse
+    # werden geteilt und sind als read-only zu behandeln.
+    def __init__(self, maxsize: int = 256, ttl: float | None = 3600.0, directory: str | None = None):
+        self.maxsize = int(maxsize)
+        self.ttl = ttl
+        self.directory = directory
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and (time.time() - stored_at) > self.ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load_disk(self, key: str):
+        path = self._path(key)
+        try:
+            if self._expired(os.path.getmtime(path)):
+                os.remove(path)
+                return None
+            with open(path, "rb") as fh:
+                return pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store_disk(self, key: str, value) -> None:
+        import tempfile
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+        if self.directory:
+            value = self._load_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._put_memory(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _put_memory(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def put(self, key: str, value) -> None:
+        self._put_memory(key, value)
+        if self.directory:
+            self._store_disk(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+        if self.directory:
+            for fn in os.listdir(self.directory):
+                if fn.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, fn))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": ((self.hits + self.disk_hits) / lookups) if lookups else 0.0,
+            }
+
+    def compute(self, runner=None, **params) -> tuple[dict, bool]:
+        # -> (Ergebnis, aus_cache); runner z. B. PlanPipeline.run einer Session
+        runner = runner or compute_plan
+        if not is_cacheable(params):
+            with self._lock:
+                self.bypassed += 1
+            return runner(**params), False
+        with stage("cache_lookup"):
+            key = plan_cache_key(params)
+            res = self.get(key)
+        if res is not None:
+            count("plan_cache_hits")
+            return res, True
+        res = runner(**params)
+        self.put(key, res)
+        return res, False
@@ -0,0 +1,146 @@
+import io
+from typing import NamedTuple
+
+# -----------------------------
+# Charts
+# -----------------------------
+# Zwei Wege: PNGs per matplotlib (objektorientiert über Figure, ohne pyplot-
+# Registry – jede Figur wird nach dem Speichern freigegeben) oder reine
+# Vega-Lite-Spezifikationen, die der Browser rendert (kein Rastern auf dem
+# Server). matplotlib/pandas werden erst im jeweiligen Aufruf geladen.
+TYPE_COLORS = {"Favorit": "tab:green", "Rotation": "tab:orange", "ETF": "tab:blue"}
+TYPE_COLORS_HEX = {"Favorit": "#2ca02c", "Rotation": "#ff7f0e", "ETF": "#1f77b4"}  # = tab:* von matplotlib
+PNG_DPI = 200  # wie st.pyplot
+AMOUNT = "Gesamtbetrag (€)"
+
+
+class ChartFrames(NamedTuple):
+    top: object       # DataFrame: größte Positionen (absteigend)
+    rest_sum: float   # Summe aller Positionen jenseits von top_n
+    by_type: object   # Series: Summe je Typ
+    etfs: object      # DataFrame: nur ETFs
+
+
+def chart_frames(df_export, top_n: int) -> ChartFrames:
+    df_sorted = df_export.sort_values(by=AMOUNT, ascending=False)
+    top_n = int(top_n)
+    rest_sum = 0.0
+    if len(df_sorted) > top_n:
+        top = df_sorted.head(top_n).copy()
+        rest_sum = float(df_sorted.iloc[top_n:][AMOUNT].sum())
+    else:
+        top = df_sorted
+    by_type = df_export.groupby("Typ")[AMOUNT].sum()
+    etfs = df_export[df_export["Typ"] == "ETF"]
+    return ChartFrames(top, rest_sum, by_type, etfs)
+
+
+def _png(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=PNG_DPI, bbox_inches="tight")
+    fig.clear()  # Figure hängt an keiner pyplot-Registry – danach frei für den GC
+    return buf.getvalue()
+
+
+def render_chart_pngs(df_export, top_n: int) -> dict:
+    # -> {"verteilung": PNG, "typ": PNG, "etf": PNG | None, "rest_sum": float}
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    frames = chart_frames(df_export, top_n)
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.barh(frames.top["Name"], frames.top[AMOUNT], color=[TYPE_COLORS.get(t, "gray") for t in frames.top["Typ"]])
+    ax.set_xlabel(AMOUNT)
+    ax.set_title("Verteilung nach Sparplan")
+    ax.invert_yaxis()
+    ax.legend(handles=[Patch(facecolor=c, label=t) for t, c in TYPE_COLORS.items()], loc="lower right")
+    ax.tick_params(axis="y", labelsize=8)
+    fig.tight_layout()
+    verteilung = _png(fig)
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(frames.by_type.index, frames.by_type.values, color=[TYPE_COLORS.get(t, "gray") for t in frames.by_type.index])
+    ax.set_title("Verteilung nach Typ")
+    ax.set_ylabel(AMOUNT)
+    typ = _png(fig)
+
+    etf = None
+    if not frames.etfs.empty:
+        fig = Figure()
+        ax = fig.subplots()
+        ax.pie(frames.etfs[AMOUNT], labels=frames.etfs["Name"], autopct="%1.1f%%", startangle=140)
+        ax.set_title("ETF-Allokation")
+        etf = _png(fig)
+
+    return {"verteilung": verteilung, "typ": typ, "etf": etf, "rest_sum": frames.rest_sum}
+
+
+def render_heatmap_png(grid, x_values, y_values, x_label: str, y_label: str, title: str) -> bytes:
+    # Sweep-Heatmap (y × x); Werte in den Zellen nur bei kleinen Gittern
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(min(14, 2 + 0.7 * len(x_values)), min(10, 1.5 + 0.5 * len(y_values))))
+    ax = fig.subplots()
+    im = ax.imshow(grid, origin="lower", aspect="auto", cmap="viridis")
+    ax.set_xticks(range(len(x_values)), [f"{v:g}" for v in x_values], rotation=45)
+    ax.set_yticks(range(len(y_values)), [f"{v:g}" for v in y_values])
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    fig.colorbar(im, ax=ax)
+    if grid.size <= 400:
+        for (iy, ix), v in np.ndenumerate(grid):
+            if np.isfinite(v):
+                ax.text(ix, iy, f"{v:.3g}", ha="center", va="center", fontsize=7, color="white")
+    fig.tight_layout()
+    return _png(fig)
+
+
+def _color_scale() -> dict:
+    return {"domain": list(TYPE_COLORS_HEX), "range": list(TYPE_COLORS_HEX.values())}
+
+
+def vega_chart_specs(df_export, top_n: int) -> dict:
+    # -> {"verteilung": Spec, "typ": Spec, "etf": Spec | None, "rest_sum": float}; Daten inline
+    frames = chart_frames(df_export, top_n)
+    top = [{"Name": n, "Typ": t, AMOUNT: float(v)} for n, t, v in zip(frames.top["Name"], frames.top["Typ"], frames.top[AMOUNT])]
+    verteilung = {
+        "title": "Verteilung nach Sparplan",
+        "data": {"values": top},
+        "mark": {"type": "bar"},
+        "height": max(200, 16 * len(top)),
+        "encoding": {
+            "y": {"field": "Name", "type": "nominal", "sort": None, "title": None, "axis": {"labelLimit": 220}},
+            "x": {"field": AMOUNT, "type": "quantitative"},
+            "color": {"field": "Typ", "type": "nominal", "scale": _color_scale()},
+            "tooltip": [{"field": "Name"}, {"field": "Typ"}, {"field": AMOUNT, "format": ",.2f"}],
+        },
+    }
+    typ = {
+        "title": "Verteilung nach Typ",
+        "data": {"values": [{"Typ": t, AMOUNT: float(v)} for t, v in frames.by_type.items()]},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Typ", "type": "nominal", "title": None},
+            "y": {"field": AMOUNT, "type": "quantitative"},
+            "color": {"field": "Typ", "type": "nominal", "scale": _color_scale(), "legend": None},
+            "tooltip": [{"field": "Typ"}, {"field": AMOUNT, "format": ",.2f"}],
+        },
+    }
+    etf = None
+    if not frames.etfs.empty:
+        etf = {
+            "title": "ETF-Allokation",
+            "data": {"values": [{"Name": n, AMOUNT: float(v)} for n, v in zip(frames.etfs["Name"], frames.etfs[AMOUNT])]},
+            "mark": {"type": "arc"},
+            "encoding": {
+                "theta": {"field": AMOUNT, "type": "quantitative", "stack": "normalize"},
+                "color": {"field": "Name", "type": "nominal"},
+                "tooltip": [{"field": "Name"}, {"field": AMOUNT, "format": ",.2f"}],
+            },
+        }
+    return {"verteilung": verteilung, "typ": typ, "etf": etf, "rest_sum": frames.rest_sum}
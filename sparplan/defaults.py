@@ -0,0 +1,166 @@
+# -----------------------------
+# Defaults
+# -----------------------------
+DEFAULT_FAVORITEN = """ASML
+TSMC
+Micron
+Palantir
+Vertiv
+Siemens Energy
+Coinbase
+Alphabet
+NVIDIA
+Crowdstrike"""
+
+DEFAULT_AKTIEN = """Adyen
+Aker Carbon Capture
+Airbnb (A)
+Alibaba Group (ADR)
+AMD
+Amazon.com
+Apple
+AST SpaceMobile
+Axon Enterprise
+BAE Systems
+Berkshire Hathaway (B)
+BitMine Immersion Technology
+Block
+Bloom Energy
+BYD
+BMW
+Brookfield Asset Management
+Cameco
+Circle Internet Group
+Cloudflare (A)
+Coca-Cola
+Constellation Energy
+Covestro
+Critical Metals
+Cummins
+CSG Group / Czeschoslovak Group
+Datadog (A)
+Deutsche Telekom
+Diginex
+DroneShield
+D-Wave Quantum
+Elbit Systems
+Eli Lilly & Co
+Endeavour Silver
+Fortinet
+Galaxy Digital Inc. Reg. Shs. Cl…
+GE Aerospace
+GEA
+Hecla Mining
+Heidelberg Materials
+Hensoldt
+Ibiden
+Iberdrola
+Illumina
+Impala Platinum
+Infineon Technologies
+Intellia Therapeutics
+Intellistake Technologies
+Intel
+Iren
+Intuitive Surgical
+Johnson & Johnson
+JP Morgan Chase
+KLA
+Lam Research
+Leonardo-Finmeccanica
+LVMH Louis Vuitton Moet Hen…
+MercadoLibre
+Mercedes-Benz Group
+Meta Platforms (A)
+MicroStrategy (A)
+Microsoft
+Morgan Stanley
+MP Materials
+Netflix
+Newmont
+Nio
+Nordex
+Novo Nordisk (ADR)
+Ondas Holdings
+Oracle
+Palo Alto Networks
+Procter & Gamble
+Prysmian
+Qualcomm
+Quantum eMotion
+Realty Income
+Reddit
+RENK Group
+Rheinmetall
+Riot Platforms
+Rocket Lab Corp.
+Rolls Royce
+Saab (B)
+Safran
+Samsung
+SAP
+Schaeffler
+ServiceNow
+Shopify (A)
+Siemens
+SK Hynix
+Snowflake (A)
+Spotify Technology
+Synopsys
+Take-Two Interactive
+Tencent Holdings
+Tesla
+Thales
+The Trade Desk (A)
+ThyssenKrupp
+TKMS AG & Co. KGaA Inhaber-…
+Uranium Energy
+Visa
+Xiaomi
+"""
+
+DEFAULT_ETFS = """AI & Big Data USD (Acc)
+Automation & Robotics USD (Acc)
+BlackRock World Mining Trust
+Core MSCI World USD (Acc)
+Core Stoxx Europe 600 EUR (Acc)
+Defence USD (Acc)
+MSCI EM USD (Acc)
+MSCI World Small Cap USD (Acc)
+Physical Gold USD (Acc)
+Space Innovators USD (Acc)
+"""
+
+PROFILE_OPTIONS = [
+    "Ausgewogen (Standard)",
+    "Tech & AI",
+    "Wachstum",
+    "Dividenden & Value",
+    "Konservativ & defensiv",
+]
+
+STRENGTH_OPTIONS = ["Mild", "Normal", "Strong"]
+
+# Standardwerte der Eingabemaske (auch für den Batch-Modus ohne UI)
+DEFAULT_PARAMS = {
+    "zielsumme": 50000,
+    "monate": 100,
+    "aktienanteil": 65,
+    "anzahl_aktien_pro_monat": 7,
+    "favoriten_text": DEFAULT_FAVORITEN,
+    "rotation_text": DEFAULT_AKTIEN,
+    "etfs_text": DEFAULT_ETFS,
+    "max_aktien": 40,
+    "max_etfs": 10,
+    "begrenze_rotation": True,
+    "profil": "Ausgewogen (Standard)",
+    "profil_staerke": "Strong",
+    "auswahl_wiederholbar": True,
+    "shuffle_rotation": True,
+    "favs_pro_monat": 2,
+    "fav_multiplier": 1.5,
+    "min_rate_rotation": 20.0,
+    "max_rate_pro_name": None,
+    "min_order_betrag": 0.0,
+    "etf_mindestraten": None,
+}
@@ -0,0 +1,134 @@
+import numpy as np
+
+# -----------------------------
+# Rotationsplan als Indexmatrizen
+# -----------------------------
+# Der Plan ist ein deterministischer, modularer Fahrplan: Monat i bespart die
+# Favoriten (i + k) % F und die Rotation ab (i * R) % L. Statt Listen pro Monat
+# werden die Indizes direkt als (Monate × Slots)-Matrix erzeugt; -1 = leerer Slot.
+
+
+def fav_index_matrix(n_favs: int, per_month: int, months: int) -> np.ndarray:
+    if n_favs <= 0 or per_month <= 0 or months <= 0:
+        return np.empty((max(months, 0), 0), dtype=np.int64)
+    i = np.arange(months)[:, None]
+    k = np.arange(per_month)[None, :]
+    return (i + k) % n_favs
+
+
+def rot_index_matrix(n_rot: int, per_month: int, months: int) -> np.ndarray:
+    if n_rot <= 0 or per_month <= 0 or months <= 0:
+        return np.empty((max(months, 0), 0), dtype=np.int64)
+    start = (np.arange(months) * per_month) % n_rot
+    k = np.arange(per_month)[None, :]
+    tail = (n_rot - start)[:, None]
+    # wie rot[start:start+R] + rot[0:R-len(...)] – bei R > L bleiben Slots leer
+    idx = np.where(k < tail, start[:, None] + k, k - tail)
+    return np.where(idx < n_rot, idx, -1)
+
+
+# -----------------------------
+# Summen je Instrument
+# -----------------------------
+def _repeated_sum(rate: float, max_count: int) -> np.ndarray:
+    # Laufende Summe 0 + r + r + ... exakt wie die alte Schleife (count × rate
+    # würde im letzten Bit abweichen); index n-1 = Summe nach n Käufen.
+    if max_count <= 0:
+        return np.empty(0, dtype=np.float64)
+    return np.cumsum(np.full(max_count, float(rate), dtype=np.float64))
+
+
+def aggregate_totals(
+    fav_list: list[str],
+    rot_list: list[str],
+    favs_per_month: int,
+    rot_per_month: int,
+    fav_rate: float,
+    rot_rate: float,
+    months: int,
+) -> dict[str, float]:
+    fav_idx = fav_index_matrix(len(fav_list), favs_per_month, months)
+    rot_idx = rot_index_matrix(len(rot_list), rot_per_month, months)
+
+    names = list(dict.fromkeys(fav_list + rot_list))
+    name_id = {n: i for i, n in enumerate(names)}
+    fav_ids = np.array([name_id[n] for n in fav_list] + [-1], dtype=np.int64)
+    rot_ids = np.array([name_id[n] for n in rot_list] + [-1], dtype=np.int64)
+
+    # Chronologische Käufe: pro Monat erst Favoriten, dann Rotation (wie die Schleife)
+    n_fav_cols = fav_idx.shape[1]
+    seq = np.hstack([fav_ids[fav_idx], rot_ids[rot_idx]]) if months > 0 else np.empty((0, 0), dtype=np.int64)
+    flat = seq.ravel()
+    is_fav = np.zeros(seq.shape, dtype=bool)
+    is_fav[:, :n_fav_cols] = True
+    is_fav = is_fav.ravel()
+
+    valid = flat >= 0
+    flat, is_fav = flat[valid], is_fav[valid]
+    if flat.size == 0:
+        return {}
+
+    fav_counts = np.bincount(flat[is_fav], minlength=len(names))
+    rot_counts = np.bincount(flat[~is_fav], minlength=len(names))
+
+    # Reihenfolge der Dict-Keys = Reihenfolge des ersten Kaufs. Jeder Index wird
+    # spätestens nach max(F, ceil(L/R)) Monaten einmal bespart – nur dieser
+    # Anfang muss sortiert werden.
+    head_months = max(len(fav_list), -(-len(rot_list) // rot_per_month) if rot_per_month > 0 else 0)
+    head = seq[:head_months].ravel()
+    head = head[head >= 0]
+    uniq, first = np.unique(head, return_index=True)
+    order = uniq[np.argsort(first, kind="stable")]
+
+    fav_cum = _repeated_sum(fav_rate, int(fav_counts.max()))
+    rot_cum = _repeated_sum(rot_rate, int(rot_counts.max()))
+    same_rate = float(fav_rate) == float(rot_rate)
+    both_cum = _repeated_sum(fav_rate, int((fav_counts + rot_counts).max())) if same_rate else None
+
+    totals = {}
+    for nid in order.tolist():
+        fc, rc = int(fav_counts[nid]), int(rot_counts[nid])
+        if rc == 0:
+            totals[names[nid]] = float(fav_cum[fc - 1])
+        elif fc == 0:
+            totals[names[nid]] = float(rot_cum[rc - 1])
+        elif same_rate:
+            totals[names[nid]] = float(both_cum[fc + rc - 1])
+        else:
+            # Name ist Favorit UND Rotation: Käufe in Originalreihenfolge aufsummieren
+            acc = 0
+            for fav_hit in is_fav[flat == nid].tolist():
+                acc = acc + (fav_rate if fav_hit else rot_rate)
+            totals[names[nid]] = acc
+    return totals
+
+
+# -----------------------------
+# Einzahlungsplan (Monate × Instrumente)
+# -----------------------------
+def contribution_schedule(res: dict) -> tuple[list[str], list[str], np.ndarray]:
+    # -> (Namen, Typen, Beträge[Monat, Instrument]) aus einem compute_plan-Ergebnis
+    fav_rm, rot_rm = res["fav_roadmap"], res["rot_roadmap"]
+    months = int(res["monate_int"])
+    fav_set = set(res["fav_list"])
+
+    names = list(dict.fromkeys(list(fav_rm.pool) + list(rot_rm.pool) + list(res["etf_list"])))
+    col = {n: j for j, n in enumerate(names)}
+    stocks = set(fav_rm.pool) | set(rot_rm.pool)
+    types = ["ETF" if n not in stocks else ("Favorit" if n in fav_set else "Rotation") for n in names]
+    sched = np.zeros((months, len(names)), dtype=np.float64)
+
+    for pool, idx, rate in (
+        (fav_rm.pool, fav_index_matrix(len(fav_rm.pool), fav_rm.per_month, months), res["fav_rate_per_fav"]),
+        (rot_rm.pool, rot_index_matrix(len(rot_rm.pool), rot_rm.per_month, months), res["rot_rate"]),
+    ):
+        if idx.size == 0 or not rate:
+            continue
+        cols = np.array([col[n] for n in pool] + [-1], dtype=np.int64)[idx]
+        rows = np.broadcast_to(np.arange(months)[:, None], idx.shape)
+        valid = idx >= 0
+        np.add.at(sched, (rows[valid], cols[valid]), float(rate))
+
+    for etf in res["etf_list"]:
+        sched[:, col[etf]] += float(res["etf_raten"].get(etf, 0.0))
+    return names, types, sched
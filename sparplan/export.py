@@ -0,0 +1,136 @@
+import csv
+import importlib.util
+import io
+import json
+import os
+
+from .monthview import COLUMNS
+
+# -----------------------------
+# Export: Monatsfahrplan (Orderliste)
+# -----------------------------
+# Eine Zeile pro Monat und Order (Monat, Name, Typ, Rate) – das Format für den
+# Broker-Import. Die Zeilen entstehen monatsweise aus der Slot-Matrix der
+# Plan-Arrays und werden in Blöcken geschrieben; die vollständige Tabelle
+# liegt nie im Speicher. Parquet (ein Row-Group pro Block) braucht das optionale pyarrow.
+# Raten von 0 € (z. B. pausierte ETFs) sind keine Order und fehlen im Export.
+
+EXPORT_FORMATS = {
+    # Format -> (Dateiendung, MIME-Typ)
+    "csv": ("csv", "text/csv"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+CHUNK_ROWS = 50_000
+
+
+def available_formats() -> list[str]:
+    # Parquet nur, wenn pyarrow installiert ist (ohne es zu importieren)
+    return [f for f in EXPORT_FORMATS if f != "parquet" or importlib.util.find_spec("pyarrow") is not None]
+
+
+def iter_schedule_rows(res):
+    # (Monat, Name, Typ, Rate) für alle Monate, ohne 0-€-Zeilen;
+    # res: compute_plan-Ergebnis oder direkt dessen PlanArrays
+    arrays = res["arrays"] if isinstance(res, dict) else res
+    return arrays.iter_orders()
+
+
+class ScheduleWriter:
+    # Schreibt einen oder (Batch: mit plan_id-Spalte) viele Fahrpläne in eine
+    # Datei oder ein binäres Dateiobjekt. Benutzung als Kontextmanager.
+    def __init__(self, target, fmt: str = "csv", with_plan_id: bool = False, chunk_rows: int = CHUNK_ROWS):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unbekanntes Exportformat: {fmt!r} (erlaubt: {', '.join(EXPORT_FORMATS)}).")
+        self.fmt = fmt
+        self.columns = (["plan_id"] if with_plan_id else []) + list(COLUMNS)
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.rows = 0
+        self._chunk = []
+        if fmt == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Parquet-Export benötigt pyarrow (pip install pyarrow).") from e
+        self._owns = isinstance(target, (str, os.PathLike))
+        self._fh = open(target, "wb") if self._owns else target
+        self._text = None
+        self._parquet = None
+        if fmt == "parquet":
+            types = {"plan_id": pa.string(), "Monat": pa.int32(), "Name": pa.string(), "Typ": pa.string(),
+                     "Rate (€)": pa.float64()}
+            self._schema = pa.schema([(c, types[c]) for c in self.columns])
+            self._parquet = pq.ParquetWriter(self._fh, self._schema)
+        else:
+            self._text = io.TextIOWrapper(self._fh, encoding="utf-8", newline="", write_through=True)
+            if fmt == "csv":
+                self._csv = csv.writer(self._text)
+                self._csv.writerow(self.columns)
+
+    def write(self, res, plan_id=None) -> int:
+        # -> Anzahl Zeilen dieses Plans; Blöcke laufen über Plangrenzen hinweg
+        # (Batch: wenige große statt vieler winziger Parquet-Row-Groups)
+        rows = iter_schedule_rows(res)
+        if self.columns[0] == "plan_id":
+            rows = ((None if plan_id is None else str(plan_id), *r) for r in rows)
+        n = 0
+        for row in rows:
+            self._chunk.append(row)
+            n += 1
+            if len(self._chunk) >= self.chunk_rows:
+                self.flush()
+        self.rows += n
+        return n
+
+    def flush(self) -> None:
+        if self._chunk:
+            self._write_chunk(self._chunk)
+            self._chunk = []
+
+    def _write_chunk(self, chunk: list) -> None:
+        if self.fmt == "csv":
+            self._csv.writerows(chunk)
+        elif self.fmt == "jsonl":
+            self._text.write("".join(
+                json.dumps(dict(zip(self.columns, r)), ensure_ascii=False) + "\n" for r in chunk
+            ))
+        else:
+            import pyarrow as pa
+
+            cols = list(zip(*chunk))
+            self._parquet.write_table(pa.Table.from_arrays([list(c) for c in cols], schema=self._schema))
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._text is not None:
+            self._text.flush()
+            self._text.detach()  # Dateiobjekt des Aufrufers nicht mitschließen
+            self._text = None
+        if self._owns and self._fh is not None:
+            self._fh.close()
+        self._fh = None
+
+    def __enter__(self) -> "ScheduleWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def export_schedule(res: dict, target, fmt: str = "csv", chunk_rows: int = CHUNK_ROWS) -> int:
+    # Fahrplan eines Plans nach `target` (Pfad oder binäres Dateiobjekt) -> Zeilen
+    with ScheduleWriter(target, fmt, chunk_rows=chunk_rows) as writer:
+        return writer.write(res)
+
+
+def schedule_bytes(res: dict, fmt: str = "csv") -> bytes:
+    # Für Download-Buttons: einmal bauen, danach aus dem Cache ausliefern
+    buf = io.BytesIO()
+    export_schedule(res, buf, fmt)
+    return buf.getvalue()
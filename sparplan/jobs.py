@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from contextvars import ContextVar, copy_context
+
+# -----------------------------
+# Hintergrund-Jobs
+# -----------------------------
+# Lange Rechnungen (Plan, Monte-Carlo, Sweep) laufen in einem begrenzten
+# Thread-Pool statt im Skript-Thread der Session. Jeder Job hat eine ID,
+# Fortschritt (0–1 + Text), Status und Ergebnis/Fehler. Abbrechen ist
+# kooperativ: report_progress() im Kern wirft JobCancelled, sobald der Job
+# abgebrochen wurde; ohne aktiven Job ist es praktisch kostenlos (ContextVar,
+# wie beim Profiler). Threads statt Prozesse: numpy gibt in den heißen
+# Schleifen den GIL frei, und Caches/Kurs-Store werden geteilt.
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_ACTIVE = ContextVar("sparplan_job", default=None)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    __slots__ = (
+        "id", "kind", "status", "progress", "message", "result", "error",
+        "submitted", "started", "finished", "_cancel", "_future",
+    )
+
+    def __init__(self, kind: str):
+        self.id = os.urandom(6).hex()
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def snapshot(self) -> dict:
+        # Momentaufnahme für die UI (ohne Ergebnis)
+        end = self.finished or time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "wait_s": round((self.started or end) - self.submitted, 3),
+            "run_s": round(end - self.started, 3) if self.started else 0.0,
+        }
+
+
+def report_progress(fraction: float, message: str | None = None) -> None:
+    # Aus dem Kern aufrufbar; wirft JobCancelled, wenn der laufende Job abgebrochen wurde
+    job = _ACTIVE.get()
+    if job is None:
+        return
+    job.progress = min(1.0, max(job.progress, float(fraction)))
+    if message is not None:
+        job.message = message
+    if job._cancel.is_set():
+        raise JobCancelled(job.id)
+
+
+class JobQueue:
+    # Ein Pool pro Prozess; max_workers begrenzt die gleichzeitig laufenden
+    # Jobs über alle Sessions, weitere warten in der Reihenfolge der Abgabe.
+    def __init__(self, max_workers: int = 2, keep_finished: int = 256):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.max_workers = max(1, int(max_workers))
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sparplan-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> str:
+        job = Job(kind)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        # Kontext des Aufrufers mitnehmen (z. B. einen aktiven Profiler)
+        ctx = copy_context()
+        job._future = self._pool.submit(ctx.run, self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        if job._cancel.is_set():
+            job.status, job.finished = CANCELLED, time.time()
+            return
+        job.status, job.started = RUNNING, time.time()
+        token = _ACTIVE.set(job)
+        try:
+            job.result = fn(*args, **kwargs)
+            job.progress = 1.0
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:  # Fehler gehören zum Job, nicht in den Pool-Thread
+            job.error = str(e) or type(e).__name__
+            status = FAILED
+        finally:
+            _ACTIVE.reset(token)
+        job.finished = time.time()
+        job.status = status  # zuletzt: wer "fertig" sieht, sieht auch Ergebnis/Fehler
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id: str) -> bool:
+        # Wartende Jobs starten nicht mehr, laufende stoppen beim nächsten report_progress()
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return False
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            job.status, job.finished = CANCELLED, time.time()
+        return True
+
+    def result(self, job_id: str, timeout: float | None = None):
+        # Blockierend (Batch/Tests); die UI fragt stattdessen status() ab
+        job = self._jobs[job_id]
+        if job._future is not None and not job._future.cancelled():
+            job._future.result(timeout=timeout)
+        if job.status == FAILED:
+            raise RuntimeError(job.error)
+        if job.status == CANCELLED:
+            raise JobCancelled(job_id)
+        return job.result
+
+    def pop(self, job_id: str) -> Job | None:
+        # Fertigen Job abholen und vergessen
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status in FINISHED:
+                return self._jobs.pop(job_id)
+        return None
+
+    def _prune(self) -> None:
+        # Nie abgeholte fertige Jobs (z. B. geschlossene Tabs) begrenzen
+        done = [j for j in self._jobs.values() if j.status in FINISHED]
+        for job in sorted(done, key=lambda j: j.finished or 0)[:max(0, len(done) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def stats(self) -> dict:
+        counts = {}
+        for job in list(self._jobs.values()):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.max_workers, **counts}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for job in list(self._jobs.values()):
+            job._cancel.set()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
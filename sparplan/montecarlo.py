@@ -0,0 +1,203 @@
+import json
+import math
+
+import numpy as np
+
+from .engine import contribution_schedule
+from .jobs import report_progress
+from .profiling import stage
+from .tagging import thematic_tags
+
+# -----------------------------
+# Monte-Carlo-Projektion des Endwerts
+# -----------------------------
+# Annahmen (JSON, Jahreswerte):
+#   {"default": {"mu": 0.07, "sigma": 0.18},
+#    "types": {"ETF": {...}}, "tags": {"Semis": {...}}, "instruments": {"NVIDIA": {...}},
+#    "correlation": 0.6}
+# Auflösung je Instrument: instruments > erster passender Tag > types > default.
+# Instrumente mit derselben Annahme bilden einen Bucket (gleiche mu/sigma).
+# Alle Paare – auch innerhalb eines Buckets – sind über einen Ein-Faktor-Ansatz
+# mit "correlation" korreliert:
+#   r_i = sqrt(rho) · Markt + sqrt(1 − rho) · eigener Schock_i
+# Standard (schnell): ein Aggregat je Bucket. Der mittlere eigene Schock von
+# n_eff gleich gewichteten Namen hat Varianz 1/n_eff, also
+#   r_B = sqrt(rho) · Markt + sqrt((1 − rho) / n_eff) · Schock_B
+# mit n_eff = (Σ h)² / Σ h² aus den erwarteten Beständen h je Monat
+# (Herfindahl). Mittelwert exakt, Varianz in erster Ordnung; der Aufwand
+# hängt an der Zahl der Buckets. per_instrument=True simuliert jeden Namen
+# einzeln (exakt, Aufwand ~ Zahl der Namen). Speicher bleibt über die
+# Pfad-Blöcke begrenzt.
+
+DEFAULT_ASSUMPTIONS = {"default": {"mu": 0.07, "sigma": 0.18}, "correlation": 0.6}
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+
+def load_assumptions(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    validate_assumptions(data)
+    return data
+
+
+def validate_assumptions(data: dict) -> None:
+    def check(where, a):
+        if not isinstance(a, dict) or "mu" not in a or "sigma" not in a:
+            raise ValueError(f"Annahme '{where}' braucht 'mu' und 'sigma'.")
+        if float(a["sigma"]) < 0 or float(a["mu"]) <= -1:
+            raise ValueError(f"Annahme '{where}': sigma ≥ 0 und mu > -100% erforderlich.")
+
+    check("default", data.get("default", DEFAULT_ASSUMPTIONS["default"]))
+    for section in ("types", "tags", "instruments"):
+        for k, a in data.get(section, {}).items():
+            check(f"{section}/{k}", a)
+    rho = float(data.get("correlation", DEFAULT_ASSUMPTIONS["correlation"]))
+    if not 0.0 <= rho <= 1.0:
+        raise ValueError("'correlation' muss zwischen 0 und 1 liegen.")
+
+
+def resolve_buckets(names: list[str], types: list[str], assumptions: dict):
+    # -> (Bucket je Instrument, Bucket-Schlüssel, mu[], sigma[]) – Jahreswerte
+    instruments = assumptions.get("instruments", {})
+    tag_map = assumptions.get("tags", {})
+    type_map = assumptions.get("types", {})
+    default = assumptions.get("default", DEFAULT_ASSUMPTIONS["default"])
+
+    keys, params, bucket_of = {}, [], []
+    for name, typ in zip(names, types):
+        if name in instruments:
+            key, a = f"instrument:{name}", instruments[name]
+        else:
+            key, a = None, None
+            if typ != "ETF":
+                for tg in thematic_tags(name):
+                    if tg in tag_map:
+                        key, a = f"tag:{tg}", tag_map[tg]
+                        break
+            if key is None and typ in type_map:
+                key, a = f"type:{typ}", type_map[typ]
+            if key is None:
+                key, a = "default", default
+        if key not in keys:
+            keys[key] = len(params)
+            params.append((float(a["mu"]), float(a["sigma"])))
+        bucket_of.append(keys[key])
+
+    mu = np.array([p[0] for p in params], dtype=np.float64)
+    sigma = np.array([p[1] for p in params], dtype=np.float64)
+    return np.array(bucket_of, dtype=np.int64), list(keys), mu, sigma
+
+
+def _effective_names(sched, bucket_of, onehot, mu):
+    # n_eff je Monat und Bucket aus den erwarteten Beständen (Einzahlungen, mit mu verzinst)
+    g = (1.0 + mu[bucket_of]) ** (1.0 / 12.0)
+    h = np.zeros(sched.shape[1])
+    s1 = np.empty((sched.shape[0], onehot.shape[1]))
+    s2 = np.empty_like(s1)
+    for t in range(sched.shape[0]):
+        h = h * g + sched[t]
+        s1[t] = h @ onehot
+        s2[t] = (h * h) @ onehot
+    return np.where(s2 > 0, s1 * s1 / np.where(s2 > 0, s2, 1.0), 1.0)
+
+
+def simulate_plan(
+    res: dict,
+    assumptions: dict | None = None,
+    n_paths: int = 10_000,
+    seed: int | None = 42,
+    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+    fan_paths: int = 2_000,
+    percentiles=PERCENTILES,
+    per_instrument: bool = False,
+) -> dict:
+    assumptions = assumptions or DEFAULT_ASSUMPTIONS
+    validate_assumptions(assumptions)
+
+    with stage("mc_schedule"):
+        names, types, sched = contribution_schedule(res)
+        bucket_of, bucket_keys, mu, sigma = resolve_buckets(names, types, assumptions)
+        months = sched.shape[0]
+        paid = sched.sum(axis=0)
+        bucket_paid = np.bincount(bucket_of, weights=paid, minlength=len(bucket_keys))
+        invested = float(sched.sum())
+        rho = float(assumptions.get("correlation", DEFAULT_ASSUMPTIONS["correlation"]))
+        # simuliert werden nur Instrumente bzw. Buckets mit Einzahlungen
+        if per_instrument:
+            active = np.flatnonzero(paid > 0)
+            contrib = np.ascontiguousarray(sched[:, active])
+            col_bucket = bucket_of[active]
+            idio_var = np.full((months, len(active)), 1.0 - rho)
+        else:
+            active = np.flatnonzero(bucket_paid > 0)
+            onehot = np.zeros((len(names), len(bucket_keys)))
+            onehot[np.arange(len(names)), bucket_of] = 1.0
+            contrib = np.ascontiguousarray((sched @ onehot)[:, active])
+            col_bucket = active
+            idio_var = (1.0 - rho) / _effective_names(sched, bucket_of, onehot, mu)[:, active]
+        n_cols = len(active)
+
+    # Monatliche Log-Renditen: E[exp(x)] = (1 + mu)^(1/12). Schocks in float32
+    # (halber Speicher, schnelleres exp), Depotwerte in float64.
+    s2 = (sigma[col_bucket] / math.sqrt(12.0)) ** 2
+    s_m = np.sqrt(s2).astype(np.float32)
+    a_m = (np.log1p(mu[col_bucket]) / 12.0 - 0.5 * s2 * (rho + idio_var)).astype(np.float32)
+    w_common = np.float32(math.sqrt(rho))
+    w_idio = np.sqrt(idio_var).astype(np.float32)
+
+    # Pfade in Blöcken: Depotwerte (f64) + Zufallszahlen und Faktoren (f32)
+    bytes_per_path = n_cols * 8 + (n_cols + 1) * 4 + n_cols * 4
+    chunk = max(1, min(n_paths, int(memory_budget_mb * 1024 * 1024 // bytes_per_path)))
+    fan_n = min(fan_paths, n_paths, chunk)
+
+    terminal = np.empty(n_paths, dtype=np.float64)
+    fan = None
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_paths // chunk))
+    with stage("mc_paths"):
+        for c, start in enumerate(range(0, n_paths, chunk)):
+            p = min(chunk, n_paths - start)
+            rng = np.random.Generator(np.random.SFC64(seeds[c]))
+            value = np.zeros((p, n_cols), dtype=np.float64)
+            z = np.empty((p, n_cols + 1), dtype=np.float32)
+            growth = np.empty((p, n_cols), dtype=np.float32)
+            track = c == 0 and fan_n > 0
+            if track:
+                fan_vals = np.empty((months, fan_n), dtype=np.float64)
+            for t in range(months):
+                if t % 12 == 0:
+                    report_progress((start + p * t / months) / n_paths, "Pfade")
+                rng.standard_normal(dtype=np.float32, out=z)
+                np.multiply(z[:, 1:], w_idio[t], out=growth)
+                growth += w_common * z[:, :1]
+                growth *= s_m
+                growth += a_m[t]
+                np.exp(growth, out=growth)
+                value += contrib[t]
+                value *= growth
+                if track:
+                    fan_vals[t] = value[:fan_n].sum(axis=1)
+            terminal[start:start + p] = value.sum(axis=1)
+            if track:
+                fan = np.percentile(fan_vals, percentiles, axis=1).T
+
+    pct_values = np.percentile(terminal, percentiles)
+    return {
+        "n_paths": n_paths,
+        "months": months,
+        "invested": invested,
+        "mean": float(terminal.mean()),
+        "std": float(terminal.std()),
+        "percentiles": {int(q): float(v) for q, v in zip(percentiles, pct_values)},
+        "prob_loss": float((terminal < invested).mean()),
+        "buckets": [
+            {"bucket": k, "mu": float(mu[i]), "sigma": float(sigma[i]),
+             "instrumente": int((bucket_of == i).sum()), "einzahlung": float(bucket_paid[i])}
+            for i, k in enumerate(bucket_keys)
+        ],
+        # Perzentile je Monat aus den ersten fan_paths Pfaden (für Fächer-Charts)
+        "fan": fan,
+        "fan_percentiles": tuple(int(q) for q in percentiles),
+        "chunk_size": chunk,
+        "per_instrument": per_instrument,
+    }
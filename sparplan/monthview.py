@@ -0,0 +1,65 @@
+# -----------------------------
+# Monatsansicht (seitenweise)
+# -----------------------------
+# Eine Tabelle Monat × Instrument × Rate statt eines Expanders pro Monat. Es
+# wird immer nur das angefragte Fenster aus den (lazy) Roadmaps abgeleitet –
+# auch ein 600-Monats-Plan kostet pro Seite nur deren Zeilen. pandas wird
+# erst beim Bau der Tabelle geladen.
+
+COLUMNS = ("Monat", "Name", "Typ", "Rate (€)")
+
+
+def plan_instruments(res: dict) -> list[str]:
+    # Alle Namen, die im Plan vorkommen können (Reihenfolge: Favoriten, Rotation, ETFs)
+    return list(dict.fromkeys(
+        list(res["fav_roadmap"].pool) + list(res["rot_roadmap"].pool) + list(res["etf_list"])
+    ))
+
+
+def month_rows(res: dict, m_index: int) -> list[tuple]:
+    # Zeilen eines Monats in der Reihenfolge der bisherigen Einzelmonat-Ansicht
+    monat = m_index + 1
+    rows = [(monat, a, "Favorit", res["fav_rate_per_fav"]) for a in res["fav_roadmap"][m_index]]
+    rows += [(monat, a, "Rotation", res["rot_rate"]) for a in res["rot_roadmap"][m_index]]
+    rows += [(monat, e, "ETF", res["etf_raten"].get(e, 0)) for e in res["etf_list"]]
+    return rows
+
+
+def months_with(res: dict, names) -> list[int]:
+    # Monatsindizes, in denen mindestens eines der Instrumente bespart wird
+    wanted = set(names)
+    months = int(res["monate_int"])
+    if wanted & set(res["etf_list"]):
+        return list(range(months))  # ETFs laufen jeden Monat
+    fav_rm, rot_rm = res["fav_roadmap"], res["rot_roadmap"]
+    check_fav = bool(wanted & set(fav_rm.pool))
+    check_rot = bool(wanted & set(rot_rm.pool))
+    return [
+        m for m in range(months)
+        if (check_fav and not wanted.isdisjoint(fav_rm.month(m)))
+        or (check_rot and not wanted.isdisjoint(rot_rm.month(m)))
+    ]
+
+
+def month_frame(res: dict, months, names=None):
+    # -> DataFrame (Monat, Name, Typ, Rate) für die übergebenen Monatsindizes;
+    # names (optional) filtert auf diese Instrumente
+    import pandas as pd
+
+    wanted = set(names) if names else None
+    rows = []
+    for m in months:
+        if wanted is None:
+            rows.extend(month_rows(res, m))
+        else:
+            rows.extend(r for r in month_rows(res, m) if r[1] in wanted)
+    return pd.DataFrame(rows, columns=list(COLUMNS))
+
+
+def page_bounds(total: int, page: int, page_size: int) -> tuple[int, int, int]:
+    # -> (start, stop, Seitenzahl); page ist 1-basiert und wird eingegrenzt
+    page_size = max(1, int(page_size))
+    pages = max(1, -(-int(total) // page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return start, min(total, start + page_size), pages
@@ -0,0 +1,385 @@
+import math
+import time
+
+import numpy as np
+
+from .planarrays import ETF, FAVORIT, KIND_LABELS
+from .profiling import count, stage
+from .tagging import PROFILE_WANTED_TAGS, RISK_TAG_SET, rotation_vectors
+
+# -----------------------------
+# Optimierung: feste Rate je Instrument
+# -----------------------------
+# Statt Favoriten-/Rotations-Slots mit Einheitsraten bekommt jedes Instrument
+# eine eigene Monatsrate (klassischer Broker-Sparplan). Aktien- und ETF-Budget
+# bleiben wie im Plan; innerhalb des Aktienbudgets wird
+#
+#   Σ_Tag (Anteil_Tag − Ziel_Tag)²  +  Plantreue · Σ (Rate − Planrate)² / Σ Planrate²
+#
+# minimiert. Anteile sind fraktional (ein Name mit zwei Tags zählt je zur
+# Hälfte), Ziele kommen aus PROFILE_WANTED_TAGS (Ausgewogen: gleich verteilt
+# über alle Tags im Plan). Nebenbedingungen: Raten in ganzen Stückelungen
+# ("Lose"), je Name 0 oder mindestens die Mindestrate, optional eine
+# Obergrenze je Name, riskante Werte (RISK_TAG_SET) höchstens risk_cap des
+# Budgets. Budget und Risiko-Deckel sind harte Grenzen: Favoriten werden nur
+# geschlossen, wenn es anders nicht geht (niedrigste Priorität = weiter hinten
+# in der Favoritenliste zuerst); jede nicht erfüllbare Vorgabe landet in
+# "conflicts".
+#
+# Löser: Start bei den Planraten (bzw. warm beim letzten Ergebnis), zulässig
+# machen, dann Abstieg über Transfers "c Lose von i nach j" mit fallendem c
+# (exakte Änderung über Gradient + Krümmung, Kandidaten per argmin) und
+# Schließen einzelner Positionen. Kleine Änderungen an den Reglern brauchen
+# so mit Warmstart nur wenige Züge.
+
+DEFAULT_SETTINGS = {
+    "target_share": 0.6,   # Anteil der Profil-Tags am Aktienbudget (außer Ausgewogen)
+    "risk_cap": 0.25,      # max. Anteil riskanter Werte am Aktienbudget
+    "min_rate": 25.0,      # Mindestrate je Name (€/Monat)
+    "step": 1.0,           # Stückelung des Brokers (€)
+    "max_rate": None,      # Obergrenze je Name (€/Monat)
+    "fidelity": 0.5,       # Gewicht der Nähe zu den Planraten
+}
+
+MAX_MOVES = 50_000
+CLOSE_CANDIDATES = 4
+
+
+def tag_targets(profile: str, tags_present, target_share: float) -> dict:
+    # Ziel-Anteil je Tag: Profil-Tags teilen sich target_share, Ausgewogen verteilt 100 % gleich
+    wanted = [t for t in PROFILE_WANTED_TAGS.get(profile, []) if t in tags_present]
+    if not wanted:
+        themes = sorted(t for t in tags_present if t != "Unkategorisiert")
+        return {t: 1.0 / len(themes) for t in themes} if themes else {}
+    return {t: float(target_share) / len(wanted) for t in wanted}
+
+
+def _themes(tags) -> tuple:
+    t = tuple(x for x in tags if x not in RISK_TAG_SET and x != "Unkategorisiert")
+    return t or ("Unkategorisiert",)
+
+
+class _Block:
+    # Ein Budget in Losen: n_i ∈ {0} ∪ [k, cap_i], Σ n ≤ U, Σ_riskant n ≤ R
+    def __init__(self, A, targets, prior, risky, keep, budget, step, min_rate, max_rate, risk_cap, fidelity):
+        self.A = A
+        self.t = targets
+        self.p = prior
+        self.risky = risky
+        self.keep = keep
+        self.B = float(budget) or 1.0  # leerer Block (U = 0) wird nicht gelöst
+        self.L = float(step)
+        self.U = int(math.floor(float(budget) / self.L + 1e-9))
+        self.k = max(1, int(math.ceil(float(min_rate) / self.L - 1e-9)))
+        self.cap = self.U
+        if max_rate is not None:
+            self.cap = int(math.floor(float(max_rate) / self.L + 1e-9))
+            if self.cap < self.k:
+                raise ValueError("Die max. Rate pro Name ist kleiner als die Mindestrate.")
+        self.R = self.U if risk_cap is None else int(math.floor(float(risk_cap) * float(budget) / self.L + 1e-9))
+        norm = float(prior @ prior) or self.B ** 2
+        self.rho = float(fidelity) / norm
+        self.h = (A * A).sum(axis=1) / self.B ** 2 + self.rho  # Krümmung je Name (pro €²)
+        self.moves = 0
+        self.dropped = {}  # Index -> "budget" | "risk": geschlossene bzw. nicht eröffnete Favoriten
+
+    # -- Zielfunktion --
+    def objective(self, n) -> float:
+        x = n * self.L
+        e = self.A.T @ x / self.B
+        return float(((e - self.t) ** 2).sum() + self.rho * ((x - self.p) ** 2).sum())
+
+    def grad(self, n):
+        x = n * self.L
+        e = self.A.T @ x / self.B
+        return 2.0 * (self.A @ (e - self.t)) / self.B + 2.0 * self.rho * (x - self.p)
+
+    def _pair_delta(self, g, i, j, d) -> float:
+        # exakte Änderung beim Transfer von d € von i nach j
+        cross = float(self.A[i] @ self.A[j]) / self.B ** 2
+        return d * (g[j] - g[i]) + d * d * (self.h[i] + self.h[j] - 2.0 * cross)
+
+    def _risk_used(self, n) -> int:
+        return int(n[self.risky].sum())
+
+    # -- Bausteine --
+    def _add_costs(self, n, g, lots, free):
+        # Kosten je Los, wenn `lots` Lose zugeführt werden (geschlossen: mind. k); inf = unzulässig
+        amount = np.where(n > 0, lots, max(lots, self.k))
+        d = amount * self.L
+        cost = (d * g + d * d * self.h) / amount
+        ok = (amount <= free) & (n + amount <= self.cap)
+        risk_free = self.R - self._risk_used(n)
+        ok &= ~self.risky | (amount <= risk_free)
+        return np.where(ok, cost, np.inf), amount
+
+    def fill(self, n, free: int) -> int:
+        # Freie Lose greedy verteilen (auch wenn es die Zielfunktion verschlechtert: Budget wird investiert)
+        while free > 0:
+            g = self.grad(n)
+            lots = max(1, free // max(8, int((n > 0).sum())))
+            cost, amount = self._add_costs(n, g, lots, free)
+            j = int(np.argmin(cost))
+            if not np.isfinite(cost[j]) and lots > 1:
+                cost, amount = self._add_costs(n, g, 1, free)
+                j = int(np.argmin(cost))
+            if not np.isfinite(cost[j]):
+                break
+            n[j] += amount[j]
+            free -= int(amount[j])
+            self.moves += 1
+        return free
+
+    def drain(self, n, lots: int, mask, reason: str) -> None:
+        # `lots` Lose aus Positionen in mask abziehen (günstigste zuerst, ggf. schließen;
+        # Favoriten erst ganz zum Schluss, von hinten)
+        while lots > 0:
+            g = self.grad(n)
+            shrink = mask & (n > self.k)
+            close = mask & (n > 0) & ~self.keep
+            if shrink.any():
+                cost = np.where(shrink, -g * self.L + self.L * self.L * self.h, np.inf)
+                i = int(np.argmin(cost))
+                take = min(lots, int(n[i]) - self.k)
+            elif close.any():
+                cost = np.where(close, (-g * n * self.L + (n * self.L) ** 2 * self.h) / np.maximum(n, 1), np.inf)
+                i = int(np.argmin(cost))
+                take = int(n[i])
+            else:
+                i = int(np.flatnonzero(mask & (n > 0))[-1])  # nur noch Favoriten: den hintersten schließen
+                take = int(n[i])
+                self.dropped[i] = reason
+            n[i] -= take
+            lots -= take
+            self.moves += 1
+        if lots < 0:
+            self.fill(n, -lots)  # beim Schließen zu viel frei geworden
+
+    def repair(self, n):
+        # Startpunkt zulässig machen: Grenzen, Mindestrate, Risiko, Budget, Favoriten, Rest verteilen
+        n = np.clip(n, 0, self.cap).astype(np.int64)
+        n[n < self.k] = 0
+        excess = self._risk_used(n) - self.R
+        if excess > 0:
+            self.drain(n, excess, self.risky, "risk")
+        excess = int(n.sum()) - self.U
+        if excess > 0:
+            self.drain(n, excess, np.ones(len(n), dtype=bool), "budget")
+        free = self.U - int(n.sum())
+        for i in np.flatnonzero(self.keep & (n == 0)):
+            if self.risky[i] and self._risk_used(n) + self.k > self.R:
+                self.dropped[i] = "risk"
+            elif free < self.k:
+                self.dropped[i] = "budget"
+            else:
+                n[i] = self.k
+                free -= self.k
+        self.fill(n, free)
+        return n
+
+    def descend(self, n, lots: int) -> bool:
+        # Transfers von `lots` Losen, solange sich die Zielfunktion verbessert
+        improved = False
+        d = lots * self.L
+        while self.moves < MAX_MOVES:
+            g = self.grad(n)
+            donor = (n - lots >= self.k) | ((n == lots) & ~self.keep)
+            recv = np.where(n > 0, n + lots <= self.cap, lots >= self.k) & (n + lots <= self.cap)
+            if not donor.any() or not recv.any():
+                return improved
+            give = np.where(donor, -d * g + d * d * self.h, np.inf)
+            take = np.where(recv, d * g + d * d * self.h, np.inf)
+            options = [(give, take)]
+            if self.R - self._risk_used(n) < lots:
+                # Risiko ausgeschöpft: riskant -> riskant oder beliebig -> sicher
+                options = [
+                    (give, np.where(self.risky, np.inf, take)),
+                    (np.where(self.risky, give, np.inf), np.where(self.risky, take, np.inf)),
+                ]
+            best, move = -1e-12, None
+            for gv, tk in options:
+                i = int(np.argmin(gv))
+                tk = tk.copy()
+                tk[i] = np.inf
+                j = int(np.argmin(tk))
+                if not (np.isfinite(gv[i]) and np.isfinite(tk[j])):
+                    continue
+                delta = self._pair_delta(g, i, j, d)
+                if delta < best:
+                    best, move = delta, (i, j)
+            if move is None:
+                return improved
+            i, j = move
+            n[i] -= lots
+            n[j] += lots
+            self.moves += 1
+            improved = True
+        return improved
+
+    def close_pass(self, n) -> bool:
+        # Einzelne Positionen schließen und neu verteilen (exakt bewertet, nur die aussichtsreichsten)
+        g = self.grad(n)
+        cand = np.flatnonzero((n > 0) & ~self.keep)
+        if not len(cand):
+            return False
+        d = n[cand] * self.L
+        gain = -d * g[cand] + d * d * self.h[cand]
+        current = self.objective(n)
+        for i in cand[np.argsort(gain, kind="stable")[:CLOSE_CANDIDATES]]:
+            trial = n.copy()
+            freed = int(trial[i])
+            trial[i] = 0
+            self.fill(trial, freed)
+            if int(trial.sum()) == int(n.sum()) and self.objective(trial) < current - 1e-12:
+                n[:] = trial
+                return True
+        return False
+
+    def solve(self, start):
+        n = self.repair(start)
+        levels = sorted({max(1, self.U >> s) for s in range(1, 64) if self.U >> s} | {self.k, 1}, reverse=True)
+        for _ in range(8):
+            for lots in levels:
+                self.descend(n, lots)
+            if not self.close_pass(n):
+                break
+        self.dropped = {i: r for i, r in self.dropped.items() if n[i] == 0}
+        self.check(n)
+        return n
+
+    def check(self, n) -> None:
+        # Harte Grenzen – ein Verstoß ist ein Fehler im Löser, kein Ergebnis
+        if (
+            int(n.sum()) > self.U
+            or self._risk_used(n) > self.R
+            or ((n > 0) & (n < self.k)).any()
+            or (n > self.cap).any()
+            or (n < 0).any()
+        ):
+            raise RuntimeError("Optimierung verletzt Budget, Risiko-Deckel oder Ratengrenzen.")
+
+
+def optimize_plan(res: dict, profile: str | None = None, warm: dict | None = None, **settings) -> dict:
+    # -> {"rates", "rows", "exposures", "risk_share", "unallocated", "conflicts", "tracking", "moves", "warm", "ms", ...}
+    # warm: letztes Ergebnis (Raten je Name) – Startpunkt bei kleinen Änderungen der Regler
+    opts = dict(DEFAULT_SETTINGS, **{k: v for k, v in settings.items() if k in DEFAULT_SETTINGS})
+    if opts["step"] <= 0:
+        raise ValueError("Die Stückelung muss größer als 0 sein.")
+    t0 = time.perf_counter()
+    profile = profile or res.get("profil", "")
+    arrays = res["arrays"]
+    months = max(1, arrays.months)
+    names = list(arrays.names)
+    kinds = arrays.kinds
+    plan_rates = arrays.totals / months  # durchschnittliche Monatsrate im Regelplan
+
+    with stage("optimize_setup"):
+        stock = np.flatnonzero(kinds != ETF)
+        etf = np.flatnonzero(kinds == ETF)
+        vec = rotation_vectors([names[i] for i in stock], profile)
+        themes = [_themes(t) for t in vec.tags]
+        present = sorted({t for th in themes for t in th})
+        targets = tag_targets(profile, present, opts["target_share"])
+        col = {t: c for c, t in enumerate(present)}
+        share = np.zeros((len(stock), len(present)))
+        for r, th in enumerate(themes):
+            for t in th:
+                share[r, col[t]] = 1.0 / len(th)
+        tgt_cols = [col[t] for t in targets]
+        risky = np.array([bool(set(t) & RISK_TAG_SET) for t in vec.tags], dtype=bool)
+
+    def start_for(idx):
+        rates = plan_rates[idx]
+        if warm:
+            prev = warm.get("rates", {})
+            rates = np.array([prev.get(names[i], 0.0) for i in idx], dtype=np.float64)
+        return np.rint(rates / float(opts["step"]))
+
+    common = {"step": opts["step"], "min_rate": opts["min_rate"], "max_rate": opts["max_rate"], "fidelity": opts["fidelity"]}
+    with stage("optimize_solve"):
+        stocks = _Block(
+            share[:, tgt_cols], np.array([targets[t] for t in targets]), plan_rates[stock], risky,
+            kinds[stock] == FAVORIT, plan_rates[stock].sum(), risk_cap=opts["risk_cap"], **common,
+        )
+        etfs = _Block(
+            np.zeros((len(etf), 0)), np.zeros(0), plan_rates[etf], np.zeros(len(etf), dtype=bool),
+            np.zeros(len(etf), dtype=bool), plan_rates[etf].sum(), risk_cap=None, **common,
+        )
+        n_stock = stocks.solve(start_for(stock)) if len(stock) and stocks.U else np.zeros(len(stock), dtype=np.int64)
+        n_etf = etfs.solve(start_for(etf)) if len(etf) and etfs.U else np.zeros(len(etf), dtype=np.int64)
+        count("optimizer_moves", stocks.moves + etfs.moves)
+
+    x_stock = n_stock * stocks.L
+    x_etf = n_etf * etfs.L
+    rates = {}
+    rows = []
+    for idx, x in ((stock, x_stock), (etf, x_etf)):
+        for pos, i in enumerate(idx):
+            if x[pos] > 0:
+                rate = round(float(x[pos]), 2)
+                rates[names[i]] = rate
+                rows.append({
+                    "Name": names[i],
+                    "Typ": KIND_LABELS[kinds[i]],
+                    "Rate (€)": rate,
+                    "Planrate (€)": round(float(plan_rates[i]), 2),
+                })
+    rows.sort(key=lambda r: (r["Typ"] == "ETF", -r["Rate (€)"]))
+
+    stock_budget = float(plan_rates[stock].sum()) or 1.0
+    plan_exp = share.T @ plan_rates[stock] / stock_budget
+    opt_exp = share.T @ x_stock / stock_budget
+    exposures = [
+        {
+            "Tag": t,
+            "Ziel (%)": round(targets[t] * 100, 1) if t in targets else None,
+            "Plan (%)": round(float(plan_exp[c]) * 100, 1),
+            "Optimiert (%)": round(float(opt_exp[c]) * 100, 1),
+        }
+        for t, c in sorted(col.items(), key=lambda tc: -opt_exp[tc[1]])
+    ]
+    target_vec = np.array([targets[t] for t in targets])
+    invested = float(x_stock.sum() + x_etf.sum())
+
+    # Nicht erfüllbare Vorgaben benennen statt sie still zu übergehen
+    conflicts = []
+    for label, idx, block, n in (("Aktien", stock, stocks, n_stock), ("ETF", etf, etfs, n_etf)):
+        block_budget = float(plan_rates[idx].sum())
+        if len(idx) and block.U < block.k:
+            conflicts.append(
+                f"{label}-Budget {block_budget:.2f} € liegt unter der Mindestrate {block.k * block.L:.2f} € – nichts bespart."
+            )
+            continue
+        for pos, reason in sorted(block.dropped.items()):
+            why = (
+                f"Risiko-Deckel {opts['risk_cap']:.0%} lässt keine Rate zu" if reason == "risk"
+                else f"Mindestrate {block.k * block.L:.2f} € passt nicht mehr ins {label}-Budget"
+            )
+            conflicts.append(f"Favorit {names[idx[pos]]} nicht bespart: {why}.")
+        rest = (block.U - int(n.sum())) * block.L
+        if len(idx) and rest > 0:
+            conflicts.append(
+                f"{rest:.2f} € des {label}-Budgets nicht verteilbar (Obergrenze je Name / Risiko-Deckel)."
+            )
+    return {
+        "rates": rates,
+        "rows": rows,
+        "exposures": exposures,
+        "risk_share": (
+            float(plan_rates[stock][risky].sum()) / stock_budget,
+            float(x_stock[risky].sum()) / stock_budget,
+        ),
+        "positions": len(rates),
+        "budget": float(plan_rates.sum()),
+        "unallocated": round(float(plan_rates.sum()) - invested, 2),
+        "conflicts": conflicts,
+        # Abstand zu den Ziel-Anteilen (Prozentpunkte, euklidisch): Regelplan vs. optimiert
+        "tracking": tuple(
+            float(np.sqrt(((exp[tgt_cols] - target_vec) ** 2).sum())) * 100 for exp in (plan_exp, opt_exp)
+        ),
+        "moves": stocks.moves + etfs.moves,
+        "warm": bool(warm),
+        "settings": opts,
+        "profile": profile,
+        "ms": (time.perf_counter() - t0) * 1000,
+    }
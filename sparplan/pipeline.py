@@ -0,0 +1,166 @@
+import threading
+
+from .cache import is_cacheable
+from .jobs import report_progress
+from .planner import combine_lists, parse_inputs, select_etfs, select_rotation, solve_numbers
+from .profiling import count, stage
+from .roadmap import Roadmap
+from .tagging import universe_version
+
+# -----------------------------
+# Inkrementelle Pipeline
+# -----------------------------
+# parse → etf_pick → rotation_pick → rate_solve → roadmap → aggregation → presentation.
+# Jede Stufe merkt sich ihren letzten Eingabe-Schlüssel und ihr Ergebnis und
+# läuft nur neu, wenn sich der Schlüssel ändert. Nachgelagerte Stufen hängen
+# an der Version der vorgelagerten, nicht an deren (großen) Ergebnissen.
+# Eine Instanz pro Session; Ergebnisse werden geteilt und sind read-only.
+
+STAGES = ("parse", "etf_pick", "rotation_pick", "rate_solve", "roadmap", "aggregation", "presentation")
+
+
+class PlanPipeline:
+    def __init__(self):
+        self._entries = {}  # Stufe -> (Schlüssel, Wert, Version)
+        self._version = 0
+        self.last_run = {}  # Stufe -> True (neu berechnet) / False (wiederverwendet)
+        self._lock = threading.Lock()
+
+    def invalidate(self, name: str | None = None) -> None:
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def _stage(self, name: str, key, fn):
+        report_progress(STAGES.index(name) / len(STAGES), name)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            self.last_run[name] = False
+            count("stages_reused")
+            return entry[1], entry[2]
+        value = fn()
+        self._version += 1
+        self._entries[name] = (key, value, self._version)
+        self.last_run[name] = True
+        return value, self._version
+
+    def run(self, *args, **kwargs) -> dict:
+        # Signatur wie _run (= compute_plan); ein Lauf zur Zeit pro Pipeline,
+        # UI-Jobs rechnen im Hintergrund-Thread
+        with self._lock:
+            return self._run(*args, **kwargs)
+
+    def _run(
+        self, zielsumme, monate, aktienanteil, anzahl_aktien_pro_monat,
+        favoriten_text, rotation_text, etfs_text,
+        max_aktien, max_etfs, begrenze_rotation,
+        profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
+        favs_pro_monat, fav_multiplier, min_rate_rotation, top_n_chart=None, show_tag_table=None,
+        max_rate_pro_name=None, min_order_betrag=0.0, etf_mindestraten=None, reshuffle: bool = False,
+    ) -> dict:
+        # top_n_chart/show_tag_table: nur Darstellung, wirken nicht auf den Plan
+        # (werden für ältere Aufrufer noch angenommen). reshuffle: bei "jedes
+        # Mal neu" gemischten Plänen die Auswahl neu würfeln (Button), sonst
+        # bleibt sie beim Verstellen von Zahlen-Parametern stehen.
+        self.last_run = {}
+        if reshuffle and not is_cacheable({"auswahl_wiederholbar": auswahl_wiederholbar, "shuffle_rotation": shuffle_rotation}):
+            self.invalidate("rotation_pick")
+
+        # lazy: hält den Import des Kerns leichtgewichtig (nur beim ersten Aufruf teuer)
+        with stage("imports"):
+            from .engine import aggregate_totals
+            from .planarrays import PlanArrays
+
+        (fav_raw, rot_raw, etf_raw), _ = self._stage(
+            "parse", (favoriten_text, rotation_text, etfs_text),
+            lambda: parse_inputs(favoriten_text, rotation_text, etfs_text),
+        )
+        etfs, etf_v = self._stage("etf_pick", (etfs_text, max_etfs), lambda: select_etfs(etf_raw, max_etfs))
+        rotation, rot_v = self._stage(
+            "rotation_pick",
+            (
+                favoriten_text, rotation_text, max_aktien, profil, profil_staerke, auswahl_wiederholbar,
+                shuffle_rotation, universe_version(),
+            ),
+            lambda: select_rotation(
+                fav_raw, rot_raw, max_aktien, profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
+            ),
+        )
+
+        numeric = (
+            zielsumme, monate, aktienanteil, anzahl_aktien_pro_monat, begrenze_rotation,
+            favs_pro_monat, fav_multiplier, min_rate_rotation, max_rate_pro_name, min_order_betrag, etf_mindestraten,
+        )
+
+        def solve():
+            with stage("rate_solve"):
+                lists = combine_lists(etfs, rotation)
+                return lists, solve_numbers(lists, *numeric)
+
+        (lists, nums), _ = self._stage("rate_solve", (etf_v, rot_v, numeric), solve)
+        alloc = nums.alloc
+        monate_int = int(monate)
+
+        def roadmaps():
+            # Roadmaps (lazy: Monat i wird erst beim Zugriff abgeleitet)
+            with stage("roadmap"):
+                rot_list_effective = lists.rot_list_effective[:nums.rot_pool_size]
+                return (
+                    rot_list_effective,
+                    Roadmap.favorites(lists.fav_list, alloc.fav_per_month, monate_int),
+                    Roadmap.rotation(rot_list_effective, alloc.rot_per_month, monate_int),
+                )
+
+        (rot_list_effective, fav_roadmap, rot_roadmap), rm_v = self._stage(
+            "roadmap", (rot_v, nums.rot_pool_size, alloc.fav_per_month, alloc.rot_per_month, monate_int), roadmaps,
+        )
+
+        def aggregate():
+            # Summen aggregieren (vektorisiert über den modularen Fahrplan)
+            with stage("aggregation"):
+                return aggregate_totals(
+                    list(fav_roadmap.pool), list(rot_roadmap.pool),
+                    fav_roadmap.per_month, rot_roadmap.per_month,
+                    alloc.fav_rate, alloc.rot_rate, monate_int,
+                )
+
+        aktien_sum, agg_v = self._stage("aggregation", (rm_v, alloc.fav_rate, alloc.rot_rate), aggregate)
+
+        etf_list, etf_raten = nums.etf_list, alloc.etf_rates
+
+        def presentation():
+            # Typisierte Plan-Arrays; die Gesamtübersicht ist eine Sicht darauf
+            with stage("dataframe"):
+                arrays = PlanArrays.from_plan(
+                    aktien_sum, lists.fav_list, fav_roadmap, rot_roadmap, etf_list, etf_raten,
+                    alloc.fav_rate, alloc.rot_rate, monate_int,
+                )
+                return arrays, arrays.totals_frame()
+
+        (arrays, df_export), _ = self._stage(
+            "presentation", (agg_v, etf_v, tuple(etf_list), etf_raten, monate_int), presentation,
+        )
+
+        return {
+            "monatlicher_betrag": nums.monatlicher_betrag,
+            "etf_list": etf_list,
+            "etf_raten": etf_raten,
+            "fav_list": lists.fav_list,
+            "rot_list_effective": rot_list_effective,
+            "fav_rate_per_fav": alloc.fav_rate,
+            "rot_rate": alloc.rot_rate,
+            "monate_int": monate_int,
+            "fav_roadmap": fav_roadmap,
+            "rot_roadmap": rot_roadmap,
+            "df_export": df_export,
+            "arrays": arrays,
+            "hits": lists.hits,
+            "pct": lists.pct,
+            "profil": profil,
+            "profil_staerke": profil_staerke,
+            "auswahl_wiederholbar": auswahl_wiederholbar,
+            "info_limits": list(lists.info_limits),
+            "info_adjustments": lists.info_adjustments + nums.info_adjustments,
+            "fav_multiplier": float(fav_multiplier),
+        }
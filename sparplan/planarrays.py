@@ -0,0 +1,168 @@
+import json
+import struct
+
+import numpy as np
+
+from .engine import fav_index_matrix, rot_index_matrix
+
+# -----------------------------
+# Plan als typisierte Arrays
+# -----------------------------
+# Kompakte Form eines compute_plan-Ergebnisses: Instrumente als Tabelle mit
+# Integer-Codes, der Fahrplan als (Monate × Slots)-int32-Matrix mit Zeilen-IDs
+# der Instrumenttabelle (-1 = leerer Slot) und Raten als float64. Slots sind
+# Spalten mit festem Typ und fester Rate: erst Favoriten, dann Rotation, dann
+# je ETF eine Spalte. df_export und die Orderliste werden daraus abgeleitet.
+#
+# Serialisierung ohne Kopie: to_bytes() legt die Arrays hinter einen kleinen
+# JSON-Header in einen einzigen bytearray, from_bytes() liest sie per
+# np.frombuffer direkt (read-only) aus dem Puffer (Session-Ablage, Plan-Cache,
+# Übergabe zwischen Batch-Prozessen).
+
+FAVORIT, ROTATION, ETF = 0, 1, 2
+KIND_LABELS = ("Favorit", "Rotation", "ETF")
+TOTALS_COLUMNS = ("Name", "Typ", "Gesamtbetrag (€)")
+
+_MAGIC = b"SPA1"
+_ALIGN = 8
+_ARRAYS = ("kinds", "totals", "slot_kinds", "slot_rates", "schedule")
+
+
+class PlanArrays:
+    __slots__ = ("names", "kinds", "totals", "slot_kinds", "slot_rates", "schedule")
+
+    def __init__(self, names, kinds, totals, slot_kinds, slot_rates, schedule):
+        self.names = tuple(names)                           # Instrumenttabelle (Zeilen-ID -> Name)
+        self.kinds = np.asarray(kinds, dtype=np.int8)       # Typ-Code je Instrument (wie df_export)
+        self.totals = np.asarray(totals, dtype=np.float64)  # Gesamtbetrag je Instrument (ungerundet)
+        self.slot_kinds = np.asarray(slot_kinds, dtype=np.int8)
+        self.slot_rates = np.asarray(slot_rates, dtype=np.float64)
+        self.schedule = np.asarray(schedule, dtype=np.int32)
+
+    @classmethod
+    def from_plan(
+        cls, aktien_sum: dict, fav_list, fav_roadmap, rot_roadmap, etf_list, etf_raten: dict,
+        fav_rate: float, rot_rate: float, months: int,
+    ) -> "PlanArrays":
+        # Instrumente in der Reihenfolge von df_export: Aktien nach erstem Kauf, dann ETFs
+        fav_set = set(fav_list)
+        names = list(aktien_sum) + list(etf_list)
+        kinds = [FAVORIT if n in fav_set else ROTATION for n in aktien_sum] + [ETF] * len(etf_list)
+        totals = list(aktien_sum.values()) + [etf_raten.get(e, 0) * months for e in etf_list]
+
+        stock_id = {n: i for i, n in enumerate(aktien_sum)}
+        blocks, slot_kinds, slot_rates = [], [], []
+        for kind, rm, idx_fn, rate in (
+            (FAVORIT, fav_roadmap, fav_index_matrix, fav_rate),
+            (ROTATION, rot_roadmap, rot_index_matrix, rot_rate),
+        ):
+            idx = idx_fn(len(rm.pool), rm.per_month, months)
+            ids = np.array([stock_id.get(n, -1) for n in rm.pool] + [-1], dtype=np.int32)
+            blocks.append(ids[idx])
+            slot_kinds += [kind] * idx.shape[1]
+            slot_rates += [rate] * idx.shape[1]
+        n_stocks = len(stock_id)
+        etf_ids = np.arange(n_stocks, n_stocks + len(etf_list), dtype=np.int32)
+        blocks.append(np.broadcast_to(etf_ids, (months, len(etf_list))))
+        slot_kinds += [ETF] * len(etf_list)
+        slot_rates += [etf_raten.get(e, 0) for e in etf_list]
+        return cls(names, kinds, totals, slot_kinds, slot_rates, np.hstack(blocks))
+
+    @property
+    def months(self) -> int:
+        return self.schedule.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, a).nbytes for a in _ARRAYS) + sum(len(n) for n in self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __eq__(self, other):
+        if not isinstance(other, PlanArrays):
+            return NotImplemented
+        return self.names == other.names and all(
+            np.array_equal(getattr(self, a), getattr(other, a)) for a in _ARRAYS
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PlanArrays(instrumente={len(self.names)}, monate={self.months}, slots={self.schedule.shape[1]})"
+
+    # -----------------------------
+    # Abgeleitete Sichten
+    # -----------------------------
+    def totals_frame(self):
+        # df_export: Name, Typ, Gesamtbetrag (auf Cent gerundet wie bisher)
+        import pandas as pd
+
+        if not self.names:
+            return pd.DataFrame([])  # wie bisher: leerer Plan -> DataFrame ohne Spalten
+        columns = (
+            list(self.names),
+            [KIND_LABELS[k] for k in self.kinds.tolist()],
+            [round(x, 2) for x in self.totals.tolist()],
+        )
+        return pd.DataFrame(dict(zip(TOTALS_COLUMNS, columns)))
+
+    def slot_columns(self, kind: int) -> list[int]:
+        return np.flatnonzero(self.slot_kinds == kind).tolist()
+
+    def iter_orders(self, block_months: int = 256):
+        # (Monat, Name, Typ, Rate) Monat für Monat, ohne leere Slots und 0-€-Raten
+        names = self.names
+        rates = self.slot_rates.tolist()
+        cols = [(j, KIND_LABELS[k], rates[j]) for j, k in enumerate(self.slot_kinds.tolist()) if rates[j] > 0]
+        for m0 in range(0, self.months, block_months):
+            for m, row in enumerate(self.schedule[m0:m0 + block_months].tolist(), start=m0 + 1):
+                for j, label, rate in cols:
+                    nid = row[j]
+                    if nid >= 0:
+                        yield (m, names[nid], label, rate)
+
+    # -----------------------------
+    # Serialisierung
+    # -----------------------------
+    def to_bytes(self) -> bytearray:
+        # Magic | Header-Länge (uint32) | JSON-Header | Arrays (je 8-Byte-ausgerichtet)
+        layout, offset = [], 0
+        for a in _ARRAYS:
+            arr = getattr(self, a)
+            layout.append([a, arr.dtype.str, list(arr.shape), offset])
+            offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+        header = json.dumps({"names": self.names, "arrays": layout}, ensure_ascii=False).encode("utf-8")
+        head_len = len(_MAGIC) + 4 + len(header)
+        pad = -head_len % _ALIGN
+        out = bytearray(head_len + pad + offset)
+        out[:head_len] = _MAGIC + struct.pack("<I", len(header)) + header
+        base = head_len + pad
+        for a, _, shape, off in layout:
+            arr = getattr(self, a)
+            np.frombuffer(out, dtype=arr.dtype, count=arr.size, offset=base + off).reshape(shape)[...] = arr
+        return out
+
+    @classmethod
+    def from_bytes(cls, buf) -> "PlanArrays":
+        # Arrays sind read-only Sichten auf buf (bytes, bytearray oder memoryview)
+        view = memoryview(buf).toreadonly()
+        if bytes(view[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError("Kein PlanArrays-Puffer (Magic fehlt).")
+        (n,) = struct.unpack_from("<I", view, len(_MAGIC))
+        start = len(_MAGIC) + 4
+        header = json.loads(bytes(view[start:start + n]).decode("utf-8"))
+        base = start + n + (-(start + n) % _ALIGN)
+        arrays = {}
+        for a, dtype, shape, off in header["arrays"]:
+            dt = np.dtype(dtype)
+            count = int(np.prod(shape, dtype=np.int64))
+            arrays[a] = np.frombuffer(view, dtype=dt, count=count, offset=base + off).reshape(shape)
+        obj = cls.__new__(cls)
+        obj.names = tuple(header["names"])
+        for a in _ARRAYS:
+            setattr(obj, a, arrays[a])
+        return obj
+
+    def __reduce__(self):
+        return (PlanArrays.from_bytes, (self.to_bytes(),))
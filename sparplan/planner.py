@@ -0,0 +1,448 @@
+import random
+from collections import deque
+from functools import lru_cache
+from typing import NamedTuple
+
+from .allocation import Allocation, solve_allocation, solve_rates  # noqa: F401 (solve_rates: Re-Export)
+from .profiling import Profiler, count, stage
+from .tagging import (
+    is_risky,
+    score_rotation,
+    thematic_tags,
+)
+
+# -----------------------------
+# Helper
+# -----------------------------
+PARSE_CACHE_SIZE = 64  # Texte (Textfelder × Sessions), nicht Zeilen
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _clean_lines_cached(text: str) -> tuple[str, ...]:
+    # Schlüssel ist der Text selbst (Hash + Vergleich) – ein Rerun mit
+    # unverändertem Textfeld parst nichts neu
+    count("parse_cache_misses")
+    lines = []
+    for raw in text.splitlines():
+        x = raw.strip().replace("“", '"').replace("”", '"').replace("’", "'")
+        x = " ".join(x.split())
+        if x:
+            lines.append(x)
+    return tuple(lines)
+
+def clean_lines(text: str):
+    # neue Liste je Aufruf: Aufrufer dürfen sie verändern, der Cache nicht
+    return list(_clean_lines_cached(text))
+
+def etf_weight_for(name: str) -> float:
+    n = name.lower()
+    if "core msci world" in n:
+        return 0.25
+    if "blackrock world mining" in n:
+        return 0.05
+    if "automation & robotics" in n:
+        return 0.05
+    if "msci world small cap" in n:
+        return 0.05
+    return 0.10
+
+def pick_etfs(etf_list, max_count: int):
+    if len(etf_list) <= max_count:
+        return etf_list
+    weights = {e: etf_weight_for(e) for e in etf_list}
+    order_index = {e: i for i, e in enumerate(etf_list)}
+    sorted_etfs = sorted(etf_list, key=lambda e: (-weights.get(e, 0.10), order_index.get(e, 10_000)))
+    return sorted_etfs[:max_count]
+
+def profile_seed(profile: str) -> int:
+    mapping = {
+        "Ausgewogen (Standard)": 420,
+        "Tech & AI": 1337,
+        "Wachstum": 2024,
+        "Dividenden & Value": 777,
+        "Konservativ & defensiv": 99
+    }
+    return mapping.get(profile, 420)
+
+def make_rng(profile: str, repeatable: bool) -> random.Random:
+    # Eigener Generator pro Aufruf statt globalem random.seed – parallele
+    # Sessions/Threads können sich so nicht gegenseitig die Reihenfolge verstellen.
+    return random.Random(profile_seed(profile) if repeatable else None)
+
+# -----------------------------
+# Rotation-Auswahl
+# -----------------------------
+def pick_rotation_by_profile(
+    rot_list: list[str],
+    profile: str,
+    strength: str,
+    repeatable: bool,
+    do_shuffle: bool,
+    desired_pool_size: int | None = None,
+    balanced_risk_cap_pct: float = 0.25,
+    balanced_min_per_tag: int = 1,
+) -> list[str]:
+    if not rot_list:
+        return []
+
+    rng = make_rng(profile, repeatable)
+
+    if profile == "Ausgewogen (Standard)":
+        pool = rot_list[:]
+        if do_shuffle:
+            rng.shuffle(pool)
+
+        target = int(desired_pool_size) if desired_pool_size else len(pool)
+        target = max(0, min(target, len(pool)))
+        if target == 0:
+            return []
+
+        risk_cap = int(round(target * float(balanced_risk_cap_pct)))
+        if target >= 8 and risk_cap < 1:
+            risk_cap = 1
+
+        # Tags + Risiko einmal pro Pool-Eintrag auflösen (Bitmap über Pool-Index)
+        risky = bytearray(len(pool))
+        tag_to_candidates = {}
+        for i, s in enumerate(pool):
+            risky[i] = is_risky(s)
+            for tg in thematic_tags(s):
+                tag_to_candidates.setdefault(tg, []).append(i)
+
+        queues = {}
+        for tg, cand in tag_to_candidates.items():
+            if do_shuffle:
+                rng.shuffle(cand)
+            queues[tg] = deque(cand)
+
+        picked = []
+        picked_set = set()
+        picked_risk = 0
+
+        tags = list(queues.keys())
+        if do_shuffle:
+            rng.shuffle(tags)
+
+        def take_from(tg: str) -> bool:
+            # nächsten zulässigen Kandidaten des Tags ziehen (O(1) pro Versuch)
+            nonlocal picked_risk
+            q = queues[tg]
+            while q:
+                i = q.popleft()
+                sym = pool[i]
+                if sym in picked_set:
+                    continue
+                if risky[i]:
+                    if picked_risk >= risk_cap:
+                        continue
+                    picked_risk += 1
+                picked.append(sym)
+                picked_set.add(sym)
+                return True
+            return False
+
+        for _ in range(balanced_min_per_tag):
+            if len(picked) >= target:
+                break
+            for tg in tags:
+                if len(picked) >= target:
+                    break
+                take_from(tg)
+
+        # Auffüllen Runde für Runde; erschöpfte Tags fallen aus der Rotation
+        active = [tg for tg in tags if queues[tg]]
+        while len(picked) < target and active:
+            made_progress = False
+            for tg in active:
+                if len(picked) >= target:
+                    break
+                if take_from(tg):
+                    made_progress = True
+            if not made_progress:
+                break
+            active = [tg for tg in active if queues[tg]]
+
+        if len(picked) < target:
+            non_risk, risk = [], []
+            for i, s in enumerate(pool):
+                if s not in picked_set:
+                    (risk if risky[i] else non_risk).append(s)
+            if do_shuffle:
+                rng.shuffle(non_risk)
+                rng.shuffle(risk)
+
+            for s in non_risk:
+                if len(picked) >= target:
+                    break
+                if s not in picked_set:
+                    picked.append(s)
+                    picked_set.add(s)
+
+            if len(picked) < target:
+                for s in risk:
+                    if len(picked) >= target:
+                        break
+                    if s in picked_set:
+                        continue
+                    picked.append(s)
+                    picked_set.add(s)
+
+        return picked[:target]
+
+    scored = []
+    for s in rot_list:
+        sc = score_rotation(s, profile)
+        tie = rng.random() if do_shuffle else 0.0
+        scored.append((sc, tie, s))
+
+    scored.sort(key=lambda t: (-t[0], t[1]))
+    positives = [t for t in scored if t[0] > 0]
+    rest = [t for t in scored if t[0] <= 0]
+
+    if strength in ["Mild", "Normal"]:
+        ordered = [t[2] for t in positives] + [t[2] for t in rest]
+    else:
+        ordered_pos = [t[2] for t in positives]
+        ordered_all = [t[2] for t in scored]
+        if len(ordered_pos) >= max(5, int(0.3 * len(rot_list))):
+            ordered = ordered_pos + [t[2] for t in rest]
+        else:
+            ordered = ordered_all
+
+    return ordered[:desired_pool_size] if desired_pool_size else ordered
+
+
+# -----------------------------
+# Listen-Stufen (hängen nur an Texten, Limits und Profil)
+# -----------------------------
+class PlanLists(NamedTuple):
+    fav_list: list
+    rot_list: list            # profil-basiert gepickt (Pool-Reihenfolge)
+    rot_list_effective: list  # ggf. gemischt (Ausgewogen), noch nicht auf Slots gekürzt
+    etf_list: list
+    etf_weights: dict
+    has_etfs: bool            # ETFs eingegeben (auch wenn max_etfs = 0)
+    hits: int
+    pct: float
+    info_limits: list
+    info_adjustments: list
+
+
+class EtfSelection(NamedTuple):
+    etf_list: list
+    etf_weights: dict
+    has_etfs: bool
+    info_limits: list
+
+
+class RotationSelection(NamedTuple):
+    fav_list: list
+    rot_list: list
+    rot_list_effective: list
+    hits: int
+    pct: float
+    info_limits: list
+    info_adjustments: list
+
+
+def parse_inputs(favoriten_text, rotation_text, etfs_text) -> tuple[list, list, list]:
+    # Eingaben parsen
+    with stage("parse"):
+        return clean_lines(favoriten_text), clean_lines(rotation_text), clean_lines(etfs_text)
+
+
+def select_etfs(etf_list_raw, max_etfs) -> EtfSelection:
+    # ETFs limitieren
+    with stage("etf_pick"):
+        info_limits = []
+        etf_list = pick_etfs(etf_list_raw, int(max_etfs)) if etf_list_raw else []
+        if len(etf_list_raw) > len(etf_list):
+            info_limits.append(f"ETF-Limit aktiv: {len(etf_list_raw)} eingegeben → **{len(etf_list)}** werden verwendet.")
+        return EtfSelection(etf_list, {etf: etf_weight_for(etf) for etf in etf_list}, bool(etf_list_raw), info_limits)
+
+
+def select_rotation(
+    fav_list_raw, rot_list_raw, max_aktien, profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
+) -> RotationSelection:
+    info_limits = []
+    info_adjustments = []
+
+    # Aktien-Limit: Rotation wird PROFIL-BASIERT gepickt
+    with stage("rotation_pick"):
+        fav_list = fav_list_raw[:]
+        rot_list_all = rot_list_raw[:]
+        max_aktien_int = int(max_aktien)
+        count("rotation_candidates", len(rot_list_all))
+
+        if len(fav_list) > max_aktien_int:
+            fav_list = fav_list[:max_aktien_int]
+            rot_list = []
+            info_limits.append(
+                f"Aktien-Limit: Favoriten > Max. Aktien → Favoriten auf {max_aktien_int} gekürzt, Rotation deaktiviert."
+            )
+        else:
+            rot_slots = max_aktien_int - len(fav_list)
+
+            rot_list_picked = pick_rotation_by_profile(
+                rot_list_all,
+                profile=profil,
+                strength=profil_staerke,
+                repeatable=auswahl_wiederholbar,
+                do_shuffle=shuffle_rotation,
+                desired_pool_size=rot_slots,
+                balanced_risk_cap_pct=0.25,
+                balanced_min_per_tag=1
+            )
+            rot_list = rot_list_picked[:rot_slots]
+
+            if len(rot_list_all) > len(rot_list):
+                info_limits.append(
+                    f"Aktien-Limit aktiv: Rotation wurde profil-basiert auf **{rot_slots}** Aktien gepickt (Max Aktien {max_aktien_int})."
+                )
+
+            if profil == "Ausgewogen (Standard)" and rot_list:
+                risk_cnt = sum(1 for s in rot_list if is_risky(s))
+                risk_pct = (risk_cnt / len(rot_list) * 100) if rot_list else 0.0
+                info_adjustments.append(
+                    f"Ausgewogen: Diversifikation aktiv (1× je Tag soweit möglich) • Risk gedeckelt (~25%) • "
+                    f"im Pool: **{risk_cnt}/{len(rot_list)}** riskige Werte (**{risk_pct:.0f}%**)."
+                )
+
+    # Rotation Pool Reihenfolge: Ausgewogen optional shuffle (nur Reihenfolge)
+    with stage("scoring"):
+        rot_list_effective = rot_list[:]
+        if profil == "Ausgewogen (Standard)" and shuffle_rotation and len(rot_list_effective) > 1:
+            make_rng(profil, auswahl_wiederholbar).shuffle(rot_list_effective)
+
+        # Trefferquote
+        if rot_list_effective:
+            scored_ui = [(score_rotation(s, profil), s) for s in rot_list_effective]
+            hits = sum(1 for sc, _ in scored_ui if sc > 0)
+            pct = (hits / len(rot_list_effective) * 100) if rot_list_effective else 0.0
+        else:
+            hits, pct = 0, 0.0
+
+    return RotationSelection(fav_list, rot_list, rot_list_effective, hits, pct, info_limits, info_adjustments)
+
+
+def combine_lists(etfs: EtfSelection, rotation: RotationSelection) -> PlanLists:
+    return PlanLists(
+        rotation.fav_list, rotation.rot_list, rotation.rot_list_effective,
+        etfs.etf_list, etfs.etf_weights, etfs.has_etfs, rotation.hits, rotation.pct,
+        etfs.info_limits + rotation.info_limits, rotation.info_adjustments,
+    )
+
+
+def prepare_lists(
+    favoriten_text, rotation_text, etfs_text, max_aktien, max_etfs,
+    profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
+) -> PlanLists:
+    fav_list_raw, rot_list_raw, etf_list_raw = parse_inputs(favoriten_text, rotation_text, etfs_text)
+    return combine_lists(
+        select_etfs(etf_list_raw, max_etfs),
+        select_rotation(fav_list_raw, rot_list_raw, max_aktien, profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation),
+    )
+
+
+# -----------------------------
+# Zahlen-Stufen (Budget, Raten, Slots) – billig, für Sweeps pro Zelle
+# -----------------------------
+class PlanNumbers(NamedTuple):
+    monatlicher_betrag: float
+    aktien_budget: float
+    etf_budget: float
+    alloc: Allocation
+    etf_list: list            # ohne pausierte ETFs
+    rot_pool_size: int        # so viele Namen aus rot_list_effective werden bespart
+    info_adjustments: list
+
+
+def solve_numbers(
+    lists: PlanLists, zielsumme, monate, aktienanteil, anzahl_aktien_pro_monat, begrenze_rotation,
+    favs_pro_monat, fav_multiplier, min_rate_rotation,
+    max_rate_pro_name=None, min_order_betrag=0.0, etf_mindestraten=None,
+) -> PlanNumbers:
+    if not monate or monate <= 0:
+        raise ValueError("Die Dauer (Monate) muss größer als 0 sein.")
+
+    etf_anteil_local = 100 - aktienanteil
+    if not lists.has_etfs:
+        aktienanteil_local = 100
+        etf_anteil_local = 0
+    else:
+        aktienanteil_local = aktienanteil
+
+    monatlicher_betrag = zielsumme / monate
+    aktien_budget = monatlicher_betrag * aktienanteil_local / 100
+    etf_budget = monatlicher_betrag * etf_anteil_local / 100
+
+    # Favoriten/Rotation: Anzahl pro Monat
+    fav_list, rot_list = lists.fav_list, lists.rot_list
+    favs_pro_monat_eff = min(favs_pro_monat, len(fav_list)) if fav_list else 0
+    rot_per_month_user = max(0, anzahl_aktien_pro_monat - favs_pro_monat_eff)
+    if not rot_list:
+        rot_per_month_user = 0
+
+    # Raten: ETFs (Gewichte) + Favoriten/Rotation (Multiplikator, Mindestbetrag Rotation, optionale Grenzen)
+    alloc = solve_allocation(
+        aktien_budget, etf_budget, favs_pro_monat_eff, rot_per_month_user, fav_multiplier, min_rate_rotation,
+        etf_list=lists.etf_list, etf_weights=lists.etf_weights,
+        max_rate_per_name=max_rate_pro_name, min_order=min_order_betrag, etf_minimums=etf_mindestraten,
+    )
+    info_adjustments = list(alloc.info)
+
+    # Rotation Subset nach Slots (Zeitfenster)
+    rot_per_month_eff = alloc.rot_per_month
+    rot_pool_size = len(lists.rot_list_effective)
+    slots_rot_total = int(monate) * int(rot_per_month_eff)
+    if begrenze_rotation and rot_per_month_eff > 0 and rot_pool_size > slots_rot_total:
+        dropped = rot_pool_size - slots_rot_total
+        rot_pool_size = slots_rot_total
+        info_adjustments.append(
+            f"Rotation gekürzt: {len(rot_list)} im Pool, aber nur {slots_rot_total} Rotation-Slots "
+            f"({monate}×{rot_per_month_eff}) → {dropped} Werte wurden nicht berücksichtigt."
+        )
+
+    etf_list = [etf for etf in lists.etf_list if etf in alloc.etf_rates]
+    return PlanNumbers(monatlicher_betrag, aktien_budget, etf_budget, alloc, etf_list, rot_pool_size, info_adjustments)
+
+
+# -----------------------------
+# Compute
+# -----------------------------
+def _compute_plan(**params):
+    # Einmal-Lauf der Pipeline (ohne Wiederverwendung); Sessions halten
+    # stattdessen eine eigene PlanPipeline und rechnen inkrementell.
+    from .pipeline import PlanPipeline
+
+    return PlanPipeline().run(**params)
+
+
+def compute_plan(
+    zielsumme, monate, aktienanteil, anzahl_aktien_pro_monat,
+    favoriten_text, rotation_text, etfs_text,
+    max_aktien, max_etfs, begrenze_rotation,
+    profil, profil_staerke, auswahl_wiederholbar, shuffle_rotation,
+    favs_pro_monat, fav_multiplier, min_rate_rotation, top_n_chart=None, show_tag_table=None,
+    max_rate_pro_name=None, min_order_betrag=0.0, etf_mindestraten=None,
+    *, profiler: Profiler | None = None,
+):
+    # top_n_chart/show_tag_table: nur Darstellung, werden ignoriert (ältere Aufrufer).
+    # profiler (opt-in): Stufen-Zeiten, Zähler und Allokationen landen
+    # zusätzlich als strukturierter Datensatz in res["diagnostics"].
+    params = dict(
+        zielsumme=zielsumme, monate=monate, aktienanteil=aktienanteil,
+        anzahl_aktien_pro_monat=anzahl_aktien_pro_monat,
+        favoriten_text=favoriten_text, rotation_text=rotation_text, etfs_text=etfs_text,
+        max_aktien=max_aktien, max_etfs=max_etfs, begrenze_rotation=begrenze_rotation,
+        profil=profil, profil_staerke=profil_staerke,
+        auswahl_wiederholbar=auswahl_wiederholbar, shuffle_rotation=shuffle_rotation,
+        favs_pro_monat=favs_pro_monat, fav_multiplier=fav_multiplier, min_rate_rotation=min_rate_rotation,
+        max_rate_pro_name=max_rate_pro_name, min_order_betrag=min_order_betrag, etf_mindestraten=etf_mindestraten,
+    )
+    if profiler is None:
+        return _compute_plan(**params)
+    with profiler.activate():
+        res = _compute_plan(**params)
+    res["diagnostics"] = profiler.report()
+    return res
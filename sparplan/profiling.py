@@ -0,0 +1,128 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# -----------------------------
+# Profiling (opt-in)
+# -----------------------------
+# Ohne aktiven Profiler sind stage()/count() praktisch kostenlos; aktiviert wird
+# pro Aufruf (ContextVar), daher stören sich parallele Sessions/Threads nicht.
+_ACTIVE = ContextVar("sparplan_profiler", default=None)
+_NULL = nullcontext()
+
+# tracemalloc ist prozessweit: Start/Stopp per Referenzzähler (gestoppt wird erst,
+# wenn der letzte Profiler fertig ist, und nur, wenn wir gestartet haben). Der
+# Spitzenwert ist ebenfalls global – vor jedem reset_peak() wird er in alle
+# offenen Stages (auch verschachtelte, auch anderer Threads) übernommen.
+_TRACE_LOCK = threading.Lock()
+_TRACE_USERS = 0
+_TRACE_OWNED = False
+_OPEN_STAGES = []  # [{"peak": Bytes}] je offener Stage mit Allokations-Messung
+
+
+def _acquire_tracing() -> None:
+    global _TRACE_USERS, _TRACE_OWNED
+    with _TRACE_LOCK:
+        if _TRACE_USERS == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _TRACE_OWNED = True
+        _TRACE_USERS += 1
+
+
+def _release_tracing() -> None:
+    global _TRACE_USERS, _TRACE_OWNED
+    with _TRACE_LOCK:
+        _TRACE_USERS -= 1
+        if _TRACE_USERS == 0 and _TRACE_OWNED:
+            tracemalloc.stop()
+            _TRACE_OWNED = False
+
+
+def _open_stage() -> dict:
+    with _TRACE_LOCK:
+        cur, peak = tracemalloc.get_traced_memory()
+        for frame in _OPEN_STAGES:
+            frame["peak"] = max(frame["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"mem0": cur, "peak": cur}
+        _OPEN_STAGES.append(frame)
+        return frame
+
+
+def _close_stage(frame: dict) -> tuple[int, int]:
+    # -> (aktuell, Spitze seit Beginn der Stage)
+    with _TRACE_LOCK:
+        cur, peak = tracemalloc.get_traced_memory()
+        _OPEN_STAGES.remove(frame)
+        return cur, max(frame["peak"], peak)
+
+
+class Profiler:
+    def __init__(self, track_allocations: bool = False):
+        self.track_allocations = track_allocations
+        self.stages = {}    # name -> {"calls", "wall_ms", "peak_kib", "net_kib"}
+        self.counters = {}  # name -> int
+        self._t0 = None
+        self._wall_ms = 0.0
+
+    @contextmanager
+    def activate(self):
+        token = _ACTIVE.set(self)
+        if self.track_allocations:
+            _acquire_tracing()
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self._wall_ms += (time.perf_counter() - t0) * 1000
+            if self.track_allocations:
+                _release_tracing()
+            _ACTIVE.reset(token)
+
+    @contextmanager
+    def stage(self, name: str):
+        frame = _open_stage() if self.track_allocations and tracemalloc.is_tracing() else None
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = (time.perf_counter() - t0) * 1000
+            st = self.stages.setdefault(name, {"calls": 0, "wall_ms": 0.0, "peak_kib": 0.0, "net_kib": 0.0})
+            st["calls"] += 1
+            st["wall_ms"] += wall
+            if frame is not None:
+                cur, peak = _close_stage(frame)
+                st["peak_kib"] = max(st["peak_kib"], (peak - frame["mem0"]) / 1024)
+                st["net_kib"] += (cur - frame["mem0"]) / 1024
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        # Strukturierter Datensatz (JSON-serialisierbar) für UI, Logs und Batch
+        return {
+            "total_ms": round(self._wall_ms, 3),
+            "stages": [
+                {"stage": name, **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in st.items()}}
+                for name, st in self.stages.items()
+            ],
+            "counters": dict(self.counters),
+            "allocations": self.track_allocations,
+        }
+
+
+def active_profiler():
+    return _ACTIVE.get()
+
+
+def stage(name: str, profiler: Profiler | None = None):
+    prof = profiler or _ACTIVE.get()
+    return prof.stage(name) if prof is not None else _NULL
+
+
+def count(name: str, n: int = 1) -> None:
+    prof = _ACTIVE.get()
+    if prof is not None:
+        prof.count(name, n)
@@ -0,0 +1,82 @@
+# -----------------------------
+# Roadmap (lazy)
+# -----------------------------
+# Statt einer Liste pro Monat wird nur der Pool plus Anzahl pro Monat gehalten;
+# Monat i wird bei Bedarf abgeleitet. Speicher: O(Pool) statt O(Monate × Slots).
+
+
+class Roadmap:
+    FAVORITES = "fav"
+    ROTATION = "rot"
+
+    __slots__ = ("pool", "per_month", "months", "kind")
+
+    def __init__(self, pool, per_month: int, months: int, kind: str):
+        if kind not in (self.FAVORITES, self.ROTATION):
+            raise ValueError(f"Unbekannter Roadmap-Typ: {kind!r}")
+        self.pool = tuple(pool)
+        self.per_month = max(0, int(per_month)) if self.pool else 0
+        self.months = max(0, int(months))
+        self.kind = kind
+
+    @classmethod
+    def favorites(cls, fav_list, per_month: int, months: int) -> "Roadmap":
+        return cls(fav_list, per_month, months, cls.FAVORITES)
+
+    @classmethod
+    def rotation(cls, rot_list, per_month: int, months: int) -> "Roadmap":
+        return cls(rot_list, per_month, months, cls.ROTATION)
+
+    def month(self, i: int) -> list[str]:
+        pool, n = self.pool, self.per_month
+        if n <= 0:
+            return []
+        size = len(pool)
+        if self.kind == self.FAVORITES:
+            start = i % size
+            return [pool[(start + k) % size] for k in range(n)]
+        start = (i * n) % size
+        out = list(pool[start:start + n])
+        if len(out) < n:
+            out += pool[0:n - len(out)]
+        return out
+
+    def __len__(self) -> int:
+        return self.months
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.month(i) for i in range(*key.indices(self.months))]
+        i = int(key)
+        if i < 0:
+            i += self.months
+        if not 0 <= i < self.months:
+            raise IndexError("Roadmap-Index außerhalb des Zeitraums")
+        return self.month(i)
+
+    def __iter__(self):
+        for i in range(self.months):
+            yield self.month(i)
+
+    def __eq__(self, other):
+        if isinstance(other, Roadmap):
+            return (self.pool, self.per_month, self.months, self.kind) == (
+                other.pool, other.per_month, other.months, other.kind
+            )
+        if isinstance(other, list):
+            return len(other) == self.months and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return (self.pool, self.per_month, self.months, self.kind)
+
+    def __setstate__(self, state):
+        self.pool, self.per_month, self.months, self.kind = state
+
+    def __repr__(self) -> str:
+        return f"Roadmap({self.kind}, pool={len(self.pool)}, per_month={self.per_month}, months={self.months})"
+
+    def to_list(self) -> list[list[str]]:
+        return list(self)
@@ -0,0 +1,186 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# -----------------------------
+# Session-Speicher (Server-Betrieb)
+# -----------------------------
+# Große Objekte je Session (Ergebnis, Monte-Carlo, Backtest, Sweep,
+# Optimierung, Pipeline) liegen in einem prozessweiten Speicher statt im
+# st.session_state. Drei Grenzen halten ihn beschränkt: Anzahl Sessions
+# (LRU), Leerlaufzeit (TTL) und geschätzte Gesamtgröße. Verdrängt wird immer eine ganze Session – die
+# zuletzt benutzte bleibt. Zusätzlich räumt retain() Sessions ab, deren
+# Verbindung beendet ist (Tab geschlossen, Reload). Die Größe einer Session wird bei jedem Ablegen über
+# alle ihre Werte geschätzt (geteilte Objekte zählen einmal).
+
+
+def estimate_size(obj) -> int:
+    # Tiefe Größe in Bytes (jedes Objekt einmal); numpy/pandas/PlanArrays
+    # über ihre Puffer statt über sys.getsizeof
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if o is None or id(o) in seen:
+            continue
+        seen.add(id(o))
+        if isinstance(o, (str, bytes, bytearray, int, float, bool)):
+            total += sys.getsizeof(o)
+            continue
+        usage = getattr(o, "memory_usage", None)
+        if callable(usage) and hasattr(o, "dtypes"):  # pandas DataFrame/Series
+            mem = usage(deep=True)
+            total += int(mem.sum()) if hasattr(mem, "sum") else int(mem)
+            continue
+        nbytes = getattr(o, "nbytes", None)
+        if isinstance(nbytes, int):  # numpy-Array, PlanArrays
+            total += nbytes + sys.getsizeof(o)
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        else:
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for cls in type(o).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    stack.append(getattr(o, name, None))
+    return total
+
+
+def process_rss() -> int:
+    # Aktueller Resident Set Size in Bytes (Linux /proc, sonst Spitzenwert)
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SessionStore:
+    # Thread-sicher; Werte werden geteilt und sind als read-only zu behandeln
+    def __init__(self, max_sessions: int = 10_000, ttl: float | None = None, max_bytes: int | None = None):
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()  # Session -> {"data": {}, "bytes": n, "touched": t}
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+        self.closed = 0
+
+    def _entry(self, sid: str, create: bool = False):
+        entry = self._sessions.get(sid)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry["touched"] > self.ttl:
+            del self._sessions[sid]
+            self.expired += 1
+            entry = None
+        if entry is None and create:
+            entry = self._sessions[sid] = {"data": {}, "bytes": 0, "touched": 0.0}
+        if entry is not None:
+            entry["touched"] = time.monotonic()
+            self._sessions.move_to_end(sid)
+        return entry
+
+    def get(self, sid: str, key: str, default=None):
+        with self._lock:
+            entry = self._entry(sid)
+            return default if entry is None else entry["data"].get(key, default)
+
+    def set(self, sid: str, key: str, value) -> None:
+        with self._lock:
+            entry = self._entry(sid, create=True)
+            if value is None:
+                entry["data"].pop(key, None)
+            else:
+                entry["data"][key] = value
+            snapshot = dict(entry["data"])
+        size = estimate_size(snapshot)  # außerhalb des Locks: kann bei großen Objekten dauern
+        with self._lock:
+            if self._sessions.get(sid) is entry:
+                entry["bytes"] = size
+                self._enforce(keep=sid)
+
+    def has_session(self, sid: str) -> bool:
+        with self._lock:
+            return self._entry(sid) is not None
+
+    def drop(self, sid: str) -> None:
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def retain(self, is_active, grace: float = 0.0) -> int:
+        # Sessions ohne Verbindung (is_active(sid) falsch) entfernen, sobald sie länger als
+        # grace Sekunden unbenutzt sind – kurze Verbindungsabbrüche behalten ihre Werte
+        with self._lock:
+            now = time.monotonic()
+            gone = [sid for sid, e in self._sessions.items() if now - e["touched"] > grace and not is_active(sid)]
+            for sid in gone:
+                del self._sessions[sid]
+            self.closed += len(gone)
+            return len(gone)
+
+    def _bytes(self) -> int:
+        return sum(e["bytes"] for e in self._sessions.values())
+
+    def _enforce(self, keep: str) -> None:
+        # abgelaufene zuerst, dann die am längsten unbenutzten (außer der aktuellen)
+        if self.ttl is not None:
+            now = time.monotonic()
+            for sid in [s for s, e in self._sessions.items() if now - e["touched"] > self.ttl and s != keep]:
+                del self._sessions[sid]
+                self.expired += 1
+        while len(self._sessions) > self.max_sessions or (
+            self.max_bytes is not None and len(self._sessions) > 1 and self._bytes() > self.max_bytes
+        ):
+            sid = next(iter(self._sessions))
+            if sid == keep:
+                break
+            del self._sessions[sid]
+            self.evicted += 1
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            before = self.expired
+            self._enforce(keep=None)
+            return self.expired - before
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def report(self, current: str | None = None) -> dict:
+        # Footprint je Session (Schätzung beim Ablegen; aus dem Plan-Cache
+        # geteilte Ergebnisse zählen in jeder Session, die sie hält) + Prozess-RSS
+        with self._lock:
+            now = time.monotonic()
+            sessions = [
+                {
+                    "session": sid,
+                    "current": sid == current,
+                    "keys": sorted(e["data"]),
+                    "bytes": e["bytes"],
+                    "idle_s": now - e["touched"],
+                }
+                for sid, e in reversed(self._sessions.items())
+            ]
+            return {
+                "sessions": sessions,
+                "total_bytes": self._bytes(),
+                "max_sessions": self.max_sessions,
+                "ttl": self.ttl,
+                "max_bytes": self.max_bytes,
+                "evicted": self.evicted,
+                "expired": self.expired,
+                "closed": self.closed,
+                "rss_bytes": process_rss(),
+            }
@@ -0,0 +1,143 @@
+import time
+
+import numpy as np
+
+from .engine import fav_index_matrix, rot_index_matrix
+from .jobs import report_progress
+from .planner import PlanLists, prepare_lists, solve_numbers
+from .profiling import count, stage
+
+# -----------------------------
+# Parameter-Sweep (Sensitivität)
+# -----------------------------
+# Die Listen-Stufen (Parsen, Tags, Profil-Pick, Mischen) hängen nur an Texten,
+# Limits und Profil – sie laufen einmal. Pro Gitterzelle bleiben nur die
+# Zahlen-Stufen (solve_numbers, Skalar-Arithmetik) und die Kennzahlen, die
+# aus Kauf-Häufigkeiten × Rate entstehen; die Häufigkeiten hängen nur an
+# (Pools, Slots, Monate) und werden zwischen Zellen geteilt.
+
+# Parameter -> (Label, Standard-Bereich (von, bis, Schritte), ganzzahlig)
+SWEEPABLE = {
+    "anzahl_aktien_pro_monat": ("Aktien pro Monat", (3, 15, 13), True),
+    "aktienanteil": ("Aktienanteil (%)", (30, 100, 8), True),
+    "fav_multiplier": ("Favoriten-Multiplikator", (1.0, 3.0, 11), False),
+    "min_rate_rotation": ("Mindestbetrag Rotation (€)", (0.0, 100.0, 11), False),
+    "favs_pro_monat": ("Favoriten pro Monat", (1, 3, 3), True),
+    "zielsumme": ("Zielsumme (€)", (10_000.0, 100_000.0, 10), False),
+    "monate": ("Monate", (12, 240, 10), True),
+    "max_rate_pro_name": ("Max. Rate pro Name (€)", (25.0, 200.0, 8), False),
+    "min_order_betrag": ("Mindestorder (€)", (0.0, 50.0, 11), False),
+}
+
+METRICS = {
+    "rot_rate": "Rate je Rotation-Aktie (€)",
+    "fav_rate": "Rate je Favorit (€)",
+    "rot_per_month": "Rotation-Aktien/Monat",
+    "instrumente": "Instrumente im Plan",
+    "max_anteil": "Größte Position (% vom Investierten)",
+    "hhi": "Konzentration (Herfindahl, 0–1)",
+    "unverteilt": "Unverteilt (€/Monat)",
+}
+
+NUMERIC_PARAMS = (
+    "zielsumme", "monate", "aktienanteil", "anzahl_aktien_pro_monat", "begrenze_rotation",
+    "favs_pro_monat", "fav_multiplier", "min_rate_rotation",
+    "max_rate_pro_name", "min_order_betrag", "etf_mindestraten",
+)
+LIST_PARAMS = (
+    "favoriten_text", "rotation_text", "etfs_text", "max_aktien", "max_etfs",
+    "profil", "profil_staerke", "auswahl_wiederholbar", "shuffle_rotation",
+)
+
+
+def grid_values(param: str, start, stop, steps: int) -> list:
+    steps = max(1, int(steps))
+    values = np.linspace(float(start), float(stop), steps)
+    if SWEEPABLE.get(param, (None, None, False))[2]:
+        return sorted({int(round(v)) for v in values})
+    return [float(v) for v in values]
+
+
+class _Counts:
+    # Kauf-Häufigkeit je Name für (Favoriten-Slots, Rotation-Pool, Rotation-Slots, Monate)
+    def __init__(self, lists: PlanLists):
+        self._fav = lists.fav_list
+        self._rot = lists.rot_list_effective
+        names = list(dict.fromkeys(self._fav + self._rot))
+        pos = {n: i for i, n in enumerate(names)}
+        self.n_names = len(names)
+        self._fav_pos = np.array([pos[n] for n in self._fav] + [0], dtype=np.int64)
+        self._rot_pos = np.array([pos[n] for n in self._rot] + [0], dtype=np.int64)
+        self._cache = {}
+
+    def get(self, fav_per_month: int, rot_pool: int, rot_per_month: int, months: int):
+        key = (fav_per_month, rot_pool, rot_per_month, months)
+        hit = self._cache.get(key)
+        if hit is not None:
+            count("sweep_count_reuse")
+            return hit
+        fav_idx = fav_index_matrix(len(self._fav), fav_per_month, months).ravel()
+        rot_idx = rot_index_matrix(rot_pool, rot_per_month, months).ravel()
+        rot_idx = rot_idx[rot_idx >= 0]
+        fav_counts = np.bincount(self._fav_pos[fav_idx], minlength=self.n_names).astype(np.float64)
+        rot_counts = np.bincount(self._rot_pos[rot_idx], minlength=self.n_names).astype(np.float64)
+        self._cache[key] = (fav_counts, rot_counts)
+        return fav_counts, rot_counts
+
+
+def sweep(base_params: dict, x_param: str, x_values, y_param: str, y_values, lists: PlanLists | None = None) -> dict:
+    # -> {"x", "x_values", "y", "y_values", "metrics": {name: Matrix[y, x]}, "errors", "cells", "ms"}
+    for p in (x_param, y_param):
+        if p not in SWEEPABLE:
+            raise ValueError(f"Parameter '{p}' ist nicht sweepbar (erlaubt: {', '.join(SWEEPABLE)}).")
+    if x_param == y_param:
+        raise ValueError("Bitte zwei verschiedene Parameter wählen.")
+
+    t0 = time.perf_counter()
+    if lists is None:
+        lists = prepare_lists(**{k: base_params[k] for k in LIST_PARAMS})
+    counts = _Counts(lists)
+    numeric = {k: base_params[k] for k in NUMERIC_PARAMS if k in base_params}
+
+    shape = (len(y_values), len(x_values))
+    out = {m: np.full(shape, np.nan) for m in METRICS}
+    errors = 0
+    with stage("sweep_grid"):
+        for iy, yv in enumerate(y_values):
+            report_progress(iy / max(1, shape[0]), "Raster")
+            for ix, xv in enumerate(x_values):
+                cell = dict(numeric, **{x_param: xv, y_param: yv})
+                try:
+                    nums = solve_numbers(lists, **cell)
+                except ValueError:
+                    errors += 1
+                    continue
+                a = nums.alloc
+                months = int(cell["monate"])
+                fav_counts, rot_counts = counts.get(a.fav_per_month, nums.rot_pool_size, a.rot_per_month, months)
+                stock_totals = fav_counts * a.fav_rate + rot_counts * a.rot_rate
+                etf_totals = np.array([a.etf_rates[e] * months for e in nums.etf_list], dtype=np.float64)
+                totals = np.concatenate([stock_totals, etf_totals])
+                totals = totals[totals > 0]
+                invested = totals.sum()
+                shares = totals / invested if invested > 0 else totals
+
+                out["rot_rate"][iy, ix] = a.rot_rate
+                out["fav_rate"][iy, ix] = a.fav_rate
+                out["rot_per_month"][iy, ix] = a.rot_per_month
+                out["instrumente"][iy, ix] = len(totals)
+                out["max_anteil"][iy, ix] = shares.max() * 100 if len(shares) else 0.0
+                out["hhi"][iy, ix] = float((shares ** 2).sum())
+                out["unverteilt"][iy, ix] = a.unallocated
+        count("sweep_cells", shape[0] * shape[1])
+
+    return {
+        "x": x_param,
+        "x_values": list(x_values),
+        "y": y_param,
+        "y_values": list(y_values),
+        "metrics": out,
+        "errors": errors,
+        "cells": shape[0] * shape[1],
+        "ms": (time.perf_counter() - t0) * 1000,
+    }
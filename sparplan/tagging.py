@@ -0,0 +1,298 @@
+import re
+from bisect import bisect_right
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import NamedTuple
+
+from .profiling import count
+from .universe import INSTRUMENTS_PATH, RISK_CLASSES, UniverseSource
+
+# -----------------------------
+# Tagging
+# -----------------------------
+# Tags, Risikoklassen und Aliase kommen aus den Instrument-Stammdaten
+# (data/instruments.csv, siehe universe.py); ALL_TAGS/RISK_TAGS sind daraus
+# abgeleitete Sichten (Tag -> Namen). Geladen wird erst beim ersten Zugriff –
+# der Import liest und schreibt keine Dateien.
+
+
+class _TagView(Mapping):
+    # Nur-Lese-Sicht auf den aktuellen Stand; Neuladen tauscht die Dicts in einem Schritt
+    def __init__(self, field: str):
+        self._field = field
+
+    def _data(self) -> dict:
+        if _VIEWS is None:
+            refresh_universe()
+        return _VIEWS[self._field]
+
+    def __getitem__(self, key):
+        return self._data()[key]
+
+    def __iter__(self):
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def __repr__(self) -> str:
+        return repr(self._data())
+
+
+ALL_TAGS = _TagView("tags")
+RISK_TAGS = _TagView("risk")
+
+PROFILE_WANTED_TAGS = {
+    "Ausgewogen (Standard)": [],
+    "Tech & AI": ["Semis","Software/Cloud","Cyber","AI/Data","Quantum","Robotics/Drone","FinTech/Crypto"],
+    "Wachstum": ["Platform/Consumer","EV/Auto","Biotech","Space","FinTech/Crypto","AI/Data","Clean Energy"],
+    "Dividenden & Value": [
+        "Holding/Quality","Staples","Telecom","Healthcare/Pharma","Industrials","Materials/Chemicals",
+        "Mining/Metals","Luxury","REIT","Financials","Utilities/Energy","Uranium/Nuclear","Defense/Aerospace"
+    ],
+    "Konservativ & defensiv": [
+        "Holding/Quality","Staples","Telecom","Healthcare/Pharma","Industrials","REIT",
+        "Materials/Chemicals","Financials","Utilities/Energy","Defense/Aerospace"
+    ],
+}
+
+@lru_cache(maxsize=65_536)
+def normalize_name(x: str) -> str:
+    x = x.strip().lower()
+    x = x.replace("…", "...")
+    x = re.sub(r"\(a\)|\(b\)", "", x)
+    x = x.replace("adr", "")
+    x = re.sub(r"[^a-z0-9\s\.\-&/]", "", x)
+    x = re.sub(r"\s+", " ", x).strip()
+    return x
+
+RISK_TAG_SET = set(RISK_CLASSES)
+
+# -----------------------------
+# Tag-Index (vorkompiliert)
+# -----------------------------
+TAG_CACHE_SIZE = 65_536
+
+
+class SubstringMatcher:
+    # Findet alle Schlüssel k mit ``k in text`` (Aho-Corasick-Automat) oder
+    # ``text in k`` (ein C-Level-``str.find`` über alle Schlüssel am Stück).
+    _SEP = "\x00"
+
+    def __init__(self, keys):
+        self.keys = [k for k in keys if k]
+
+        # Automat: goto-Tabellen, Fail-Links, Ausgaben (Schlüssel-Indizes)
+        goto = [{}]
+        out = [[]]
+        for idx, key in enumerate(self.keys):
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(idx)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:  # BFS, die Liste wächst beim Iterieren
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+        # Heuhaufen für die Rückrichtung: alle Schlüssel, durch SEP getrennt
+        self._haystack = self._SEP.join(self.keys)
+        self._starts = []
+        pos = 0
+        for key in self.keys:
+            self._starts.append(pos)
+            pos += len(key) + 1
+
+    def contained_in(self, text: str) -> set[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits.update(out[node])
+        return hits
+
+    def containing(self, text: str) -> set[int]:
+        if not text:
+            return set(range(len(self.keys)))
+        hay, starts = self._haystack, self._starts
+        hits = set()
+        pos = hay.find(text)
+        while pos != -1:
+            idx = bisect_right(starts, pos) - 1
+            hits.add(idx)
+            # direkt zum nächsten Schlüssel springen – ein Treffer pro Schlüssel reicht
+            nxt = starts[idx + 1] if idx + 1 < len(starts) else len(hay)
+            pos = hay.find(text, nxt)
+        return hits
+
+    def matches(self, text: str) -> set[int]:
+        return self.contained_in(text) | self.containing(text)
+
+
+class TagIndex:
+    # Name -> Tags: bekannter Alias (exact) liefert direkt die Tags seines
+    # Instruments, sonst exakter Hash-Treffer bzw. Teilstring-Matching über
+    # den Automaten; Ergebnisse pro normalisiertem Namen im LRU-Cache. Die
+    # Automaten entstehen erst beim ersten Fehltreffer.
+    def __init__(self, tag_lookup: dict, risk_lookup: dict, cache_size: int = TAG_CACHE_SIZE, exact: dict | None = None):
+        self._exact = exact or {}
+        self._lookups = {
+            "tags": {k: frozenset(v) for k, v in tag_lookup.items()},
+            "risk": {k: frozenset(v) for k, v in risk_lookup.items()},
+        }
+        self._matchers = {}
+        self.tags_for_normalized = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _matcher(self, field: str):
+        # -> (Automat, Tag-Mengen in Schlüssel-Reihenfolge); doppelter Bau bei Threads ist harmlos
+        hit = self._matchers.get(field)
+        if hit is None:
+            lookup = self._lookups[field]
+            matcher = SubstringMatcher(lookup)
+            hit = (matcher, [lookup[k] for k in matcher.keys])
+            self._matchers[field] = hit
+        return hit
+
+    def _lookup(self, n, field):
+        lookup = self._lookups[field]
+        if n in lookup:
+            return lookup[n]
+        matcher, sets = self._matcher(field)
+        found = set()
+        for idx in matcher.matches(n):
+            found |= sets[idx]
+        return found
+
+    def _resolve(self, n: str) -> tuple[str, ...]:
+        count("tag_cache_misses")
+        hit = self._exact.get(n)
+        if hit is not None:
+            return hit
+        tags = set(self._lookup(n, "tags"))
+        tags |= self._lookup(n, "risk")
+        if not tags:
+            tags = {"Unkategorisiert"}
+        return tuple(sorted(tags))
+
+    def cache_info(self):
+        return self.tags_for_normalized.cache_info()
+
+
+# -----------------------------
+# Stammdaten laden (einmal pro Prozess, neu bei Dateiänderung)
+# -----------------------------
+_SOURCE = UniverseSource(INSTRUMENTS_PATH, normalize_name)
+_UNIVERSE = None
+_VIEWS = None  # {"tags": {...}, "risk": {...}} – wird beim Neuladen als Ganzes ersetzt
+_INDEX = None
+
+
+def refresh_universe(force: bool = False):
+    # Prüft (gedrosselt) die Stammdaten-Datei und baut bei Änderung Sichten + Index neu
+    global _UNIVERSE, _VIEWS, _INDEX
+    universe = _SOURCE.current(force)
+    if universe is not _UNIVERSE:
+        views = {"tags": universe.names_by("tags"), "risk": universe.names_by("risk")}
+        index = TagIndex(universe.alias_lookup("tags"), universe.alias_lookup("risk"), exact=universe.resolved_tags())
+        _VIEWS, _INDEX = views, index
+        _UNIVERSE = universe
+        count("universe_loads")
+    return universe
+
+
+def _index() -> TagIndex:
+    # Index beim ersten Lookup bauen
+    if _INDEX is None:
+        refresh_universe()
+    return _INDEX
+
+
+def universe_version() -> str:
+    # Inhalts-Hash der Stammdaten; Teil der Cache-Keys von Plänen
+    return refresh_universe().version
+
+
+def lookup_instrument(name: str):
+    # Exakter Alias-Treffer (O(1)) -> Instrument (Name, Aliase, ISIN, Tags, Risiko) oder None
+    return refresh_universe().get(normalize_name(name))
+
+
+def tags_for_rotation(name: str) -> list[str]:
+    count("tags_for_rotation")
+    return list(_index().tags_for_normalized(normalize_name(name)))
+
+def is_risky(name: str) -> bool:
+    return bool(set(tags_for_rotation(name)) & RISK_TAG_SET)
+
+def thematic_tags(name: str) -> list[str]:
+    t = [x for x in tags_for_rotation(name) if x not in RISK_TAG_SET and x != "Unkategorisiert"]
+    return t if t else ["Unkategorisiert"]
+
+def score_rotation(name: str, profile: str) -> int:
+    return _score_tags(tags_for_rotation(name), profile)
+
+def _score_tags(tags, profile: str) -> int:
+    wanted = set(PROFILE_WANTED_TAGS.get(profile, []))
+
+    if profile == "Ausgewogen (Standard)":
+        if "High Volatility" in tags or "Early/Speculative" in tags:
+            return -1
+        return 0
+
+    score = 0
+    for t in tags:
+        if t in wanted:
+            score += 3
+
+    if profile in ["Dividenden & Value", "Konservativ & defensiv"]:
+        if "High Volatility" in tags:
+            score -= 4
+        if "Early/Speculative" in tags:
+            score -= 3
+
+    if profile == "Konservativ & defensiv":
+        if "Semis" in tags or "Quantum" in tags or "FinTech/Crypto" in tags:
+            score -= 1
+
+    return score
+
+def explain_rotation(name: str, profile: str) -> list[str]:
+    tags = tags_for_rotation(name)
+    wanted = set(PROFILE_WANTED_TAGS.get(profile, []))
+    hits = [t for t in tags if t in wanted]
+    return hits[:3] if hits else tags[:2]
+
+
+class RotationVectors(NamedTuple):
+    tags: tuple    # je Name: Tags wie tags_for_rotation
+    scores: tuple  # je Name: Profil-Score wie score_rotation
+
+
+def rotation_vectors(names, profile: str) -> RotationVectors:
+    # Tags + Scores für eine ganze Liste, jeder Name wird einmal aufgelöst
+    count("rotation_vectors")
+    resolve = _index().tags_for_normalized
+    tags = tuple(resolve(normalize_name(s)) for s in names)
+    return RotationVectors(tags, tuple(_score_tags(t, profile) for t in tags))
@@ -0,0 +1,287 @@
+"""Instrument-Stammdaten: Name, Aliase, ISIN, Tags und Risikoklasse.
+
+Quelle ist eine CSV-Datei (Standard: ``data/instruments.csv``, per
+``SPARPLAN_INSTRUMENTS`` überschreibbar) mit den Spalten
+
+    name, aliases, isin, tags, risk
+
+Mehrere Aliase/Tags/Risikoklassen werden mit ``|`` getrennt. Die Datei wird
+beim ersten Zugriff geprüft und in einen SQLite-Index übersetzt (neben der
+CSV, sonst im Temp-Verzeichnis); spätere Prozesse lesen nur noch den Index.
+Ändert sich die CSV, wird neu übersetzt und im laufenden Prozess neu geladen.
+
+    python -m sparplan.universe build [data/instruments.csv]
+"""
+import argparse
+import csv
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+INSTRUMENTS_PATH = os.environ.get("SPARPLAN_INSTRUMENTS") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "instruments.csv"
+)
+RISK_CLASSES = ("High Volatility", "Early/Speculative")
+INDEX_VERSION = 1
+COLUMNS = ("name", "aliases", "isin", "tags", "risk")
+
+
+class Instrument(NamedTuple):
+    name: str
+    aliases: tuple
+    isin: str
+    tags: tuple
+    risk: tuple
+
+
+def _split(value: str) -> tuple:
+    return tuple(dict.fromkeys(p.strip() for p in (value or "").split("|") if p.strip()))
+
+
+def isin_valid(isin: str) -> bool:
+    # Format + Prüfziffer (Buchstaben -> Zahlen, dann Luhn)
+    if len(isin) != 12 or not isin[:2].isalpha() or not isin.isalnum() or not isin[-1].isdigit():
+        return False
+    digits = "".join(str(int(c, 36)) for c in isin.upper())
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        n = int(d) * (2 if i % 2 else 1)
+        total += n - 9 if n > 9 else n
+    return total % 10 == 0
+
+
+def read_master(path: str, normalize) -> tuple[list[Instrument], dict]:
+    # -> (Instrumente, normalisierter Alias -> Index); Fehler mit Zeilennummer
+    instruments = []
+    aliases = {}
+    with open(path, encoding="utf-8", newline="") as fh:
+        reader = csv.DictReader(fh)
+        missing = [c for c in COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: Spalten fehlen: {', '.join(missing)}.")
+        for line, row in enumerate(reader, start=2):
+            name = (row["name"] or "").strip()
+            if not name:
+                raise ValueError(f"{path} Zeile {line}: Name fehlt.")
+            isin = (row["isin"] or "").strip().upper()
+            if isin and not isin_valid(isin):
+                raise ValueError(f"{path} Zeile {line}: ungültige ISIN {isin!r} ({name}).")
+            risk = _split(row["risk"])
+            unknown = [r for r in risk if r not in RISK_CLASSES]
+            if unknown:
+                raise ValueError(
+                    f"{path} Zeile {line}: unbekannte Risikoklasse {', '.join(unknown)} "
+                    f"(erlaubt: {', '.join(RISK_CLASSES)})."
+                )
+            inst = Instrument(name, _split(row["aliases"]), isin, _split(row["tags"]), risk)
+            idx = len(instruments)
+            for alias in (name,) + inst.aliases:
+                key = normalize(alias)
+                other = aliases.get(key)
+                if other is not None and other != idx:
+                    raise ValueError(
+                        f"{path} Zeile {line}: Alias {alias!r} ist bereits {instruments[other].name!r} zugeordnet."
+                    )
+                aliases[key] = idx
+            instruments.append(inst)
+    return instruments, aliases
+
+
+# -----------------------------
+# SQLite-Index
+# -----------------------------
+def _source_stamp(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def default_index_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".sqlite"
+
+
+def _content_version(path: str) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha1(fh.read()).hexdigest()[:16]
+
+
+def compile_index(csv_path: str, db_path: str, normalize) -> str:
+    # CSV prüfen und atomar als SQLite-Index schreiben -> Version (Inhalts-Hash)
+    instruments, aliases = read_master(csv_path, normalize)
+    version = _content_version(csv_path)
+    mtime_ns, size = _source_stamp(csv_path)
+
+    tmp = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = sqlite3.connect(tmp)
+    try:
+        con.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE instruments (id INTEGER PRIMARY KEY, name TEXT, isin TEXT, aliases TEXT, tags TEXT, risk TEXT);
+            CREATE TABLE aliases (alias TEXT PRIMARY KEY, id INTEGER) WITHOUT ROWID;
+            CREATE INDEX instruments_isin ON instruments (isin);
+        """)
+        con.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("index_version", str(INDEX_VERSION)), ("version", version),
+            ("source_mtime_ns", str(mtime_ns)), ("source_size", str(size)),
+        ])
+        con.executemany("INSERT INTO instruments VALUES (?, ?, ?, ?, ?, ?)", [
+            (i, x.name, x.isin, "|".join(x.aliases), "|".join(x.tags), "|".join(x.risk))
+            for i, x in enumerate(instruments)
+        ])
+        con.executemany("INSERT INTO aliases VALUES (?, ?)", aliases.items())
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, db_path)
+    return version
+
+
+def _index_fresh(db_path: str, csv_path: str) -> bool:
+    if not os.path.exists(db_path):
+        return False
+    try:
+        con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            meta = dict(con.execute("SELECT key, value FROM meta"))
+        finally:
+            con.close()
+    except sqlite3.Error:
+        return False
+    mtime_ns, size = _source_stamp(csv_path)
+    return (
+        meta.get("index_version") == str(INDEX_VERSION)
+        and meta.get("source_mtime_ns") == str(mtime_ns)
+        and meta.get("source_size") == str(size)
+    )
+
+
+class Universe:
+    # Vollständig im Speicher: Alias -> Instrument ist ein Dict-Zugriff
+    def __init__(self, instruments: list[Instrument], aliases: dict, version: str):
+        self.instruments = instruments
+        self.version = version
+        self._by_alias = {k: instruments[i] for k, i in aliases.items()}
+        self._by_isin = {x.isin: x for x in instruments if x.isin}
+
+    @classmethod
+    def load(cls, db_path: str) -> "Universe":
+        con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            version = con.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            instruments = [
+                Instrument(name, _split(aliases), isin or "", _split(tags), _split(risk))
+                for name, isin, aliases, tags, risk in con.execute(
+                    "SELECT name, isin, aliases, tags, risk FROM instruments ORDER BY id"
+                )
+            ]
+            aliases = dict(con.execute("SELECT alias, id FROM aliases"))
+        finally:
+            con.close()
+        return cls(instruments, aliases, version)
+
+    @classmethod
+    def from_csv(cls, csv_path: str, normalize) -> "Universe":
+        # ohne Index direkt aus der CSV (wenn nirgends geschrieben werden kann)
+        instruments, aliases = read_master(csv_path, normalize)
+        return cls(instruments, aliases, _content_version(csv_path))
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def get(self, normalized: str) -> Instrument | None:
+        return self._by_alias.get(normalized)
+
+    def by_isin(self, isin: str) -> Instrument | None:
+        return self._by_isin.get(isin.strip().upper())
+
+    def alias_lookup(self, field: str) -> dict:
+        # normalisierter Alias -> Menge aus "tags" bzw. "risk" (nur nicht-leere)
+        out = {}
+        for key, inst in self._by_alias.items():
+            values = getattr(inst, field)
+            if values:
+                out[key] = set(values)
+        return out
+
+    def resolved_tags(self) -> dict:
+        # normalisierter Alias -> sortierte Tags + Risikoklassen (wie TagIndex sie liefert)
+        return {
+            k: tuple(sorted(set(x.tags) | set(x.risk))) or ("Unkategorisiert",)
+            for k, x in self._by_alias.items()
+        }
+
+    def names_by(self, field: str) -> dict:
+        # Tag/Risikoklasse -> Namen inkl. Aliase (Reihenfolge wie in der Datei)
+        out = {}
+        for inst in self.instruments:
+            for value in getattr(inst, field):
+                out.setdefault(value, []).extend((inst.name,) + inst.aliases)
+        return out
+
+
+class UniverseSource:
+    # Ein Universum pro Prozess; die Datei wird höchstens alle check_interval
+    # Sekunden per stat() geprüft und bei Änderung neu übersetzt und geladen.
+    def __init__(self, csv_path: str, normalize, check_interval: float = 2.0):
+        self.csv_path = csv_path
+        self.normalize = normalize
+        self.check_interval = check_interval
+        self._universe = None
+        self._stamp = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _index_path(self) -> str:
+        path = default_index_path(self.csv_path)
+        if os.access(os.path.dirname(path) or ".", os.W_OK):
+            return path
+        # Nur-Lese-Deployment: Index im Temp-Verzeichnis
+        tag = hashlib.sha1(os.path.abspath(self.csv_path).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(tempfile.gettempdir(), f"sparplan-instruments-{tag}.sqlite")
+
+    def current(self, force: bool = False) -> Universe:
+        now = time.monotonic()
+        if self._universe is not None and not force and now - self._checked < self.check_interval:
+            return self._universe
+        with self._lock:
+            self._checked = now
+            stamp = _source_stamp(self.csv_path)
+            if self._universe is None or force or stamp != self._stamp:
+                db_path = self._index_path()
+                try:
+                    if force or not _index_fresh(db_path, self.csv_path):
+                        compile_index(self.csv_path, db_path, self.normalize)
+                    self._universe = Universe.load(db_path)
+                except (OSError, sqlite3.Error):
+                    # weder neben der CSV noch im Temp-Verzeichnis schreibbar
+                    self._universe = Universe.from_csv(self.csv_path, self.normalize)
+                self._stamp = stamp
+            return self._universe
+
+
+def main(argv=None) -> int:
+    from .tagging import normalize_name
+
+    ap = argparse.ArgumentParser(prog="python -m sparplan.universe", description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Stammdaten prüfen und den SQLite-Index neu schreiben")
+    b.add_argument("source", nargs="?", default=INSTRUMENTS_PATH, help="Stammdaten-CSV")
+    b.add_argument("-o", "--out", help="Zieldatei des Index (Standard: neben der CSV)")
+    args = ap.parse_args(argv)
+
+    out = args.out or default_index_path(args.source)
+    version = compile_index(args.source, out, normalize_name)
+    universe = Universe.load(out)
+    n_alias = sum(len(x.aliases) for x in universe.instruments)
+    print(f"{len(universe)} Instrumente, {n_alias} Aliase, Version {version} -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
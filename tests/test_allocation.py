@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from sparplan import DEFAULT_PARAMS, compute_plan
+from sparplan.allocation import solve_allocation
+from sparplan.batch import normalize_params
+
+
+@pytest.mark.parametrize("cap", [0, 0.0, -5.0])
+def test_non_positive_max_rate_means_no_limit(cap):
+    # 0 = keine Grenze, wie in der UI – nicht "alle Raten auf 0 €"
+    args = (400.0, 200.0, 3, 10, 1.5, 10.0)
+    kwargs = {"etf_list": ["MSCI World", "EM"]}
+    free = solve_allocation(*args, **kwargs)
+    capped = solve_allocation(*args, max_rate_per_name=cap, **kwargs)
+    assert capped == free
+    assert capped.rot_rate > 0 and capped.fav_rate > 0
+
+
+def test_compute_plan_treats_zero_max_rate_as_unlimited():
+    free = compute_plan(**DEFAULT_PARAMS)
+    capped = compute_plan(**dict(DEFAULT_PARAMS, max_rate_pro_name=0))
+    np.testing.assert_array_equal(capped["arrays"].totals, free["arrays"].totals)
+    assert not any("Max. Rate" in s for s in capped["info_adjustments"])
+
+
+def test_batch_parses_zero_max_rate_as_none():
+    _, params = normalize_params({"id": "a", "max_rate_pro_name": "0"})
+    assert params["max_rate_pro_name"] is None
+    _, params = normalize_params({"id": "b", "max_rate_pro_name": "40"})
+    assert params["max_rate_pro_name"] == 40.0
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pytest
+
+from sparplan import DEFAULT_PARAMS, compute_plan
+from sparplan.engine import contribution_schedule
+from sparplan.montecarlo import simulate_plan
+
+
+def analytic_std(contrib: np.ndarray, mu: float, sigma: float, rho: float) -> float:
+    # Eine Einzahlung, ein Monat: Endwert = Σ c_i·exp(X_i), X_i ~ N(a, s²), Corr(X_i, X_j) = rho
+    s2 = sigma ** 2 / 12.0
+    mean = math.exp(math.log1p(mu) / 12.0)  # E[exp(X_i)]
+    corr = np.full((len(contrib), len(contrib)), rho)
+    np.fill_diagonal(corr, 1.0)
+    cov = mean ** 2 * np.expm1(s2 * corr)
+    return math.sqrt(float(contrib @ cov @ contrib))
+
+
+@pytest.mark.parametrize("per_instrument", [False, True])
+@pytest.mark.parametrize("rho", [0.0, 0.6, 1.0])
+def test_dispersion_matches_equicorrelated_sum(rho, per_instrument):
+    # alle Instrumente im selben Bucket: Streuung muss trotzdem der Korrelation rho folgen
+    res = compute_plan(**dict(DEFAULT_PARAMS, monate=1, zielsumme=10_000.0, anzahl_aktien_pro_monat=15))
+    assumptions = {"default": {"mu": 0.07, "sigma": 0.3}, "correlation": rho}
+    _, _, sched = contribution_schedule(res)
+    contrib = sched[0][sched[0] > 0]
+    assert len(contrib) >= 10
+
+    mc = simulate_plan(res, assumptions, n_paths=200_000, seed=7, fan_paths=0, per_instrument=per_instrument)
+    assert len(mc["buckets"]) == 1
+    assert mc["std"] == pytest.approx(analytic_std(contrib, 0.07, 0.3, rho), rel=0.02)
+
+
+def test_bucket_aggregate_matches_per_instrument_over_plan():
+    # schneller Pfad (ein Aggregat je Bucket) gegen exakte Simulation je Name, mehrere Buckets und Monate
+    res = compute_plan(**dict(DEFAULT_PARAMS, monate=36, zielsumme=36_000.0))
+    assumptions = {
+        "default": {"mu": 0.07, "sigma": 0.25}, "types": {"ETF": {"mu": 0.06, "sigma": 0.15}}, "correlation": 0.4,
+    }
+    fast = simulate_plan(res, assumptions, n_paths=60_000, seed=1, fan_paths=0)
+    exact = simulate_plan(res, assumptions, n_paths=60_000, seed=2, fan_paths=0, per_instrument=True)
+    assert len(fast["buckets"]) == 2
+    assert fast["mean"] == pytest.approx(exact["mean"], rel=0.005)
+    assert fast["std"] == pytest.approx(exact["std"], rel=0.03)
+    for q in (5, 50, 95):
+        assert fast["percentiles"][q] == pytest.approx(exact["percentiles"][q], rel=0.01)
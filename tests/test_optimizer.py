@@ -0,0 +1,118 @@
+import math
+import random
+
+import pytest
+
+from sparplan import DEFAULT_PARAMS, PROFILE_OPTIONS, compute_plan, is_risky
+from sparplan.optimizer import optimize_plan
+from sparplan.planarrays import ETF, FAVORIT
+
+EXTRA_FAVORITES = ["Coinbase", "MicroStrategy", "Palantir", "Allianz", "Siemens", "Novo Nordisk"]
+
+
+def random_case(rng: random.Random):
+    favorites = DEFAULT_PARAMS["favoriten_text"].splitlines() + rng.sample(EXTRA_FAVORITES, rng.randint(0, 4))
+    params = dict(
+        DEFAULT_PARAMS,
+        profil=rng.choice(PROFILE_OPTIONS),
+        zielsumme=rng.choice([500.0, 2_000.0, 5_000.0, 30_000.0, 200_000.0]),
+        monate=rng.choice([12, 60, 100, 240]),
+        aktienanteil=rng.choice([40, 60, 80, 100]),
+        favoriten_text="\n".join(favorites),
+    )
+    step = rng.choice([1.0, 5.0, 10.0, 25.0, 50.0])
+    min_rate = rng.choice([0.0, 1.0, 5.0, 25.0, 60.0])
+    settings = {
+        "step": step,
+        "min_rate": min_rate,
+        "risk_cap": rng.choice([0.0, 0.05, 0.25, 0.5, 1.0]),
+        "target_share": rng.uniform(0.0, 1.0),
+        "fidelity": rng.choice([0.0, 0.5, 2.0]),
+        "max_rate": None,
+    }
+    if rng.random() < 0.4:
+        # Obergrenze mindestens ein Los über der Mindestrate
+        settings["max_rate"] = step * (max(1, math.ceil(min_rate / step)) + rng.randint(0, 6))
+    return params, settings
+
+
+def check_invariants(res, opt, settings):
+    arrays = res["arrays"]
+    months = max(1, arrays.months)
+    names = list(arrays.names)
+    step = settings["step"]
+    lot_min = step * max(1, math.ceil(settings["min_rate"] / step - 1e-9))
+    rates = opt["rates"]
+
+    for rate in rates.values():
+        assert rate >= lot_min - 1e-9
+        assert abs(rate / step - round(rate / step)) < 1e-9
+        if settings["max_rate"] is not None:
+            assert rate <= settings["max_rate"] + 1e-9
+
+    stock_budget = 0.0
+    stock_sum = etf_sum = risky_sum = 0.0
+    for i, name in enumerate(names):
+        plan = float(arrays.totals[i]) / months
+        rate = rates.get(name, 0.0)
+        if arrays.kinds[i] == ETF:
+            etf_sum += rate
+            continue
+        stock_budget += plan
+        stock_sum += rate
+        if is_risky(name):
+            risky_sum += rate
+    etf_budget = float(arrays.totals.sum()) / months - stock_budget
+
+    assert stock_sum <= stock_budget + 1e-6
+    assert etf_sum <= etf_budget + 1e-6
+    assert opt["unallocated"] >= 0
+    assert risky_sum <= settings["risk_cap"] * stock_budget + 1e-6
+    assert opt["risk_share"][1] <= settings["risk_cap"] + 1e-9
+
+    # Favoriten sind bespart oder als Konflikt gemeldet (einzeln oder: ganzes Aktienbudget zu klein)
+    too_small = any(c.startswith("Aktien-Budget") for c in opt["conflicts"])
+    for i, name in enumerate(names):
+        if arrays.kinds[i] == FAVORIT and name not in rates:
+            assert too_small or any(name in c for c in opt["conflicts"]), name
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_profiles_respect_hard_limits(seed):
+    rng = random.Random(seed)
+    params, settings = random_case(rng)
+    res = compute_plan(**params)
+    opt = optimize_plan(res, **settings)
+    check_invariants(res, opt, settings)
+
+    # Warmstart nach Reglerbewegung: gleiche Grenzen
+    nudged = dict(
+        settings, risk_cap=rng.choice([0.0, 0.1, 0.3]), min_rate=settings["min_rate"] + settings["step"] * rng.randint(0, 3),
+    )
+    if nudged["max_rate"] is not None and nudged["max_rate"] < nudged["min_rate"]:
+        nudged["max_rate"] = None
+    warm = optimize_plan(res, warm=opt, **nudged)
+    check_invariants(res, warm, nudged)
+
+
+def test_favorites_over_budget_are_closed_and_reported():
+    res = compute_plan(**dict(DEFAULT_PARAMS, profil="Dividenden & Value", zielsumme=5000, monate=100))
+    settings = dict(step=5.0, min_rate=1.0, risk_cap=0.25, max_rate=None)
+    opt = optimize_plan(res, **settings)
+    check_invariants(res, opt, settings)
+    dropped = [c for c in opt["conflicts"] if c.startswith("Favorit ")]
+    assert dropped
+    # niedrigste Priorität (hinten in der Favoritenliste) fliegt zuerst
+    favorites = [n for n, k in zip(res["arrays"].names, res["arrays"].kinds) if k == FAVORIT]
+    kept = [n for n in favorites if n in opt["rates"]]
+    assert kept == favorites[: len(kept)]
+
+
+def test_risky_favorite_respects_zero_risk_cap():
+    favorites = DEFAULT_PARAMS["favoriten_text"] + "\nCoinbase"
+    res = compute_plan(**dict(DEFAULT_PARAMS, favoriten_text=favorites))
+    settings = dict(step=1.0, min_rate=25.0, risk_cap=0.0, max_rate=None)
+    opt = optimize_plan(res, **settings)
+    check_invariants(res, opt, settings)
+    assert "Coinbase" not in opt["rates"]
+    assert any("Coinbase" in c and "Risiko-Deckel" in c for c in opt["conflicts"])
@@ -0,0 +1,43 @@
+import pickle
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from sparplan import DEFAULT_PARAMS, compute_plan
+from sparplan.planarrays import _ARRAYS, PlanArrays
+
+
+@pytest.fixture(scope="module")
+def arrays():
+    return compute_plan(**dict(DEFAULT_PARAMS, monate=600, zielsumme=600_000.0))["arrays"]
+
+
+def assert_same(a, b):
+    assert a.names == b.names
+    for name in _ARRAYS:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+
+def test_to_bytes_builds_the_buffer_once(arrays):
+    tracemalloc.start()
+    try:
+        buf = arrays.to_bytes()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert isinstance(buf, bytearray)
+    assert peak < 1.5 * len(buf)  # keine zweite volle Kopie
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_from_bytes_accepts_any_buffer_and_is_read_only(arrays, wrap):
+    restored = PlanArrays.from_bytes(wrap(arrays.to_bytes()))
+    assert_same(arrays, restored)
+    with pytest.raises(ValueError):
+        restored.schedule[0, 0] = 0
+
+
+@pytest.mark.parametrize("protocol", [4, pickle.HIGHEST_PROTOCOL])
+def test_pickle_round_trip(arrays, protocol):
+    assert_same(arrays, pickle.loads(pickle.dumps(arrays, protocol=protocol)))
@@ -0,0 +1,50 @@
+import tracemalloc
+
+from sparplan.profiling import Profiler
+
+MB = 2**20
+
+
+def test_nested_stage_keeps_outer_peak():
+    prof = Profiler(track_allocations=True)
+    with prof.activate():
+        with prof.stage("outer"):
+            big = bytearray(8 * MB)
+            del big
+            with prof.stage("inner"):
+                small = bytearray(MB)
+                del small
+    stages = prof.report()["stages"]
+    peaks = {s["stage"]: s["peak_kib"] for s in stages}
+    assert peaks["outer"] >= 8 * 1024
+    assert 1000 <= peaks["inner"] < 8 * 1024
+
+
+def test_overlapping_profilers_share_tracing():
+    assert not tracemalloc.is_tracing()
+    first, second = Profiler(track_allocations=True), Profiler(track_allocations=True)
+    outer, inner = first.activate(), second.activate()
+    outer.__enter__()
+    inner.__enter__()
+    outer.__exit__(None, None, None)  # der zuerst gestartete endet vor dem zweiten
+    try:
+        assert tracemalloc.is_tracing()
+        with second.stage("work"):
+            buf = bytearray(2 * MB)
+        del buf
+    finally:
+        inner.__exit__(None, None, None)
+    work = second.report()["stages"][0]
+    assert work["peak_kib"] >= 2 * 1024
+    assert work["net_kib"] > -64
+    assert not tracemalloc.is_tracing()
+
+
+def test_external_tracing_is_left_running():
+    tracemalloc.start()
+    try:
+        with Profiler(track_allocations=True).activate():
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
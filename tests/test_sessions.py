@@ -0,0 +1,27 @@
+import time
+
+from sparplan.sessions import SessionStore
+
+
+def test_retain_releases_closed_sessions_after_grace():
+    store = SessionStore()
+    for sid in ("open", "closed", "reconnecting"):
+        store.set(sid, "result", [sid] * 100)
+    store._sessions["closed"]["touched"] -= 120  # seit 2 min getrennt
+    active = {"open"}
+
+    assert store.retain(active.__contains__, grace=60) == 1
+    assert store.get("closed", "result") is None
+    assert store.get("open", "result") == ["open"] * 100
+    # eben erst getrennt: bleibt innerhalb der Karenz erhalten
+    assert store.get("reconnecting", "result") == ["reconnecting"] * 100
+    assert store.report()["closed"] == 1
+
+
+def test_retain_without_grace_drops_every_inactive_session():
+    store = SessionStore()
+    store.set("a", "x", 1)
+    store.set("b", "x", 2)
+    time.sleep(0.01)
+    assert store.retain(lambda sid: sid == "a") == 1
+    assert len(store) == 1
@@ -0,0 +1,51 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from sparplan import ALL_TAGS, RISK_TAGS, refresh_universe, tags_for_rotation
+from sparplan.tagging import normalize_name
+from sparplan.universe import INSTRUMENTS_PATH, Universe, UniverseSource
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_has_no_file_side_effects(tmp_path):
+    csv_path = tmp_path / "instruments.csv"
+    shutil.copy(INSTRUMENTS_PATH, csv_path)
+    code = (
+        "import os, sys, sparplan\n"
+        "print(sorted(os.listdir(sys.argv[1])))\n"
+        "print(sparplan.tags_for_rotation('NVIDIA'))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path)], cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, SPARPLAN_INSTRUMENTS=str(csv_path), TMPDIR=str(tmp_path / "tmp")),
+    ).stdout.splitlines()
+    assert out[0] == "['instruments.csv']"  # Import: nichts geschrieben
+    assert out[1] == str(tags_for_rotation("NVIDIA"))  # erster Lookup baut den Index
+
+
+def test_unwritable_index_location_falls_back_to_csv(tmp_path):
+    source = UniverseSource(INSTRUMENTS_PATH, normalize_name)
+    source._index_path = lambda: str(tmp_path / "missing" / "instruments.sqlite")
+    universe = source.current()
+    assert len(universe) == len(refresh_universe())
+    assert universe.version == refresh_universe().version
+
+
+def test_reload_never_exposes_partial_views(monkeypatch):
+    # während des Neuaufbaus (hier: mitten in names_by) sehen Leser weiter den vollständigen alten Stand
+    refresh_universe()
+    expected = (dict(ALL_TAGS), dict(RISK_TAGS))
+    seen = []
+    names_by = Universe.names_by
+
+    def spy(self, field):
+        seen.append((dict(ALL_TAGS), dict(RISK_TAGS)))
+        return names_by(self, field)
+
+    monkeypatch.setattr(Universe, "names_by", spy)
+    refresh_universe(force=True)
+    assert seen and all(s == expected for s in seen)
+    assert (dict(ALL_TAGS), dict(RISK_TAGS)) == expected